@@ -0,0 +1,122 @@
+"""Shared fixtures: synthetic catalogs, WAV trees and noise built once per session."""
+
+import json
+import struct
+import sys
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Benchmarks import src and scripts from the repository root
+ROOT_PATH = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(ROOT_PATH))
+
+from src.catalog import AMPLIFIERS_FILE, JSON_PATH, SPEAKERS_FILE
+
+
+pytest.importorskip("pytest_benchmark")
+
+
+# Catalog size multipliers of json/*.json
+CATALOG_SCALES = [1, 100, pytest.param(10_000, marks=pytest.mark.large)]
+WAV_TREE_DIRS = 20
+WAV_TREE_FILES_PER_DIR = 50
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    parser.addoption(
+        "--large", action="store_true", help="also run 10k-x catalog benchmarks"
+    )
+
+
+def pytest_collection_modifyitems(
+    config: pytest.Config, items: list[pytest.Item]
+) -> None:
+    if config.getoption("--large"):
+        return
+    skip = pytest.mark.skip(reason="needs --large")
+    for item in items:
+        if "large" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def catalogDir(tmp_path_factory: pytest.TempPathFactory, request) -> Path:
+    """Return a directory with json/*.json copied scale times, unique references."""
+
+    scale = request.param
+    path = tmp_path_factory.mktemp(f"catalog{scale}")
+    for name in (AMPLIFIERS_FILE, SPEAKERS_FILE):
+        with open(JSON_PATH / name) as f:
+            devices = json.load(f)
+        scaled = [
+            {**device, "reference": f"{device['reference']} #{i}"}
+            for i in range(scale)
+            for device in devices
+        ]
+        with open(path / name, "w") as f:
+            json.dump(scaled, f)
+    return path
+
+
+def _wavHeader(dataSize: int, extensible: bool) -> bytes:
+    """Return a 16 bits stereo 48kHz header, WAVE_FORMAT_EXTENSIBLE if asked."""
+
+    if extensible:
+        fmt = struct.pack(
+            "<HHIIHHHHI16s",
+            0xFFFE,
+            2,
+            48000,
+            192000,
+            4,
+            16,
+            22,
+            16,
+            3,
+            b"\x01\x00" + b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71",
+        )
+    else:
+        fmt = struct.pack("<HHIIHH", 1, 2, 48000, 192000, 4, 16)
+    chunks = (
+        b"fmt "
+        + struct.pack("<I", len(fmt))
+        + fmt
+        + b"data"
+        + struct.pack("<I", dataSize)
+    )
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks) + dataSize) + b"WAVE" + chunks
+
+
+@pytest.fixture(scope="session")
+def wavTree(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Return a directory tree of small WAV files, one in ten needs a fix."""
+
+    root = tmp_path_factory.mktemp("wavs")
+    for d in range(WAV_TREE_DIRS):
+        directory = root / f"album{d}" / "tracks"
+        directory.mkdir(parents=True)
+        for i in range(WAV_TREE_FILES_PER_DIR):
+            header = _wavHeader(4096, extensible=i % 10 == 0)
+            (directory / f"track{i}.wav").write_bytes(header + bytes(4096))
+    return root
+
+
+@pytest.fixture(scope="session")
+def noiseWav(tmp_path_factory: pytest.TempPathFactory):
+    """Return a function writing one minute of 16 bits stereo noise at a std."""
+
+    paths = {}
+
+    def write(std: float) -> Path:
+        if std not in paths:
+            samples = np.random.default_rng(0).normal(0, std, (48000 * 60, 2))
+            data = (np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes()
+            path = tmp_path_factory.mktemp("noise") / "noise.wav"
+            path.write_bytes(_wavHeader(len(data), extensible=False) + data)
+            paths[std] = path
+        return paths[std]
+
+    return write
@@ -0,0 +1,68 @@
+"""Audio processing: level analysis, limiting, thermal simulation and monitoring."""
+
+import numpy as np
+import pytest
+
+from src.audioAnalysis import analyzeWav
+from src.catalog import loadCatalog
+from src.liveMonitor import LiveMonitor
+from src.multiband import analyzeBands, boxWays
+from src.rmsLimiter import LimiterSettings, limitWav
+from src.thermal import pinkMeanSquares, simulateSpeakers
+
+
+def test_analyzeWav(benchmark, noiseWav) -> None:
+    # One minute of 16 bits stereo noise at -20 dBFS RMS
+    track = noiseWav(0.1)
+    analysis = benchmark.pedantic(analyzeWav, (str(track), 0.0), rounds=3)
+    assert abs(analysis.rms + 20) < 0.1
+    assert analysis.truePeak >= analysis.peak
+
+
+@pytest.mark.parametrize("settings", [1, 40])
+def test_limitWav(benchmark, noiseWav, settings: int) -> None:
+    # One minute of noise at -10 dBFS RMS, limited from -12 to +8 dBu
+    track = noiseWav(0.3)
+    limiters = [LimiterSettings(t) for t in np.linspace(-12, 8, settings)]
+    summaries = benchmark.pedantic(limitWav, (str(track), limiters), rounds=3)
+    assert summaries[0].limited > 0.99
+
+
+def test_analyzeBands(benchmark, noiseWav) -> None:
+    # One minute of noise split over the 4 ways of an LA8C
+    track = noiseWav(0.1)
+    ways = boxWays(loadCatalog().speakers.values())["Eric Audio LA8C"]
+    bands = benchmark.pedantic(analyzeBands, (str(track), ways), rounds=3)
+    # White noise, the High way gets most of the power
+    assert max(bands, key=lambda band: band.rms).speaker == "Eric Audio LA8C High"
+
+
+def test_simulateSpeakers(benchmark) -> None:
+    # Five minutes of pink noise against every speaker usable at 4 Ohm
+    catalog = loadCatalog()
+    meanSquares, blockTime = pinkMeanSquares(300, -12)
+    speakers = catalog.findSpeakers(impedance=4) + catalog.findSpeakers(impedance=8)
+    ampli = next(a for a in catalog.amplifiers.values() if a.getPower("4"))
+    results = benchmark.pedantic(
+        simulateSpeakers,
+        (meanSquares, blockTime, speakers, ampli, "4"),
+        rounds=3,
+    )
+    assert len(results) == len(speakers)
+    assert all(result.maxRise > 0 for result in results)
+
+
+def test_liveMonitor(benchmark) -> None:
+    # One second of 48 kHz stereo noise at -20 dBFS RMS, through the ring buffer
+    samples = np.random.default_rng(0).normal(0, 0.1, (48000, 2)).astype(np.float32)
+    monitor = LiveMonitor(48000, 2)
+
+    def run() -> None:
+        for start in range(0, len(samples), 480):
+            monitor.ring.write(samples[start : start + 480])
+            monitor.ring.readInto(monitor.block)
+            monitor.process(monitor.block)
+
+    benchmark(run)
+    assert abs(monitor.levels().rms - 18 + 20) < 0.5
+    assert monitor.levels().dropped == 0
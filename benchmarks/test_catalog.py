@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+from conftest import CATALOG_SCALES
+from src import catalog
+from src.processorProfile import catalogTresholds
+
+
+def _load(path: Path, useCache: bool) -> catalog.Catalog:
+    """Load catalog bypassing the per-process memo."""
+
+    catalog._catalogs.pop(path, None)
+    return catalog.loadCatalog(path, useCache=useCache)
+
+
+# Sub millisecond at 1x, let the benchmark calibrate rounds after a warmup
+@pytest.mark.benchmark(warmup=True, min_rounds=10, disable_gc=True)
+@pytest.mark.parametrize("catalogDir", CATALOG_SCALES, indirect=True)
+def test_loadCatalog_json(benchmark, catalogDir: Path) -> None:
+    loaded = benchmark(_load, catalogDir, False)
+    assert loaded.amplifiers
+
+
+@pytest.mark.benchmark(warmup=True, min_rounds=10, disable_gc=True)
+@pytest.mark.parametrize("catalogDir", CATALOG_SCALES, indirect=True)
+def test_loadCatalog_cached(benchmark, catalogDir: Path) -> None:
+    _load(catalogDir, True)  # Write cache
+    loaded = benchmark(_load, catalogDir, True)
+    assert loaded.speakers
+
+
+@pytest.mark.parametrize("catalogDir", CATALOG_SCALES, indirect=True)
+def test_findSpeakers(benchmark, catalogDir: Path) -> None:
+    loaded = _load(catalogDir, True)
+    speakers = benchmark(
+        loaded.findSpeakers, impedance=8, baffle="CLOSED", minPower=500, freq=60
+    )
+    assert speakers
+
+
+# Dense cross product, 100x catalog would hold billions of thresholds
+@pytest.mark.parametrize("catalogDir", [1], indirect=True)
+def test_catalogTresholds(benchmark, catalogDir: Path) -> None:
+    loaded = _load(catalogDir, True)
+    tresholds = benchmark(catalogTresholds, loaded)
+    assert tresholds.values.shape[1:] == (
+        len(loaded.speakers),
+        len(loaded.amplifiers),
+        len(tresholds.modes),
+    )
@@ -0,0 +1,101 @@
+import numpy as np
+import pytest
+
+from src import numeric
+from src.ampGain import AmpGain
+from src.converter import (
+    freqToDistance,
+    freqToTime,
+    distanceToTime,
+    distanceToFreq,
+    timeToFreq,
+    timeToDistance,
+    computeC,
+    bandFrequencies,
+    conversionTable,
+)
+from src.delay import AlignmentMap, Source, alignmentDelays, listenerGrid
+from src.limiter import Limiter, computeTresholds
+from src.soundSpeed import cramerSpeed, soundSpeedTable
+
+
+BULK_ROWS = 10_000
+C = 343
+CONVERSIONS = [
+    (freqToDistance, (63, C)),
+    (freqToTime, (63, C)),
+    (distanceToTime, (5.44, C)),
+    (distanceToFreq, (5.44, C)),
+    (timeToFreq, (15.87,)),
+    (timeToDistance, (15.87, C)),
+    (computeC, (20,)),
+]
+
+
+@pytest.mark.parametrize("smartLimit", [True, False])
+def test_computeTreshold(benchmark, smartLimit: bool) -> None:
+    limit = Limiter(8, "CLOSED", 1000, 38, 2000)
+    threshold = benchmark(limit.computeTreshold, smartLimit)
+    assert threshold[2] is not None
+
+
+@pytest.mark.parametrize("smartLimit", [True, False])
+def test_computeTreshold_float(benchmark, smartLimit: bool) -> None:
+    benchmark(numeric.computeTreshold, 8, "CLOSED", 1000, 38, 2000, smartLimit)
+
+
+def test_computeTresholds_bulk(benchmark) -> None:
+    rng = np.random.default_rng(0)
+    rows = (
+        rng.choice([2, 4, 8], BULK_ROWS),
+        rng.choice(["OPEN", "CLOSED"], BULK_ROWS),
+        rng.integers(100, 5000, BULK_ROWS),
+        rng.uniform(26, 44, BULK_ROWS).round(1),
+        rng.integers(100, 20000, BULK_ROWS),
+        rng.choice([True, False], BULK_ROWS),
+    )
+    _, _, thresholds = benchmark(computeTresholds, *rows)
+    assert thresholds.shape == (BULK_ROWS,)
+
+
+@pytest.mark.parametrize(
+    "function, args",
+    CONVERSIONS,
+    ids=[function.__name__ for function, _ in CONVERSIONS],
+)
+def test_converter(benchmark, function, args: tuple) -> None:
+    benchmark(function, *args)
+
+
+@pytest.mark.parametrize("fraction", [3, 24])
+def test_conversionTable(benchmark, fraction: int) -> None:
+    freqs = bandFrequencies(fraction)
+    temperatures = np.arange(-10, 40.5, 0.5)
+    table = benchmark(conversionTable, freqs, temperatures)
+    assert len(table["freq"]) == freqs.size * temperatures.size
+
+
+@pytest.mark.parametrize("model", ["linear", "cramer"])
+def test_computeC_model(benchmark, model: str) -> None:
+    benchmark(computeC, 21.5, 65, 1005, model)
+
+
+def test_soundSpeed_bulk(benchmark) -> None:
+    temperatures = np.random.default_rng(0).uniform(-40, 60, BULK_ROWS)
+    table = soundSpeedTable()
+    c = benchmark(table, temperatures, 65, 1005)
+    assert np.abs(c - cramerSpeed(temperatures, 65, 1005)).max() < 0.01
+
+
+def test_alignmentMap_spread(benchmark) -> None:
+    sources = [Source(f"sub{i}", (x, 0)) for i, x in enumerate(range(-8, 8, 2))]
+    sources += [Source("delayL", (-8, 40, 6), 10), Source("delayR", (8, 40, 6), 10)]
+    alignmentMap = AlignmentMap(sources, listenerGrid((-20, 20), (5, 60)))
+    delays = alignmentDelays(sources, (0, 45), C)
+    spread = benchmark(alignmentMap.spread, delays, C)
+    assert spread.shape == (100, 100)
+
+
+def test_computeAmpGain(benchmark) -> None:
+    ampGain = AmpGain(1, 40)
+    assert benchmark(ampGain.computeAmpGain) > 0
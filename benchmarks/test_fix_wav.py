@@ -0,0 +1,35 @@
+import importlib.util
+
+from pathlib import Path
+
+from conftest import ROOT_PATH, WAV_TREE_DIRS, WAV_TREE_FILES_PER_DIR
+
+
+# scripts is not a package, load fix_wav from its path
+_spec = importlib.util.spec_from_file_location(
+    "fix_wav", ROOT_PATH / "scripts" / "fix_wav.py"
+)
+fix_wav = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(fix_wav)
+
+WAV_FILES = WAV_TREE_DIRS * WAV_TREE_FILES_PER_DIR
+
+
+def test_get_issues_no_index(benchmark, wavTree: Path) -> None:
+    stats, issues = benchmark(fix_wav.get_issues, [str(wavTree)], 8)
+    assert stats["opened"] == WAV_FILES
+    assert len(issues) == WAV_FILES // 10
+
+
+def test_get_issues_index(benchmark, wavTree: Path, tmp_path: Path) -> None:
+    index = fix_wav.ScanIndex(str(tmp_path / "index.sqlite"))
+    fix_wav.get_issues([str(wavTree)], 8, index)  # Fill index
+    stats, issues = benchmark(fix_wav.get_issues, [str(wavTree)], 8, index)
+    assert stats["skipped"] == WAV_FILES
+    assert len(issues) == WAV_FILES // 10
+
+
+def test_readWavHeader(benchmark, wavTree: Path) -> None:
+    track = next(wavTree.rglob("*.wav"))
+    header = benchmark(fix_wav.readWavHeader, str(track))
+    assert header.dataChunk is not None
@@ -0,0 +1,28 @@
+from src.preset import PRESETS_PATH, PresetLibrary, parsePreset, patchPreset
+
+
+PRESET_FILE = PRESETS_PATH / "2023" / "20231213_reset.prs"
+
+
+def test_parsePreset(benchmark) -> None:
+    data = PRESET_FILE.read_bytes()
+    preset = benchmark(parsePreset, data)
+    assert len(preset.outputs) == 8
+
+
+def test_presetLibrary_scan(benchmark) -> None:
+    library = benchmark.pedantic(PresetLibrary, (PRESETS_PATH,), rounds=3)
+    assert len(library) and not library.errors
+
+
+def test_presetLibrary_find(benchmark) -> None:
+    library = PresetLibrary(PRESETS_PATH)
+    outputs = benchmark(lambda: list(library.find(minThreshold=0, maxLowPass=200)))
+    assert outputs
+
+
+def test_patchPreset(benchmark) -> None:
+    data = PRESET_FILE.read_bytes()
+    outputs = {i: (-0.5 - i, f"Out{i + 1}") for i in range(8)}
+    patched = benchmark(patchPreset, data, outputs)
+    assert parsePreset(patched).outputs[7].threshold == -7.5
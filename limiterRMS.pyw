@@ -1,22 +1,61 @@
 import sys
+import threading
+import time
 
+# Taken first so that the startup span covers Qt imports too
+STARTED = time.perf_counter()
+
+from importlib import import_module
+
+from PySide6.QtCore import QObject, QSignalBlocker, Qt, QTimer, Signal
 from PySide6.QtWidgets import (
     QApplication,
+    QLabel,
     QVBoxLayout,
     QWidget,
     QTabWidget,
 )
 
-# Dark theme for Qt
-import qdarktheme
-
-from src.ampGainWidget import AmpGainWidget
-from src.converterWidget import ConverterWidget
-from src.limiterWidget import LimiterWidget
+from src import profiling
+from src.catalog import loadCatalog
 
 
 APP_NAME = "LimiterRMS"
 
+# Tab name, module and class of its widget, True if it needs the catalog.
+# Modules are only imported when their tab is first shown.
+TABS = [
+    ("LimiterRMS", "src.limiterWidget", "LimiterWidget", True),
+    ("Amplifier gain", "src.ampGainWidget", "AmpGainWidget", False),
+    ("Converter", "src.converterWidget", "ConverterWidget", False),
+    ("Band tables", "src.conversionTableWidget", "ConversionTableWidget", False),
+]
+LOADING_TEXT = "Loading amplifiers and speakers..."
+
+
+class CatalogLoader(QObject):
+    """Load equipment catalog in a background thread."""
+
+    # Error message, empty when catalog is loaded
+    loaded = Signal(str)
+
+    def start(self) -> None:
+        """Start loading, loaded is emitted in the GUI thread once done."""
+
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self) -> None:
+        """Load catalog, which stays memoized for LimiterWidget."""
+
+        try:
+            loadCatalog()
+        except Exception as e:
+            # Anything raised here would end the thread silently, tabs would
+            # then wait for the catalog forever
+            self.loaded.emit(f"Cannot load catalog: {e}")
+            return
+        self.loaded.emit("")
+
 
 class Window(QWidget):
     """Create widgets and their associated connections."""
@@ -27,26 +66,78 @@ class Window(QWidget):
         self.setWindowTitle(APP_NAME)
         self.setGeometry(400, 50, 900, 700)
 
-        # Get widgets for tabs
-        limiterWidget = LimiterWidget(self)
-        ampGainWidget = AmpGainWidget(self)
-        converterWidget = ConverterWidget(self)
-
-        # Create tab widget for future tools
-        tab = QTabWidget(self)
-        tab.addTab(limiterWidget.getWidget(), limiterWidget.getWidgetName())
-        tab.addTab(ampGainWidget.getWidget(), ampGainWidget.getWidgetName())
-        tab.addTab(converterWidget.getWidget(), converterWidget.getWidgetName())
+        # Placeholders until each tab is shown for the first time
+        self.tab = QTabWidget(self)
+        self.tabWidgets = [None] * len(TABS)
+        for name, _, _, needsCatalog in TABS:
+            placeholder = QLabel(LOADING_TEXT if needsCatalog else "")
+            placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            self.tab.addTab(placeholder, name)
+        self.tab.currentChanged.connect(self._buildTab)
 
         # Create main layout that will contains tabs
         mainLayout = QVBoxLayout(self)
-        mainLayout.addWidget(tab)
+        mainLayout.addWidget(self.tab)
+
+        self.catalogLoaded = False
+        self.catalogLoader = CatalogLoader(self)
+        self.catalogLoader.loaded.connect(self._onCatalogLoaded)
+        self.catalogLoader.start()
 
         self.show()
+        # Build current tab once the window is painted
+        QTimer.singleShot(0, self._onFirstPaint)
+
+    def _onFirstPaint(self) -> None:
+        """Record startup time and build current tab."""
+
+        if profiling.profiler.enabled:
+            now = time.perf_counter()
+            profiling.profiler.record("app.firstPaint", STARTED, now - STARTED)
+        self._buildTab(self.tab.currentIndex())
+
+    def _onCatalogLoaded(self, error: str) -> None:
+        """Build current tab if it was waiting for the catalog."""
+
+        if error:
+            for index, (_, _, _, needsCatalog) in enumerate(TABS):
+                if needsCatalog:
+                    self.tab.widget(index).setText(error)
+            return
+        self.catalogLoaded = True
+        self._buildTab(self.tab.currentIndex())
+
+    @profiling.profiled()
+    def _buildTab(self, index: int) -> None:
+        """Replace placeholder of given tab by its widget, once."""
+
+        name, moduleName, className, needsCatalog = TABS[index]
+        if self.tabWidgets[index] is not None:
+            return
+        if needsCatalog and not self.catalogLoaded:
+            return
+
+        widgetClass = getattr(import_module(moduleName), className)
+        self.tabWidgets[index] = widgetClass(self)
+        placeholder = self.tab.widget(index)
+        # Swapping tabs changes current index, do not build other tabs
+        with QSignalBlocker(self.tab):
+            self.tab.removeTab(index)
+            self.tab.insertTab(index, self.tabWidgets[index].getWidget(), name)
+            self.tab.setCurrentIndex(index)
+        placeholder.deleteLater()
 
 
 def run() -> None:
+    # --profile[=TRACE] does the same as LIMITERRMS_PROFILE=TRACE
+    for arg in sys.argv[1:]:
+        if arg == "--profile" or arg.startswith("--profile="):
+            profiling.enable(arg.partition("=")[2] or None)
+
     app = QApplication()
+    # Dark theme for Qt, imported here so that importing Window stays cheap
+    import qdarktheme
+
     app.setStyleSheet(qdarktheme.load_stylesheet())
     window = Window()
     sys.exit(app.exec())
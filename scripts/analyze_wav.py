@@ -0,0 +1,189 @@
+import argparse
+import csv
+import os
+import sys
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+# Script is run directly, make src package importable
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve()))
+
+from fix_wav import scan_dir
+from src.amplifier import IMPEDANCE_MODES, ImpedanceMode
+from src.audioAnalysis import FULL_SCALE, RMS_WINDOW, analyzeWav
+from src.catalog import loadCatalog
+from src.limiter import Limiter
+
+
+COLUMNS = [
+    "path",
+    "duration",
+    "rms",
+    "maxRms",
+    "peak",
+    "truePeak",
+    "crest",
+    "engaged",
+    "overshoot",
+    "error",
+]
+
+
+def find_tracks(paths: list[str]) -> list[str]:
+    """Return .wav files found recursively in given directories, sorted."""
+
+    tracks = []
+    pending = []
+    for path in paths:
+        if os.path.isdir(path):
+            pending.append(path)
+        else:
+            print(f"Skipping {path}: not a directory", file=sys.stderr)
+    while pending:
+        sub_dirs, tracks_wav = scan_dir(pending.pop())
+        pending += sub_dirs
+        tracks += [track for track, _, _ in tracks_wav]
+    return sorted(tracks)
+
+
+def compute_threshold(speaker: str, ampli: str, mode: str, smart_limit: bool) -> float:
+    """Return limiter threshold (dBu) of catalog references, as the limiter tab."""
+
+    catalog = loadCatalog()
+    speaker = catalog.getSpeaker(speaker)
+    ampli = catalog.getAmplifier(ampli)
+    impedance = ImpedanceMode.fromLabel(mode).impedance
+    if impedance > speaker.impedance or not ampli.getPower(mode):
+        raise ValueError(f"{speaker.reference} cannot be driven in {mode} mode")
+    limiter = Limiter(
+        impedance,
+        speaker.baffle,
+        int(speaker.power * (speaker.impedance / impedance)),
+        ampli.gain,
+        ampli.getPower(mode),
+    )
+    return float(limiter.computeTreshold(smartLimit=smart_limit)[2])
+
+
+def analyze_track(track: str, **options) -> dict:
+    """Return CSV row of analyzeWav() result, with error message if unreadable."""
+
+    try:
+        analysis = analyzeWav(track, **options)
+    except (OSError, ValueError) as e:
+        return {"path": track, "error": str(e)}
+    row = {
+        "path": track,
+        "duration": f"{analysis.duration:.1f}",
+        "rms": f"{analysis.rms:.2f}",
+        "maxRms": f"{analysis.maxRms:.2f}",
+        "peak": f"{analysis.peak:.2f}",
+        "truePeak": f"{analysis.truePeak:.2f}",
+        "crest": f"{analysis.crest:.2f}",
+        "engaged": f"{analysis.engaged * 100:.2f}",
+    }
+    if analysis.overshoot is not None:
+        row["overshoot"] = f"{analysis.overshoot:.2f}"
+    return row
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Analyze levels of .wav files and how often a limiter would engage."""
+
+    parser = argparse.ArgumentParser(
+        description="Measure RMS, true peak and crest factor of WAV files, "
+        "and the share of time an RMS limiter threshold is exceeded."
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="directories to browse recursively for .wav files"
+    )
+    threshold = parser.add_mutually_exclusive_group()
+    threshold.add_argument("--threshold", type=float, help="limiter threshold in dBu")
+    threshold.add_argument(
+        "--speaker", help="speaker reference, threshold computed with --ampli"
+    )
+    parser.add_argument("--ampli", help="amplifier reference")
+    parser.add_argument(
+        "--mode", choices=IMPEDANCE_MODES, default="8", help="amplifier mode"
+    )
+    parser.add_argument(
+        "--true-limit", action="store_true", help="use true threshold, not smart"
+    )
+    parser.add_argument(
+        "--full-scale",
+        type=float,
+        default=FULL_SCALE,
+        help=f"dBu level of 0 dBFS at the limiter input (default: {FULL_SCALE})",
+    )
+    parser.add_argument(
+        "--window",
+        type=float,
+        default=RMS_WINDOW,
+        help=f"RMS window in ms (default: {RMS_WINDOW})",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of analysis processes",
+    )
+    parser.add_argument("-o", "--output", help="CSV report file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    if args.speaker:
+        if not args.ampli:
+            parser.error("--speaker requires --ampli")
+        try:
+            args.threshold = compute_threshold(
+                args.speaker, args.ampli, args.mode, not args.true_limit
+            )
+        except (KeyError, ValueError) as e:
+            print(f"Cannot compute threshold: {e}", file=sys.stderr)
+            return 1
+        print(f"Limiter threshold: {args.threshold} dBu", file=sys.stderr)
+
+    start = time.perf_counter()
+    tracks = find_tracks(args.paths)
+    print(f"Found {len(tracks)} WAV files", file=sys.stderr)
+
+    analyze = partial(
+        analyze_track,
+        threshold=args.threshold,
+        fullScale=args.full_scale,
+        window=args.window,
+    )
+    output = open(args.output, "w", newline="") if args.output else sys.stdout
+    nb_errors = nb_engaged = 0
+    try:
+        writer = csv.DictWriter(output, fieldnames=COLUMNS, lineterminator="\n")
+        writer.writeheader()
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for row in pool.map(analyze, tracks):
+                writer.writerow(row)
+                # Keep report readable while a whole library is analyzed
+                output.flush()
+                if "error" in row:
+                    nb_errors += 1
+                    print(
+                        f"Cannot analyze {row['path']}: {row['error']}", file=sys.stderr
+                    )
+                elif float(row["engaged"]):
+                    nb_engaged += 1
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    total_time = time.perf_counter() - start
+    summary = f"Analyzed {len(tracks) - nb_errors} files in {total_time:.2f}s"
+    if args.threshold is not None:
+        summary += f", limiter engaged on {nb_engaged}"
+    print(f"{summary}, {nb_errors} errors", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
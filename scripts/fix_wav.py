@@ -1,59 +1,286 @@
+import argparse
 import os
+import sqlite3
+import sys
+import time
 
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
 
-# Paths to directories we will browse recursively to find all .wav
-paths = [
-    r"D:\Media\Musique\Rekordbox\Tracks",  # Elements
-    r"C:\Users\Ewael\Music\PioneerDJ\Imported from Device\Contents",  # Rekordbox
-    r"C:\Users\Ewael\Documents\Son\Thomasson\Calage",  # Calage
-    r"D:\Contents",  # USB key
-]
+# Script is run directly, make src package importable
+sys.path.insert(0, str(Path(__file__).parent.parent.resolve()))
 
+from src.riff import readWavHeader, repairWav
 
-def get_wav(dir_path: str) -> list[str]:
-    """Return list with .wav files paths."""
 
+# Default location of the scan index
+INDEX_PATH = os.path.join(os.path.expanduser("~"), ".fix_wav_index.sqlite")
+# Index schema version, stored in PRAGMA user_version
+SCHEMA_VERSION = 1
+
+
+class ScanIndex:
+    """On-disk index of header issues keyed by path, size and mtime.
+
+    A file whose size and mtime did not change since last run keeps its
+    verdict, so it does not need to be opened again.
+    """
+
+    def __init__(self, index_path: str, rebuild: bool = False) -> None:
+        """Open (or create) index and load it in memory.
+
+        An index of another schema version is only a cache, its table is
+        dropped and created again, as with rebuild.
+
+        Parameters:
+            index_path: SQLite file storing the index
+            rebuild: Forget all previous verdicts
+        """
+
+        self.connection = sqlite3.connect(index_path)
+        (version,) = self.connection.execute("PRAGMA user_version").fetchone()
+        with self.connection:
+            if version not in (0, SCHEMA_VERSION):
+                self.connection.execute("DROP TABLE IF EXISTS headers")
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS headers ("
+                "path TEXT PRIMARY KEY, size INTEGER, mtime INTEGER, issues TEXT)"
+            )
+            if rebuild:
+                self.connection.execute("DELETE FROM headers")
+            self.connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.entries = {
+            path: (size, mtime, issues)
+            for path, size, mtime, issues in self.connection.execute(
+                "SELECT path, size, mtime, issues FROM headers"
+            )
+        }
+        self.updates = {}
+
+    def lookup(self, path: str, size: int, mtime: int) -> str | None:
+        """Return cached issues for given file, None if unknown or modified."""
+
+        entry = self.entries.get(path)
+        if entry is None or entry[:2] != (size, mtime):
+            return None
+        return entry[2]
+
+    def record(self, path: str, size: int, mtime: int, issues: str) -> None:
+        """Record issues for given file."""
+
+        self.entries[path] = (size, mtime, issues)
+        self.updates[path] = (size, mtime, issues)
+
+    def prune(self, roots: list[str], seen: set[str]) -> None:
+        """Forget files under given roots that were not seen during the scan."""
+
+        prefixes = tuple(os.path.join(root, "") for root in roots)
+        gone = [p for p in self.entries if p.startswith(prefixes) and p not in seen]
+        for path in gone:
+            del self.entries[path]
+            self.updates.pop(path, None)
+        self.connection.executemany(
+            "DELETE FROM headers WHERE path = ?", [(p,) for p in gone]
+        )
+
+    def save(self) -> None:
+        """Write recorded issues in a single transaction and close index."""
+
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO headers VALUES (?, ?, ?, ?)",
+                [(p, *entry) for p, entry in self.updates.items()],
+            )
+        self.connection.close()
+
+
+def scan_dir(dir_path: str) -> tuple[list[str], list[tuple[str, int, int]]]:
+    """Return sub directories and .wav files (path, size, mtime) of given directory."""
+
+    sub_dirs = []
     tracks_wav = []
-    if os.path.exists(dir_path):
-        print(f"Searching wav in {dir_path}")
-        for root, _, files in os.walk(dir_path):
-            for file in files:
-                if file[-4:] == ".wav":
-                    tracks_wav.append(rf"{root}{os.sep}{file}")
-    return tracks_wav
-
-
-def get_unsupported(tracks_wav: list[str]) -> list[str]:
-    """Return all unsupported files in list of .wav files."""
-
-    unsupported_tracks = []
-    for track in tracks_wav:
-        with open(track, "rb") as f:
-            content = f.read(22)
-            if content[-2:] == b"\xfe\xff":
-                unsupported_tracks.append(track)
-                print(f"To fix: {track}")
-    return unsupported_tracks
-
-
-def fix_unspported(unsupported_tracks: list[str]) -> None:
-    """Fix given tracks."""
-
-    for track in unsupported_tracks:
-        print(f"Fixing {track}")
-        with open(track, "rb") as f:
-            content = list(f.read())
-        content[20] = 0x01
-        content[21] = 0x00
-        with open(track, "wb") as f:
-            f.write(bytes(content))
-            print(f"Fixed: {track}")
-
-
-wav = []
-for path in paths:
-    wav += get_wav(path)
-print(f"Found {len(wav)} WAV files")
-uns = get_unsupported(wav)
-print(f"Found {len(uns)} unsupported WAV files")
-fix_unspported(uns)
+    try:
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    sub_dirs.append(entry.path)
+                elif entry.name.lower().endswith(".wav"):
+                    stat = entry.stat()
+                    tracks_wav.append((entry.path, stat.st_size, stat.st_mtime_ns))
+    except OSError as e:
+        print(f"Cannot scan {dir_path}: {e}", file=sys.stderr)
+    return sub_dirs, tracks_wav
+
+
+def check_track(track: str) -> str | None:
+    """Return header issues of track as "code:fixable" list, None if unreadable.
+
+    Issues are joined with "," and each fixable one is flagged with ":1",
+    for instance "extensible:1,data_align:0". Empty string means valid file.
+    """
+
+    try:
+        header = readWavHeader(track)
+    except OSError as e:
+        print(f"Cannot read {track}: {e}", file=sys.stderr)
+        return None
+    return ",".join(f"{i.code}:{int(i.fixable)}" for i in header.issues)
+
+
+def parse_issues(issues: str) -> tuple[set[str], set[str]]:
+    """Return fixable and unfixable issue codes from check_track() result."""
+
+    fixable, unfixable = set(), set()
+    for issue in filter(None, issues.split(",")):
+        code, flag = issue.split(":")
+        (fixable if flag == "1" else unfixable).add(code)
+    return fixable, unfixable
+
+
+def get_issues(
+    paths: list[str], workers: int, index: ScanIndex | None = None
+) -> tuple[dict[str, int], dict[str, str]]:
+    """Scan given directories recursively and return stats and files with issues.
+
+    Directories listing and header reads are both spread on a thread pool,
+    I/O releases the GIL so slow disks are read concurrently. Files known
+    by the index with same size and mtime are not opened. Paths are
+    resolved first, so that "music", "./music" and "/home/me/music" share
+    index entries.
+    """
+
+    paths = [str(Path(path).resolve()) for path in paths]
+    stats = {"found": 0, "skipped": 0, "opened": 0}
+    tracks_issues = {}
+    seen = set()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        for path in paths:
+            if os.path.isdir(path):
+                print(f"Searching wav in {path}")
+                pending.add(pool.submit(scan_dir, path))
+            else:
+                print(f"Skipping {path}: not a directory", file=sys.stderr)
+
+        checks = {}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                sub_dirs, tracks_wav = future.result()
+                pending |= {pool.submit(scan_dir, d) for d in sub_dirs}
+                for track_stat in tracks_wav:
+                    track = track_stat[0]
+                    seen.add(track)
+                    issues = index.lookup(*track_stat) if index else None
+                    if issues is None:
+                        checks[pool.submit(check_track, track)] = track_stat
+                    else:
+                        stats["skipped"] += 1
+                        if issues:
+                            tracks_issues[track] = issues
+                stats["found"] += len(tracks_wav)
+
+        for future, (track, size, mtime) in checks.items():
+            issues = future.result()
+            if index and issues is not None:
+                index.record(track, size, mtime, issues)
+            if issues:
+                tracks_issues[track] = issues
+        stats["opened"] = len(checks)
+
+    if index:
+        index.prune([p for p in paths if os.path.isdir(p)], seen)
+    return stats, dict(sorted(tracks_issues.items()))
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Find and fix .wav files with header issues in given directories."""
+
+    parser = argparse.ArgumentParser(
+        description="Check RIFF/WAVE headers and repair them in place."
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="directories to browse recursively for .wav files"
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=min(32, (os.cpu_count() or 1) * 4),
+        help="number of scanning threads",
+    )
+    parser.add_argument(
+        "-n", "--dry-run", action="store_true", help="only list files to fix"
+    )
+    parser.add_argument(
+        "--only",
+        action="append",
+        metavar="CODE",
+        help="only fix given issue code (repeatable), e.g. --only extensible",
+    )
+    parser.add_argument(
+        "--index",
+        default=INDEX_PATH,
+        help=f"scan index file (default: {INDEX_PATH})",
+    )
+    parser.add_argument(
+        "--no-index", action="store_true", help="scan every file, without index"
+    )
+    parser.add_argument(
+        "--rebuild", action="store_true", help="forget index and scan every file"
+    )
+    args = parser.parse_args(argv)
+    only = set(args.only) if args.only else None
+
+    start = time.perf_counter()
+    try:
+        index = None if args.no_index else ScanIndex(args.index, args.rebuild)
+    except sqlite3.Error as e:
+        print(f"Cannot open index {args.index}: {e}", file=sys.stderr)
+        return 1
+    stats, tracks_issues = get_issues(args.paths, args.workers, index)
+    scan_time = time.perf_counter() - start
+
+    to_fix = []
+    for track, issues in tracks_issues.items():
+        fixable, unfixable = parse_issues(issues)
+        if only is not None:
+            fixable &= only
+        if fixable:
+            to_fix.append((track, fixable))
+            print(f"To fix: {track} ({', '.join(sorted(fixable))})")
+        if unfixable:
+            print(f"Invalid: {track} ({', '.join(sorted(unfixable))})")
+    print(f"Found {stats['found']} WAV files")
+    print(f"Found {len(to_fix)} WAV files to fix")
+
+    nb_fixed = 0
+    if not args.dry_run:
+        for track, codes in to_fix:
+            try:
+                if repairWav(track, codes):
+                    nb_fixed += 1
+                    print(f"Fixed: {track}")
+                if index:
+                    # Header changed and so did mtime, record new state
+                    stat = os.stat(track)
+                    issues = check_track(track)
+                    if issues is not None:
+                        index.record(track, stat.st_size, stat.st_mtime_ns, issues)
+            except OSError as e:
+                print(f"Cannot fix {track}: {e}", file=sys.stderr)
+    if index:
+        index.save()
+    total_time = time.perf_counter() - start
+
+    print(
+        f"Scanned {stats['found']} files in {scan_time:.2f}s "
+        f"({stats['found'] / scan_time if scan_time else 0:.0f} files/s): "
+        f"{stats['skipped']} skipped, {stats['opened']} opened, "
+        f"{nb_fixed} fixed, {total_time:.2f}s spent"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,7 @@
 from decimal import Decimal
-from math import log10
+
+from src import numeric
+from src.rounding import quantize
 
 
 class AmpGain:
@@ -21,5 +23,4 @@ class AmpGain:
         <=> gain = 20 * log10( U_out / U_in )
         """
 
-        ampGain = 20 * log10(self.voltageOut / self.voltageIn)
-        return Decimal(ampGain).quantize(Decimal(".01"))
+        return quantize(numeric.ampGain(self.voltageIn, self.voltageOut), 2)
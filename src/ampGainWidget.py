@@ -10,6 +10,7 @@ from PySide6.QtWidgets import (
 
 from src.ampGain import AmpGain
 from src.constants import BOLD_STYLESHEET
+from src.profiling import profiled
 
 
 class AmpGainWidget(QWidget):
@@ -128,6 +129,7 @@ class AmpGainWidget(QWidget):
 
         return self.ampGainWidgetName
 
+    @profiled(slot=True)
     def _updateAmpGain(self) -> None:
         """Update amplifier gain with current voltage values."""
 
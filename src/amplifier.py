@@ -1,9 +1,54 @@
+from array import array
+from enum import IntEnum
+
+
+class ImpedanceMode(IntEnum):
+    """Amplifier working modes, values are slots of Amplifier.power."""
+
+    OHM_8 = 0
+    OHM_4 = 1
+    OHM_2 = 2
+    BRIDGE_8 = 3
+    BRIDGE_4 = 4
+
+    @classmethod
+    def fromLabel(cls, label: "str | ImpedanceMode") -> "ImpedanceMode":
+        """Return mode from its label, for instance "8 (bridge)"."""
+
+        if isinstance(label, ImpedanceMode):
+            return label
+        return cls(IMPEDANCE_MODES.index(label))
+
+    @property
+    def label(self) -> str:
+        """Return mode label, as in JSON files and impedance list."""
+
+        return IMPEDANCE_MODES[self]
+
+    @property
+    def impedance(self) -> int:
+        """Return working impedance of mode in Ohm."""
+
+        return int(self.label.replace(" (bridge)", ""))
+
+    @property
+    def bridge(self) -> bool:
+        """Return True if two channels are bridged in this mode."""
+
+        return self >= ImpedanceMode.BRIDGE_8
+
+
+IMPEDANCE_MODES = ["8", "4", "2", "8 (bridge)", "4 (bridge)"]
+
+
 class Amplifier:
+    __slots__ = ("reference", "gain", "power", "outputs")
+
     def __init__(
         self,
         reference: str,
         gain: float,
-        power: dict[int, int | None],
+        power: dict[str, int | None] | list[int],
         outputs: int | None,
     ) -> None:
         """Init all attributes.
@@ -14,7 +59,7 @@ class Amplifier:
         Parameters:
             reference: Ampli complete reference, for instance "t.amp TSA 4-1300"
             gain: Ampli gain, see its documentation
-            power: Ampli power, with following structure:
+            power: Ampli power, either a dict with following structure:
                 {
                     8: 8 Ohm power
                     4: 4 Ohm power
@@ -22,10 +67,23 @@ class Amplifier:
                     8 (bridge): 8 Ohm bridged power
                     4 (bridge): 4 Ohm bridged power
                 }
+                or the five powers in ImpedanceMode order, 0 if missing
             outputs: Number of outputs
         """
 
         self.reference = reference
         self.gain = gain
-        self.power = power
+        # Five slots indexed by ImpedanceMode, 0 means missing
+        if isinstance(power, dict):
+            power = [power.get(mode) or 0 for mode in IMPEDANCE_MODES]
+        self.power = array("I", power)
         self.outputs = outputs
+
+    def getPower(self, mode: ImpedanceMode | str) -> int | None:
+        """Return RMS power in given mode, None if not supported or missing.
+
+        Parameters:
+            mode: Impedance mode or its label, for instance "4 (bridge)"
+        """
+
+        return self.power[ImpedanceMode.fromLabel(mode)] or None
@@ -0,0 +1,330 @@
+"""Streaming RMS, true peak and crest factor analysis of WAV files.
+
+Audio data is memory-mapped and converted block by block, so files of any
+size are analyzed with a constant memory footprint. Sliding-window RMS
+carries the last window of squares from block to block, and true peak is
+measured on a 4x oversampled signal (ITU-R BS.1770) whose polyphase filter
+state is carried the same way.
+
+Levels are in dBFS, converted to dBu with the level of digital full scale
+at the processor input (+18 dBu by default, EBU R68), so that windowed RMS
+can be compared with a limiter threshold from Limiter.computeTreshold().
+"""
+
+import math
+
+from typing import NamedTuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from src.riff import (
+    WAVE_FORMAT_EXTENSIBLE,
+    WAVE_FORMAT_IEEE_FLOAT,
+    WAVE_FORMAT_PCM,
+    CHUNK_HEADER_SIZE,
+    WavHeader,
+    readWavHeader,
+)
+
+
+# dBu level of 0 dBFS at the processor input, EBU R68
+FULL_SCALE = 18.0
+# Sliding RMS window (ms)
+RMS_WINDOW = 300
+# Frames converted at once
+BLOCK_SIZE = 1 << 16
+OVERSAMPLING = 4
+# Interpolation filter taps per oversampling phase
+TAPS_PER_PHASE = 12
+
+
+class TrackAnalysis(NamedTuple):
+    """Levels of one track, in dBFS of its loudest channel."""
+
+    path: str
+    sampleRate: int
+    channels: int
+    duration: float
+    rms: float
+    maxRms: float
+    peak: float
+    truePeak: float
+    threshold: float | None = None
+    engaged: float = 0.0
+    overshoot: float | None = None
+
+    @property
+    def crest(self) -> float:
+        """Return crest factor (dB), true peak over whole track RMS."""
+
+        return self.truePeak - self.rms
+
+
+def toDb(value: float) -> float:
+    """Return level (dB) of a linear value, -inf for 0."""
+
+    return 20 * math.log10(value) if value > 0 else -math.inf
+
+
+def _sampleFormat(header: WavHeader) -> tuple[int, int]:
+    """Return format tag (PCM or float) and bits per sample, raise ValueError."""
+
+    if header.dataChunk is None or not header.channels or not header.sampleRate:
+        messages = [issue.message for issue in header.issues]
+        raise ValueError(", ".join(messages) or "no audio data")
+    tag = header.formatTag
+    if tag == WAVE_FORMAT_EXTENSIBLE:
+        tag = header.subFormatTag
+    bits = header.bitsPerSample
+    if (tag, bits) not in (
+        (WAVE_FORMAT_PCM, 8),
+        (WAVE_FORMAT_PCM, 16),
+        (WAVE_FORMAT_PCM, 24),
+        (WAVE_FORMAT_PCM, 32),
+        (WAVE_FORMAT_IEEE_FLOAT, 32),
+        (WAVE_FORMAT_IEEE_FLOAT, 64),
+    ):
+        raise ValueError(f"unsupported sample format {tag} with {bits} bits")
+    return tag, bits
+
+
+def openSamples(path: str) -> tuple[WavHeader, np.ndarray]:
+    """Return header and memory-mapped raw samples of a WAV file.
+
+    Samples are (frames, channels), or (frames, channels, 3) bytes for 24
+    bits files. Truncated data chunks are mapped up to the last whole frame.
+    """
+
+    header = readWavHeader(path)
+    tag, bits = _sampleFormat(header)
+    data = header.dataChunk
+    offset = data.offset + CHUNK_HEADER_SIZE
+    frameSize = header.channels * (bits // 8)
+    frames = min(data.size, header.fileSize - offset) // frameSize
+    if tag == WAVE_FORMAT_IEEE_FLOAT:
+        dtype, shape = f"<f{bits // 8}", (frames, header.channels)
+    elif bits == 8:
+        dtype, shape = "u1", (frames, header.channels)
+    elif bits == 24:
+        dtype, shape = "u1", (frames, header.channels, 3)
+    else:
+        dtype, shape = f"<i{bits // 8}", (frames, header.channels)
+    if not frames:
+        return header, np.zeros(shape, dtype=dtype)
+    return header, np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
+def toFloat(samples: np.ndarray, bits: int) -> np.ndarray:
+    """Return raw samples of openSamples() as floats, full scale is 1."""
+
+    if samples.dtype.kind == "f":
+        return samples.astype(np.float64)
+    if bits == 8:
+        return (samples.astype(np.float64) - 128) / 128
+    if bits == 24:
+        # Bytes shifted into the top of an int32, then sign-preserving shift
+        padded = np.zeros(samples.shape[:-1] + (4,), dtype=np.uint8)
+        padded[..., 1:] = samples
+        samples = padded.view("<i4")[..., 0] >> 8
+    return samples.astype(np.float64) / 2 ** (bits - 1)
+
+
+class TruePeakMeter:
+    """Streaming true peak of multichannel blocks, oversampled by a polyphase FIR.
+
+    Interpolated samples are at most the filter gain times the input peak,
+    so segments which cannot exceed the current true peak are skipped.
+    """
+
+    # Frames filtered at once, and unit of skipped segments
+    segmentSize = 4096
+
+    def __init__(self, channels: int, oversampling: int = OVERSAMPLING) -> None:
+        """Design interpolation filter.
+
+        Parameters:
+            channels: Number of channels of blocks
+            oversampling: Oversampling factor
+        """
+
+        # scipy.signal takes about a second to import, only load it for true peak
+        from scipy.signal import firwin
+
+        taps = firwin(TAPS_PER_PHASE * oversampling, 1 / oversampling) * oversampling
+        # One column per phase, reversed to be applied on sliding windows
+        self.taps = taps.reshape(TAPS_PER_PHASE, oversampling)[::-1].copy()
+        self.gain = float(np.abs(self.taps).sum(axis=0).max())
+        self.history = np.zeros((TAPS_PER_PHASE - 1, channels))
+        self.peak = 0.0
+
+    def process(self, block: np.ndarray) -> None:
+        """Update peak with (frames, channels) block."""
+
+        signal = np.concatenate([self.history, block])
+        self.history = signal[max(0, len(signal) - TAPS_PER_PHASE + 1) :]
+        for start in range(0, len(signal) - TAPS_PER_PHASE + 1, self.segmentSize):
+            segment = signal[start : start + self.segmentSize + TAPS_PER_PHASE - 1]
+            if self.gain * max(segment.max(), -segment.min()) <= self.peak:
+                continue
+            # All phases of all frames in one product, (frames, channels, phases)
+            windows = sliding_window_view(segment, TAPS_PER_PHASE, axis=0)
+            filtered = np.tensordot(windows, self.taps, axes=1)
+            self.peak = max(self.peak, float(filtered.max()), float(-filtered.min()))
+
+    def flush(self) -> None:
+        """Update peak with the last samples still in the filter delay line."""
+
+        self.process(np.zeros((TAPS_PER_PHASE - 1, self.history.shape[1])))
+
+
+class SlidingRms:
+    """Streaming sliding-window RMS, per channel."""
+
+    def __init__(self, channels: int, window: int) -> None:
+        """Start with an empty window.
+
+        Parameters:
+            channels: Number of channels of blocks
+            window: Window length in frames
+        """
+
+        self.window = max(1, window)
+        self.tail = np.zeros((0, channels))
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Return mean square of each full window ending in block, per channel.
+
+        Cumulative sums restart on each block, from the squares of the
+        previous window only, so long files do not accumulate errors.
+        """
+
+        squares = np.concatenate([self.tail, block * block])
+        self.tail = squares[max(0, len(squares) - self.window + 1) :]
+        if len(squares) < self.window:
+            return np.zeros((0, squares.shape[1]))
+        sums = np.cumsum(squares, axis=0)
+        means = np.empty((len(squares) - self.window + 1, squares.shape[1]))
+        means[0] = sums[self.window - 1]
+        np.subtract(sums[self.window :], sums[: -self.window], out=means[1:])
+        means /= self.window
+        # Cumulative sums can go slightly below 0 in silences
+        return np.maximum(means, 0.0, out=means)
+
+
+def blockMeanSquares(block: np.ndarray, frames: int) -> np.ndarray:
+    """Return mean square of the loudest channel per block of given frames.
+
+    The last block is averaged over its own length when it is not whole.
+
+    Parameters:
+        block: (frames, channels) float samples
+        frames: Frames per block
+    """
+
+    whole = len(block) // frames * frames
+    squares = (block[:whole] * block[:whole]).reshape(-1, frames, block.shape[1])
+    means = squares.mean(axis=1).max(axis=1, initial=0.0)
+    if whole < len(block):
+        rest = block[whole:]
+        last = np.einsum("ij,ij->j", rest, rest).max() / len(rest)
+        means = np.append(means, last)
+    return means
+
+
+def wavMeanSquares(
+    path: str, blockTime: float, blockSize: int = BLOCK_SIZE
+) -> tuple[np.ndarray, float]:
+    """Return blockMeanSquares() of a whole WAV file, read block by block.
+
+    Raise ValueError for files which are not readable PCM or float WAV.
+
+    Parameters:
+        path: WAV file path
+        blockTime: Block duration (ms), rounded to whole frames
+        blockSize: Frames converted at once, rounded to whole blocks
+
+    Returns:
+        Mean squares (full scale is 1) and actual block duration (s)
+    """
+
+    header, samples = openSamples(path)
+    frames = max(1, round(header.sampleRate * blockTime / 1000))
+    step = max(1, blockSize // frames) * frames
+    means = [
+        blockMeanSquares(
+            toFloat(samples[start : start + step], header.bitsPerSample), frames
+        )
+        for start in range(0, len(samples), step)
+    ]
+    del samples
+    return np.concatenate(means) if means else np.zeros(0), frames / header.sampleRate
+
+
+def analyzeWav(
+    path: str,
+    threshold: float | None = None,
+    fullScale: float = FULL_SCALE,
+    window: float = RMS_WINDOW,
+    blockSize: int = BLOCK_SIZE,
+) -> TrackAnalysis:
+    """Return levels of a WAV file and how often an RMS limiter would engage.
+
+    Raise ValueError for files which are not readable PCM or float WAV.
+
+    Parameters:
+        path: WAV file path
+        threshold: Limiter threshold (dBu), e.g. from Limiter.computeTreshold()
+        fullScale: Level (dBu) of 0 dBFS at the limiter input
+        window: RMS window (ms)
+        blockSize: Frames converted at once
+    """
+
+    header, samples = openSamples(path)
+    bits = header.bitsPerSample
+    channels = header.channels
+    rms = SlidingRms(channels, round(header.sampleRate * window / 1000))
+    truePeak = TruePeakMeter(channels)
+    # Limiter engages when windowed mean square is above threshold one
+    limit = None if threshold is None else 10 ** ((threshold - fullScale) / 10)
+
+    squares = np.zeros(channels)
+    peak = maxMeanSquare = 0.0
+    windows = engaged = 0
+    for start in range(0, len(samples), blockSize):
+        block = toFloat(samples[start : start + blockSize], bits)
+        squares += np.einsum("ij,ij->j", block, block)
+        peak = max(peak, float(np.abs(block).max()))
+        truePeak.process(block)
+
+        # Loudest channel of each window, as on linked limiters
+        meanSquares = rms.process(block).max(axis=1, initial=0.0)
+        if len(meanSquares):
+            windows += len(meanSquares)
+            maxMeanSquare = max(maxMeanSquare, float(meanSquares.max()))
+            if limit is not None:
+                engaged += int(np.count_nonzero(meanSquares > limit))
+    frames = len(samples)
+    del samples
+    truePeak.flush()
+
+    meanSquare = float(squares.max(initial=0.0)) / max(1, frames)
+    if not windows:
+        # Track shorter than the window, one window over the whole track
+        windows = 1
+        maxMeanSquare = meanSquare
+        engaged = int(limit is not None and meanSquare > limit)
+    maxRms = toDb(math.sqrt(maxMeanSquare))
+    return TrackAnalysis(
+        path=path,
+        sampleRate=header.sampleRate,
+        channels=channels,
+        duration=frames / header.sampleRate if header.sampleRate else 0.0,
+        rms=toDb(math.sqrt(meanSquare)),
+        maxRms=maxRms,
+        peak=toDb(peak),
+        truePeak=toDb(max(peak, truePeak.peak)),
+        threshold=threshold,
+        engaged=engaged / windows,
+        overshoot=None if threshold is None else maxRms + fullScale - threshold,
+    )
@@ -0,0 +1,288 @@
+"""Equipment catalog loaded once from json/*.json, with lookup indexes.
+
+Parsed and indexed catalog is cached in a pickle file keyed on JSON files
+mtime and size, so only the first load after an edit parses JSON.
+"""
+
+import json
+import os
+import pickle
+
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+
+import numpy as np
+
+from src.amplifier import IMPEDANCE_MODES, Amplifier, ImpedanceMode
+from src.profiling import profiled
+from src.speaker import Speaker
+
+
+AMPLIFIERS_FILE = "amplifiers.json"
+SPEAKERS_FILE = "speakers.json"
+JSON_PATH = Path(__file__).parent.parent.resolve() / "json"
+CACHE_FILE = ".catalog.pickle"
+# Bump when Catalog layout changes so that old caches are ignored
+CACHE_VERSION = 2
+
+
+class Catalog:
+    """Amplifiers and speakers sorted by reference, with indexes."""
+
+    def __init__(
+        self, amplifiers: dict[str, Amplifier], speakers: dict[str, Speaker]
+    ) -> None:
+        """Store devices and build all indexes.
+
+        Parameters:
+            amplifiers: Amplifiers by reference, sorted by reference
+            speakers: Speakers by reference, sorted by reference
+        """
+
+        self.amplifiers = amplifiers
+        self.speakers = speakers
+
+        self.speakersByImpedance: dict[int, list[Speaker]] = {}
+        self.speakersByBaffle: dict[str, list[Speaker]] = {}
+        for speaker in speakers.values():
+            self.speakersByImpedance.setdefault(speaker.impedance, []).append(speaker)
+            self.speakersByBaffle.setdefault(speaker.baffle, []).append(speaker)
+
+        self.amplifiersByGain: dict[float, list[Amplifier]] = {}
+        for ampli in amplifiers.values():
+            self.amplifiersByGain.setdefault(ampli.gain, []).append(ampli)
+
+        # Sorted (power, reference) lists for range queries with bisect
+        self._speakersByPower = sorted(
+            (speaker.power, speaker.reference) for speaker in speakers.values()
+        )
+        self._amplifiersByPower = {
+            mode: sorted(
+                (ampli.power[mode], ampli.reference)
+                for ampli in amplifiers.values()
+                if ampli.power[mode]
+            )
+            for mode in ImpedanceMode
+        }
+
+        # Struct of arrays, in reference order, for vectorized filtering
+        self._speakerReferences = list(speakers)
+        self.speakerResponses = np.array(
+            [
+                (
+                    np.nan if s.responseLow is None else s.responseLow,
+                    np.nan if s.responseHigh is None else s.responseHigh,
+                )
+                for s in speakers.values()
+            ],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        self.amplifierPowers = np.array(
+            [ampli.power for ampli in amplifiers.values()], dtype=np.uint32
+        ).reshape(-1, len(ImpedanceMode))
+
+    def getAmplifier(self, reference: str) -> Amplifier:
+        """Return amplifier with given reference, raise KeyError if unknown."""
+
+        return self.amplifiers[reference]
+
+    def getSpeaker(self, reference: str) -> Speaker:
+        """Return speaker with given reference, raise KeyError if unknown."""
+
+        return self.speakers[reference]
+
+    def findSpeakers(
+        self,
+        impedance: int | None = None,
+        baffle: str | None = None,
+        minPower: int | None = None,
+        maxPower: int | None = None,
+        freq: float | None = None,
+    ) -> list[Speaker]:
+        """Return speakers matching all given criteria, sorted by reference.
+
+        Parameters:
+            impedance: Speaker impedance
+            baffle: Baffle type, either "OPEN" or "CLOSED"
+            minPower: Minimum AES power (included)
+            maxPower: Maximum AES power (included)
+            freq: Frequency in Hz that must be in range of usage
+        """
+
+        references = None
+        if impedance is not None:
+            references = {
+                s.reference for s in self.speakersByImpedance.get(impedance, [])
+            }
+        if baffle is not None:
+            byBaffle = {s.reference for s in self.speakersByBaffle.get(baffle, [])}
+            references = byBaffle if references is None else references & byBaffle
+        if minPower is not None or maxPower is not None:
+            byPower = _powerRange(self._speakersByPower, minPower, maxPower)
+            references = byPower if references is None else references & byPower
+        if freq is not None:
+            low, high = self.speakerResponses.T
+            # nan (unknown range) compares False and is left out
+            covering = {
+                self._speakerReferences[i]
+                for i in np.flatnonzero((low <= freq) & (freq <= high))
+            }
+            references = covering if references is None else references & covering
+        if references is None:
+            return list(self.speakers.values())
+        return [self.speakers[ref] for ref in sorted(references)]
+
+    def findAmplifiers(
+        self,
+        gain: float | None = None,
+        mode: ImpedanceMode | str | None = None,
+        minPower: int | None = None,
+        maxPower: int | None = None,
+    ) -> list[Amplifier]:
+        """Return amplifiers matching all given criteria, sorted by reference.
+
+        Parameters:
+            gain: Amplifier gain in dB
+            mode: Impedance mode or its label, defaults to "8"
+                for power criteria and to any supported mode otherwise
+            minPower: Minimum RMS power in given mode (included)
+            maxPower: Maximum RMS power in given mode (included)
+        """
+
+        references = None
+        if gain is not None:
+            references = {a.reference for a in self.amplifiersByGain.get(gain, [])}
+        if mode is not None or minPower is not None or maxPower is not None:
+            mode = ImpedanceMode.fromLabel(mode or ImpedanceMode.OHM_8)
+            byPower = _powerRange(self._amplifiersByPower[mode], minPower, maxPower)
+            references = byPower if references is None else references & byPower
+        if references is None:
+            return list(self.amplifiers.values())
+        return [self.amplifiers[ref] for ref in sorted(references)]
+
+
+def _powerRange(
+    byPower: list[tuple[int, str]], minPower: int | None, maxPower: int | None
+) -> set[str]:
+    """Return references whose power is in given range of a sorted list."""
+
+    start = 0 if minPower is None else bisect_left(byPower, (minPower, ""))
+    end = (
+        len(byPower)
+        if maxPower is None
+        else bisect_right(byPower, (maxPower, "\uffff"))
+    )
+    return {reference for _, reference in byPower[start:end]}
+
+
+@profiled()
+def getAmplisSpecs(path: str | Path) -> dict[str, Amplifier]:
+    """Return amplifiers specs from given JSON file.
+
+    For instance:
+        {
+            "reference": "Admark K420",
+            "gain": 41,
+            "power": {
+                "8": 2000, [Optional]
+                "4": 3400, [Optional]
+                "2": 4760, [Optional]
+                "8 (bridge)": 6800, [Optional]
+                "4 (bridge)": 9520 [Optional]
+            },
+            "outputs": 4 [Optional]
+        }
+    """
+
+    with open(path) as f:
+        amplisData = json.load(f)
+        amplisData.sort(key=lambda x: x["reference"])
+    amplis = {}
+    for ampli in amplisData:
+        amplis[ampli["reference"]] = Amplifier(
+            reference=ampli["reference"],
+            gain=ampli["gain"],
+            power={mode: ampli["power"].get(mode) for mode in IMPEDANCE_MODES},
+            outputs=ampli.get("outputs"),
+        )
+    return amplis
+
+
+@profiled()
+def getSpeakersSpecs(path: str | Path) -> dict[str, Speaker]:
+    """Return speakers specs from given JSON file.
+
+    No optional values here.
+    """
+
+    with open(path) as f:
+        speakersData = json.load(f)
+        speakersData.sort(key=lambda x: x["reference"])
+    speakers = {}
+    for spk in speakersData:
+        speakers[spk["reference"]] = Speaker(
+            reference=spk["reference"],
+            impedance=spk["impedance"],
+            power=spk["power"],
+            response=spk["response"],
+            baffle=spk["baffle"],
+        )
+    return speakers
+
+
+_catalogs: dict[Path, Catalog] = {}
+
+
+@profiled()
+def loadCatalog(jsonPath: str | Path = JSON_PATH, useCache: bool = True) -> Catalog:
+    """Return catalog of given JSON directory, loaded once per process.
+
+    Parameters:
+        jsonPath: Directory with amplifiers.json and speakers.json
+        useCache: Read and write compiled cache next to JSON files
+    """
+
+    jsonPath = Path(jsonPath)
+    if jsonPath in _catalogs:
+        return _catalogs[jsonPath]
+
+    amplifiersPath = jsonPath / AMPLIFIERS_FILE
+    speakersPath = jsonPath / SPEAKERS_FILE
+    cachePath = jsonPath / CACHE_FILE
+    key = (CACHE_VERSION, _fileKey(amplifiersPath), _fileKey(speakersPath))
+
+    catalog = None
+    if useCache:
+        try:
+            with open(cachePath, "rb") as f:
+                cachedKey, cachedCatalog = pickle.load(f)
+            if cachedKey == key:
+                catalog = cachedCatalog
+        except Exception:
+            # No cache or unusable one (truncated, or pickled by an older
+            # version whose modules or classes changed), parse JSON below
+            pass
+
+    if catalog is None:
+        catalog = Catalog(
+            getAmplisSpecs(amplifiersPath), getSpeakersSpecs(speakersPath)
+        )
+        if useCache:
+            try:
+                # Write then rename so that concurrent loads never see half a file
+                tmpPath = cachePath.with_suffix(f".{os.getpid()}.tmp")
+                with open(tmpPath, "wb") as f:
+                    pickle.dump((key, catalog), f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpPath, cachePath)
+            except OSError:
+                pass  # Read-only install, cache is only an optimization
+
+    _catalogs[jsonPath] = catalog
+    return catalog
+
+
+def _fileKey(path: Path) -> tuple[int, int]:
+    """Return (mtime, size) of given file, used to invalidate cache."""
+
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,152 @@
+from typing import Callable
+
+from PySide6.QtCore import (
+    QAbstractListModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    QSortFilterProxyModel,
+    Qt,
+)
+from PySide6.QtWidgets import QLineEdit, QListView, QVBoxLayout, QWidget
+
+from src.amplifier import IMPEDANCE_MODES, Amplifier
+from src.profiling import profiled
+from src.speaker import Speaker
+
+
+OHM = "\u2126"
+
+
+def amplifierToolTip(ampli: Amplifier) -> str:
+    """Return tooltip of given amplifier."""
+
+    powers = {mode: ampli.getPower(mode) for mode in IMPEDANCE_MODES}
+    return (
+        f"{ampli.reference}\n\n"
+        + f"gain: {ampli.gain}dB\n"
+        + "".join(
+            f"{'bridge' if 'bridge' in mode else 'power'} "
+            + f"({mode.replace(' (bridge)', '')}{OHM}): "
+            + f"{str(power) + 'W' if power else 'Missing'}\n"
+            for mode, power in powers.items()
+        )
+        + f"ouputs number: {ampli.outputs}"
+    )
+
+
+def speakerToolTip(speaker: Speaker) -> str:
+    """Return tooltip of given speaker."""
+
+    return (
+        f"{speaker.reference}\n\n"
+        + f"impedance: {speaker.impedance}{OHM}\n"
+        + f"power ({speaker.impedance}{OHM}): {speaker.power}W\n"
+        + f"frequency response: {speaker.response} Hz\n"
+        + f"baffle: {speaker.baffle}"
+    )
+
+
+class DeviceListModel(QAbstractListModel):
+    """Read-only list model of catalog devices, tooltips are built on demand."""
+
+    def __init__(
+        self,
+        devices: list[Amplifier] | list[Speaker],
+        toolTip: Callable[[Amplifier | Speaker], str],
+        parent: QWidget = None,
+    ) -> None:
+        """Initiate all attributes.
+
+        Parameters:
+            devices: Amplifiers or speakers, in display order
+            toolTip: Function building the tooltip of one device
+            parent: Parent object
+        """
+
+        super().__init__(parent)
+        self.devices = devices
+        self.toolTip = toolTip
+
+    def rowCount(
+        self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()
+    ) -> int:
+        """Return number of devices, the list has no children."""
+
+        return 0 if parent.isValid() else len(self.devices)
+
+    def data(
+        self,
+        index: QModelIndex | QPersistentModelIndex,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> object:
+        """Return reference, tooltip or device object of given row."""
+
+        if not index.isValid():
+            return None
+        device = self.devices[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return device.reference
+        if role == Qt.ItemDataRole.ToolTipRole:
+            return self.toolTip(device)
+        if role == Qt.ItemDataRole.UserRole:
+            return device
+        return None
+
+
+class DeviceListView(QWidget):
+    """Search box above a filtered list of catalog devices."""
+
+    @profiled()
+    def __init__(
+        self,
+        devices: list[Amplifier] | list[Speaker],
+        toolTip: Callable[[Amplifier | Speaker], str],
+        parent: QWidget = None,
+    ) -> None:
+        """Create search box, models and view, first device is selected.
+
+        Parameters:
+            devices: Amplifiers or speakers, in display order
+            toolTip: Function building the tooltip of one device
+            parent: Parent widget
+        """
+
+        super().__init__(parent)
+
+        self.model = DeviceListModel(devices, toolTip, self)
+        self.proxyModel = QSortFilterProxyModel(self)
+        self.proxyModel.setSourceModel(self.model)
+        self.proxyModel.setFilterCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+
+        self.searchEdit = QLineEdit()
+        self.searchEdit.setPlaceholderText("Search...")
+        self.searchEdit.setClearButtonEnabled(True)
+        self.searchEdit.textChanged.connect(self.proxyModel.setFilterFixedString)
+
+        self.listView = QListView()
+        # All rows have the same height, no per-row size hint is computed
+        self.listView.setUniformItemSizes(True)
+        self.listView.setModel(self.proxyModel)
+        self.listView.setCurrentIndex(self.proxyModel.index(0, 0))
+
+        # Longest reference, measured once instead of asking every row
+        fontMetrics = self.listView.fontMetrics()
+        textWidth = max(
+            (fontMetrics.horizontalAdvance(device.reference) for device in devices),
+            default=0,
+        )
+        self.listView.setMinimumWidth(textWidth + self.listView.frameWidth() * 10)
+        self.listView.setMinimumHeight(
+            self.listView.sizeHintForRow(0) * 10 + 10 * self.listView.frameWidth()
+        )
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.searchEdit)
+        layout.addWidget(self.listView)
+
+    def currentReference(self) -> str | None:
+        """Return reference of selected device, None if filtered out."""
+
+        index = self.listView.currentIndex()
+        return index.data() if index.isValid() else None
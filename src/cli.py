@@ -0,0 +1,1460 @@
+"""Headless command line entry point, never imports Qt.
+
+Usage:
+    python -m src.cli limiter [INPUT] [--format csv|json|jsonl]
+    python -m src.cli ampgain [INPUT]
+    python -m src.cli convert [INPUT]
+    python -m src.cli rig [INPUT] [--objective headroom|amps]
+    python -m src.cli delay [INPUT] (--reference X,Y[,Z] | --direction X,Y[,Z])
+    python -m src.cli table [--bands N | --freqs F,.. | --range A:B:S] [--temperatures T]
+    python -m src.cli presets [DIRECTORY] [--min-threshold DBU] [--max-low-pass HZ]
+    python -m src.cli writepresets [INPUT] [--base PRS] [--output-dir DIRECTORY]
+    python -m src.cli thermal (TRACK | --pink SECONDS) --ampli REF [--speaker REF]
+    python -m src.cli limit TRACK... (--threshold DBU | --ampli REF [--speaker REF])
+    python -m src.cli bands TRACK (--box NAME | --speaker REF...) [--ampli REF]
+    python -m src.cli monitor [WAV | -] [--threshold DBU | --ampli REF --speaker REF]
+
+INPUT is a CSV (with header), JSON array or JSON lines file, "-" or nothing
+for stdin. Results are streamed to stdout as CSV or JSON lines. The table
+command takes no input and prints a whole conversion table, the presets
+command lists outputs of the DSP408 preset files of a directory and the
+thermal, limit and bands commands run catalog speakers (heating, limiter
+gain reduction, levels of each way) with WAV tracks and the monitor command
+prints live levels of a sound card input, a WAV file played in real time or
+raw float32 frames from stdin.
+
+Commands import what they run when they run, only argparse defaults are
+imported at the top: limiter, ampgain and convert never load scipy, which
+takes about a second to import.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from decimal import Decimal
+from itertools import islice
+from pathlib import Path
+from typing import Iterable, Iterator, TextIO
+
+from src.ampGain import AmpGain
+from src.amplifier import IMPEDANCE_MODES, ImpedanceMode
+from src.audioAnalysis import FULL_SCALE, RMS_WINDOW
+from src.converter import (
+    freqToDistance,
+    freqToTime,
+    distanceToTime,
+    distanceToFreq,
+    timeToFreq,
+    timeToDistance,
+    computeC,
+    BAND_FRACTIONS,
+    SOUND_SPEED_MODELS,
+    bandFrequencies,
+    conversionTable,
+    formatTable,
+    writeTableCsv,
+)
+from src.catalog import loadCatalog
+from src.delay import (
+    EAR_HEIGHT,
+    AlignmentMap,
+    Source,
+    alignmentDelays,
+    endFireDelays,
+    listenerGrid,
+)
+from src.limiter import computeTresholds, rawTresholds, speakerTresholds
+from src.multiband import CROSSOVER_ORDER
+from src.preset import (
+    OUTPUTS,
+    PRESETS_PATH,
+    PresetLibrary,
+    patchPreset,
+    thresholdFromRaw,
+    thresholdToRaw,
+)
+from src.processorProfile import PROFILES, getProfile, profileTresholds
+from src.profiling import enable, span
+from src.rounding import quantize
+from src.rigSolver import OBJECTIVES
+from src.soundSpeed import DEFAULT_HUMIDITY, STANDARD_PRESSURE
+from src.rmsLimiter import ATTACK, HOP, RELEASE
+from src.thermal import BLOCK_TIME
+
+
+# Input columns of limiter rows, raw values or catalog references
+LIMITER_INPUT_COLUMNS = [
+    "speaker",
+    "ampli",
+    "mode",
+    "impedance",
+    "speakerBaffle",
+    "speakerPower",
+    "ampliGain",
+    "ampliPower",
+]
+LIMITER_COLUMNS = [
+    "smartThreshold",
+    "smartSpkMax",
+    "smartAmpMax",
+    "trueThreshold",
+    "trueSpkMax",
+    "trueAmpMax",
+]
+AMPGAIN_COLUMNS = ["ampGain"]
+CONVERT_COLUMNS = [
+    "c",
+    "freq",
+    "distance",
+    "distance2",
+    "distance4",
+    "time",
+    "time2",
+    "time4",
+]
+DEFAULT_TEMPERATURE = 20
+DEFAULT_BASE_PRESET = PRESETS_PATH / "2023" / "20231213_reset.prs"
+
+
+def readRows(stream: TextIO, fmt: str) -> Iterator[dict]:
+    """Yield input rows as dicts from a CSV, JSON array or JSON lines stream."""
+
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "jsonl":
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        yield from json.load(stream)
+
+
+class RowWriter:
+    """Write result rows to a stream as CSV or JSON lines."""
+
+    def __init__(
+        self, stream: TextIO, fmt: str, columns: list[str] | None = None
+    ) -> None:
+        """Initiate all attributes.
+
+        Parameters:
+            stream: Output stream, usually stdout
+            fmt: Output format, either "csv" or "jsonl"
+            columns: CSV columns every row may have, besides the first row ones
+        """
+
+        self.stream = stream
+        self.fmt = fmt
+        self.columns = columns or []
+        self.csvWriter = None
+
+    def write(self, row: dict) -> None:
+        """Write one row, CSV header is taken from the first row and columns.
+
+        Columns missing from a row are left empty, columns of later rows
+        which are not in the header are dropped.
+        """
+
+        if self.fmt == "jsonl":
+            self.stream.write(json.dumps(row) + "\n")
+            return
+        if self.csvWriter is None:
+            fieldnames = list(row)
+            fieldnames += [column for column in self.columns if column not in row]
+            self.csvWriter = csv.DictWriter(
+                self.stream,
+                fieldnames=fieldnames,
+                restval="",
+                extrasaction="ignore",
+                lineterminator="\n",
+            )
+            self.csvWriter.writeheader()
+        self.csvWriter.writerow(row)
+
+
+def _number(value: object, default: float = 0.0) -> float:
+    """Return value as float, default when empty or missing."""
+
+    if value is None or value == "":
+        return default
+    return float(str(value).replace(",", "."))
+
+
+def _positive(row: dict, name: str) -> float:
+    """Return column as a positive float, 0 when empty or missing.
+
+    Raise ValueError for values <= 0, which would silently give nan results.
+    """
+
+    value = _number(row.get(name))
+    if value <= 0 and row.get(name) not in (None, ""):
+        raise ValueError(f"{name} must be positive, not {row[name]}")
+    return value
+
+
+def _resolveDevices(row: dict) -> dict:
+    """Return row with speaker and ampli values filled from catalog references.
+
+    Rows with speaker, ampli and mode (e.g. "4 (bridge)") columns get their
+    values exactly as the limiter tab would, explicit values are kept.
+    """
+
+    if not (row.get("speaker") or row.get("ampli")):
+        return row
+    catalog = loadCatalog()
+    mode = str(row.get("mode") or row.get("impedance") or "8")
+    impedance = int(mode.replace(" (bridge)", ""))
+    values = {"impedance": impedance}
+    if row.get("speaker"):
+        speaker = catalog.getSpeaker(row["speaker"])
+        values["speakerBaffle"] = speaker.baffle
+        # Example: F221 cannot be 8 Ohm
+        if impedance <= speaker.impedance:
+            values["speakerPower"] = int(
+                speaker.power * (speaker.impedance / impedance)
+            )
+    if row.get("ampli"):
+        ampli = catalog.getAmplifier(row["ampli"])
+        values["ampliGain"] = ampli.gain
+        values["ampliPower"] = ampli.getPower(mode)
+    return {**values, **{k: v for k, v in row.items() if v not in (None, "")}}
+
+
+def limiterRows(
+    rows: Iterable[dict],
+    chunkSize: int,
+    sensitivity: float,
+    processors: list[str] | None = None,
+) -> Iterator[dict]:
+    """Yield rows extended with smart and true thresholds.
+
+    Expected columns: impedance, speakerBaffle, speakerPower, ampliGain, ampliPower,
+    or speaker, ampli and mode references from the catalog. Rows are evaluated by chunks in one vectorized pass per chunk.
+    Impossible rows (missing values) get empty results, as in the GUI.
+    Raise ValueError for impedance or powers <= 0.
+    Each processor profile adds a column with the smart threshold in its units.
+    """
+
+    profiles = [getProfile(name) for name in processors or []]
+
+    rows = iter(rows)
+    while chunk := [_resolveDevices(row) for row in islice(rows, chunkSize)]:
+        impedance = [_positive(row, "impedance") for row in chunk]
+        speakerBaffle = [row.get("speakerBaffle", "CLOSED") for row in chunk]
+        speakerPower = [_positive(row, "speakerPower") for row in chunk]
+        ampliGain = [_number(row.get("ampliGain")) for row in chunk]
+        ampliPower = [_positive(row, "ampliPower") for row in chunk]
+
+        # Smart limit on first half, true limit on second half
+        spkMax, ampMax, threshold = computeTresholds(
+            impedance * 2,
+            speakerBaffle * 2,
+            speakerPower * 2,
+            ampliGain * 2,
+            ampliPower * 2,
+            [True] * len(chunk) + [False] * len(chunk),
+            sensitivity,
+        )
+        if profiles:
+            _, _, raw = rawTresholds(
+                impedance,
+                speakerBaffle,
+                speakerPower,
+                ampliGain,
+                ampliPower,
+                True,
+                sensitivity,
+            )
+            processorThresholds = profileTresholds(raw, profiles)
+
+        for i, row in enumerate(chunk):
+            j = i + len(chunk)
+            if not (impedance[i] and speakerPower[i] and ampliPower[i]):
+                yield {
+                    **row,
+                    **dict.fromkeys(LIMITER_COLUMNS, ""),
+                    **{profile.name: "" for profile in profiles},
+                }
+                continue
+            yield {
+                **row,
+                "smartThreshold": f"{threshold[i]:.1f}",
+                "smartSpkMax": f"{spkMax[i]:.2f}",
+                "smartAmpMax": f"{ampMax[i]:.2f}",
+                "trueThreshold": f"{threshold[j]:.1f}",
+                "trueSpkMax": f"{spkMax[j]:.2f}",
+                "trueAmpMax": f"{ampMax[j]:.2f}",
+                **{
+                    profile.name: f"{processorThresholds[k, i]:.{profile.places}f}"
+                    for k, profile in enumerate(profiles)
+                },
+            }
+
+
+def ampGainRows(rows: Iterable[dict]) -> Iterator[dict]:
+    """Yield rows extended with amplifier gain.
+
+    Expected columns: voltageIn, voltageOut.
+    """
+
+    for row in rows:
+        voltageIn = _number(row.get("voltageIn"))
+        voltageOut = _number(row.get("voltageOut"))
+        if not (voltageIn and voltageOut):
+            yield {**row, **dict.fromkeys(AMPGAIN_COLUMNS, "")}
+            continue
+        yield {**row, "ampGain": f"{AmpGain(voltageIn, voltageOut).computeAmpGain()}"}
+
+
+def convertRows(rows: Iterable[dict], model: str = "linear") -> Iterator[dict]:
+    """Yield rows extended with frequency, lambda and period conversions.
+
+    Expected columns: one of freq (Hz), distance (m) or time (ms), and
+    optionally c (m.s-1) or temperature (C), defaults to 20C. The "cramer"
+    model also reads humidity (%) and pressure (hPa) columns when present.
+    """
+
+    for row in rows:
+        if _number(row.get("c")):
+            c = _number(row.get("c"))
+        else:
+            c = computeC(
+                _number(row.get("temperature"), DEFAULT_TEMPERATURE),
+                _number(row.get("humidity"), DEFAULT_HUMIDITY),
+                _number(row.get("pressure"), STANDARD_PRESSURE),
+                model,
+            )
+
+        if _number(row.get("freq")):
+            freq = _number(row.get("freq"))
+            distance = freqToDistance(freq, c)
+            time = freqToTime(freq, c)
+        elif _number(row.get("distance")):
+            distance = _number(row.get("distance"))
+            time = distanceToTime(distance, c)
+            freq = distanceToFreq(distance, c)
+        elif _number(row.get("time")):
+            time = _number(row.get("time"))
+            distance = timeToDistance(time, c)
+            freq = timeToFreq(time)
+        else:
+            yield {**row, **dict.fromkeys(CONVERT_COLUMNS, "")}
+            continue
+
+        # Same by 2 and by 4 values as the converter tab
+        distance2 = Decimal(float(distance) / 2).quantize(Decimal(".01"))
+        distance4 = Decimal(float(distance) / 4).quantize(Decimal(".01"))
+
+        yield {
+            **row,
+            "c": f"{c}",
+            "freq": f"{freq}",
+            "distance": f"{distance}",
+            "distance2": f"{distance2}",
+            "distance4": f"{distance4}",
+            "time": f"{time}",
+            "time2": f"{distanceToTime(float(distance2), c)}",
+            "time4": f"{distanceToTime(float(distance4), c)}",
+        }
+
+
+def delayRows(
+    rows: Iterable[dict],
+    reference: np.ndarray | None,
+    direction: np.ndarray | None,
+    c: float,
+    grid: np.ndarray | None = None,
+) -> Iterator[dict]:
+    """Yield delay of each source, or arrival spread over a listener grid.
+
+    Expected columns: name, x, y and optionally z (m) and offset (ms) added
+    to the computed delay. Sources are aligned at the reference listener, or
+    steered toward direction (end-fire). With a grid, one row per listener
+    is yielded instead, with spread between first and last arrivals.
+    """
+
+    rows = list(rows)
+    sources = [
+        Source(
+            row.get("name") or f"source{i + 1}",
+            tuple(_number(row.get(axis)) for axis in ("x", "y", "z")),
+            _number(row.get("offset")),
+        )
+        for i, row in enumerate(rows)
+    ]
+    if direction is not None:
+        delays = endFireDelays(sources, direction, c)
+    else:
+        delays = alignmentDelays(sources, reference, c)
+
+    if grid is None:
+        for row, source, delay in zip(rows, sources, delays):
+            yield {**row, "name": source.name, "delay": f"{quantize(delay, 3)}"}
+        return
+
+    alignmentMap = AlignmentMap(sources, grid)
+    spread = alignmentMap.spread(delays, c).ravel()
+    first = alignmentMap.firstArrivals(delays, c).ravel()
+    for (x, y, z), listenerSpread, index in zip(
+        alignmentMap.listeners.reshape(-1, 3).tolist(), spread.tolist(), first
+    ):
+        yield {
+            "x": f"{x:.2f}",
+            "y": f"{y:.2f}",
+            "z": f"{z:.2f}",
+            "spread": f"{listenerSpread:.3f}",
+            "first": sources[index].name,
+        }
+
+
+def _presetPath(directory: str, preset: str) -> Path:
+    """Return path of a preset written in directory, raise ValueError if outside."""
+
+    path = Path(preset)
+    if path.is_absolute() or ".." in path.parts or path.drive:
+        raise ValueError(f"preset {preset} is not a plain name inside {directory}")
+    return Path(directory) / path
+
+
+def writePresetRows(
+    rows: Iterable[dict],
+    base: str,
+    directory: str,
+    smartLimit: bool,
+    sensitivity: float,
+    overwrite: bool = False,
+    chunkSize: int = 1024,
+) -> Iterator[dict]:
+    """Write presets with limiter thresholds, yield one row per patched output.
+
+    Expected columns: preset (file written in directory), output (1 to 8),
+    limiter columns (speaker, ampli and mode references or raw values) and
+    optionally name (output name) and base (preset to start from). Thresholds
+    are computed by limiterRows(), then every preset is written once.
+    Presets which cannot be written are reported on stderr and skipped,
+    existing files are kept unless overwrite, base presets always.
+    Raise ValueError for preset names outside directory.
+    """
+
+    column = "smartThreshold" if smartLimit else "trueThreshold"
+    presets: dict[tuple[str, str], dict[int, tuple[float, str | None]]] = {}
+    results = []
+    for row in limiterRows(rows, chunkSize, sensitivity):
+        preset = str(row.get("preset") or "")
+        output = int(_number(row.get("output")))
+        if not preset or not 1 <= output <= OUTPUTS:
+            raise ValueError(f"preset and output (1 to {OUTPUTS}) are required")
+        if not row[column]:
+            raise ValueError(f"no threshold for {preset} output {output}")
+        if not preset.lower().endswith(".prs"):
+            preset += ".prs"
+        _presetPath(directory, preset)
+        outputs = presets.setdefault((preset, row.get("base") or base), {})
+        outputs[output - 1] = (float(row[column]), row.get("name") or None)
+        results.append((preset, output, row[column]))
+
+    basePaths = {Path(basePath).resolve() for _, basePath in presets}
+    bases: dict[str, bytes] = {}
+    written = set()
+    for (preset, basePath), outputs in presets.items():
+        path = _presetPath(directory, preset)
+        try:
+            if path.resolve() in basePaths:
+                raise FileExistsError(f"{path} is a base preset")
+            if not overwrite and path.exists():
+                raise FileExistsError(f"{path} exists, use --overwrite to replace it")
+            if basePath not in bases:
+                with open(basePath, "rb") as f:
+                    bases[basePath] = f.read()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(patchPreset(bases[basePath], outputs))
+        except OSError as e:
+            print(f"Cannot write preset {preset}: {e}", file=sys.stderr)
+            continue
+        written.add(preset)
+
+    for preset, output, threshold in results:
+        if preset not in written:
+            continue
+        yield {
+            "preset": preset,
+            "output": output,
+            "threshold": threshold,
+            "written": f"{thresholdFromRaw(thresholdToRaw(float(threshold))):.1f}",
+        }
+
+
+def rigRows(
+    rows: Iterable[dict], objective: str, minMargin: float | None
+) -> Iterator[dict]:
+    """Yield channel assignments of a whole rig.
+
+    Expected columns: speaker or ampli catalog reference, and count (number of
+    boxes or amplifier units, defaults to 1). Raise ValueError when the
+    amplifiers cannot drive all speakers.
+    """
+
+    from src.rigSolver import RigSolver
+
+    catalog = loadCatalog()
+    speakers: dict[str, int] = {}
+    amplis: dict[str, int] = {}
+    for row in rows:
+        count = int(_number(row.get("count") or 1))
+        if row.get("speaker"):
+            speakers[row["speaker"]] = speakers.get(row["speaker"], 0) + count
+        if row.get("ampli"):
+            amplis[row["ampli"]] = amplis.get(row["ampli"], 0) + count
+
+    solver = RigSolver(
+        [(catalog.getSpeaker(ref), n) for ref, n in speakers.items()],
+        [(catalog.getAmplifier(ref), n) for ref, n in amplis.items()],
+    )
+    solution = solver.solve(objective, minMargin)
+    for assignment in solution.assignments:
+        yield {
+            **assignment._asdict(),
+            "channels": "+".join(map(str, assignment.channels)),
+            "threshold": f"{assignment.threshold:.1f}",
+            "margin": f"{assignment.margin:.1f}",
+        }
+
+
+def parseValues(text: str) -> np.ndarray:
+    """Return values of "A:B:STEP" (B included) or "X,Y,..." text."""
+
+    text = text.replace(" ", "")
+    if ":" in text:
+        start, stop, step = (float(value) for value in text.split(":"))
+        if step <= 0:
+            raise ValueError(f"step must be positive in {text!r}")
+        # Stop is included, up to float errors on the step
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(value) for value in text.split(",")])
+
+
+def parseGrid(text: str, size: list[int], height: float) -> np.ndarray:
+    """Return listener grid of "X0:X1,Y0:Y1" text."""
+
+    try:
+        (x0, x1), (y0, y1) = (
+            (float(value) for value in bounds.split(":"))
+            for bounds in text.replace(" ", "").split(",")
+        )
+    except ValueError:
+        raise ValueError(f"grid must be 'X0:X1,Y0:Y1', not {text!r}") from None
+    return listenerGrid((x0, x1), (y0, y1), tuple(size), height)
+
+
+def tableCommand(args: argparse.Namespace) -> int:
+    """Write conversion table of requested frequencies and temperatures."""
+
+    try:
+        temperatures = parseValues(args.temperatures)
+        if args.freqs:
+            freqs = parseValues(args.freqs)
+        else:
+            freqs = bandFrequencies(args.bands, args.low, args.high)
+    except ValueError as e:
+        print(f"Invalid values: {e}", file=sys.stderr)
+        return 1
+
+    with span("cli.table"):
+        table = conversionTable(
+            freqs, temperatures, args.humidity, args.pressure, args.model
+        )
+        if args.output_format == "csv":
+            writeTableCsv(table, sys.stdout)
+        else:
+            writer = RowWriter(sys.stdout, args.output_format)
+            for row in zip(*formatTable(table).values()):
+                writer.write(dict(zip(table, row)))
+    return 0
+
+
+def presetsCommand(args: argparse.Namespace) -> int:
+    """Write outputs of the presets of a directory matching given criteria."""
+
+    with span("cli.presets"):
+        library = PresetLibrary(args.directory)
+        for error in library.errors:
+            print(f"Skipped {error}", file=sys.stderr)
+        writer = RowWriter(sys.stdout, args.output_format)
+        for preset, output in library.find(
+            args.min_threshold,
+            args.max_threshold,
+            args.max_low_pass,
+            args.min_high_pass,
+            args.name,
+        ):
+            writer.write(
+                {
+                    "preset": str(Path(preset.path).relative_to(library.directory)),
+                    "output": output.index + 1,
+                    "name": output.name,
+                    "threshold": f"{output.threshold:.1f}",
+                    "gain": f"{output.gain:.1f}",
+                    "highPass": f"{output.crossover.highPass:.0f}",
+                    "lowPass": f"{output.crossover.lowPass:.0f}",
+                    "delay": output.delay,
+                    "phase": int(output.phase),
+                }
+            )
+    return 0
+
+
+def _drivenSpeakers(references: list[str] | None, mode: str) -> list:
+    """Return catalog speakers of given references, all usable in mode by default."""
+
+    catalog = loadCatalog()
+    if references:
+        return [catalog.getSpeaker(reference) for reference in references]
+    impedance = ImpedanceMode.fromLabel(mode).impedance
+    return [
+        speaker
+        for speaker in catalog.speakers.values()
+        if speaker.impedance >= impedance
+    ]
+
+
+def limitCommand(args: argparse.Namespace) -> int:
+    """Write gain reduction of limiters of speakers (or one threshold) over tracks."""
+
+    from src.rmsLimiter import LimiterSettings, limitTracks
+
+    if (args.threshold is None) == (args.ampli is None):
+        print("Give either --threshold or --ampli", file=sys.stderr)
+        return 1
+    try:
+        if args.threshold is None:
+            speakers = _drivenSpeakers(args.speaker, args.mode)
+            names = [speaker.reference for speaker in speakers]
+            thresholds = speakerTresholds(
+                speakers,
+                loadCatalog().getAmplifier(args.ampli),
+                args.mode,
+                not args.true_limit,
+            )
+        else:
+            names, thresholds = [""], [args.threshold]
+    except KeyError as e:
+        print(f"Unknown catalog reference: {e}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(f"Invalid values: {e}", file=sys.stderr)
+        return 1
+    settings = [
+        LimiterSettings(
+            float(threshold),
+            args.attack,
+            args.release,
+            args.knee,
+            args.ratio,
+            args.window,
+        )
+        for threshold in thresholds
+    ]
+
+    writer = RowWriter(sys.stdout, args.output_format)
+    with span("cli.limit"):
+        for track in limitTracks(
+            args.tracks,
+            settings,
+            args.workers,
+            fullScale=args.full_scale,
+            hop=args.hop,
+        ):
+            if track.error:
+                print(f"Cannot read {track.path}: {track.error}", file=sys.stderr)
+                continue
+            for name, summary in zip(names, track.summaries):
+                writer.write(
+                    {
+                        "track": track.path,
+                        "speaker": name,
+                        "threshold": f"{summary.settings.threshold:.1f}",
+                        "maxReduction": f"{summary.maxReduction:.2f}",
+                        "meanReduction": f"{summary.meanReduction:.2f}",
+                        "limited": f"{summary.limited * 100:.2f}",
+                    }
+                )
+    return 0
+
+
+def bandsCommand(args: argparse.Namespace) -> int:
+    """Write levels of each way of a multi-way box over a track."""
+
+    from src.multiband import analyzeBands, boxWays, wayTresholds
+
+    if not (args.box or args.speaker):
+        print("Give --box or --speaker", file=sys.stderr)
+        return 1
+    try:
+        catalog = loadCatalog()
+        if args.box:
+            speakers = boxWays(catalog.speakers.values())[args.box]
+        else:
+            speakers = [catalog.getSpeaker(reference) for reference in args.speaker]
+        thresholds = None
+        if args.ampli:
+            thresholds = wayTresholds(
+                speakers, catalog.getAmplifier(args.ampli), not args.true_limit
+            )
+        with span("cli.bands"):
+            bands = analyzeBands(
+                args.track,
+                speakers,
+                thresholds,
+                args.full_scale,
+                args.window,
+                args.order,
+            )
+    except KeyError as e:
+        print(f"Unknown catalog reference: {e}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(f"Invalid values: {e}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"Cannot read track: {e}", file=sys.stderr)
+        return 1
+
+    writer = RowWriter(sys.stdout, args.output_format)
+    for band in bands:
+        writer.write(
+            {
+                "speaker": band.speaker,
+                "low": "" if band.low is None else f"{band.low:g}",
+                "high": "" if band.high is None else f"{band.high:g}",
+                "rms": f"{band.rms:.2f}",
+                "maxRms": f"{band.maxRms:.2f}",
+                "share": f"{band.share:.2f}",
+                "threshold": "" if band.threshold is None else f"{band.threshold:.1f}",
+                "engaged": f"{band.engaged * 100:.2f}",
+                "overshoot": "" if band.overshoot is None else f"{band.overshoot:.2f}",
+            }
+        )
+    return 0
+
+
+def thermalCommand(args: argparse.Namespace) -> int:
+    """Write heating of speakers driven by an amplifier with a track or pink noise."""
+
+    from src.thermal import pinkMeanSquares, simulateSpeakers, wavMeanSquares
+
+    if (args.track is None) == (args.pink is None):
+        print("Give either a track or --pink duration", file=sys.stderr)
+        return 1
+    try:
+        catalog = loadCatalog()
+        ampli = catalog.getAmplifier(args.ampli)
+        speakers = _drivenSpeakers(args.speaker, args.mode)
+        with span("cli.thermal"):
+            if args.track is None:
+                meanSquares, blockTime = pinkMeanSquares(
+                    args.pink, args.level, args.block
+                )
+            else:
+                meanSquares, blockTime = wavMeanSquares(args.track, args.block)
+            results = simulateSpeakers(
+                meanSquares,
+                blockTime,
+                speakers,
+                ampli,
+                args.mode,
+                args.threshold,
+                not args.true_limit,
+                args.attack,
+                args.release,
+                args.full_scale,
+            )
+    except KeyError as e:
+        print(f"Unknown catalog reference: {e}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(f"Invalid values: {e}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"Cannot read track: {e}", file=sys.stderr)
+        return 1
+
+    writer = RowWriter(sys.stdout, args.output_format)
+    for result in results:
+        writer.write(
+            {
+                "speaker": result.speaker,
+                "threshold": f"{result.threshold:.1f}",
+                "meanPower": f"{result.meanPower:.1f}",
+                "maxPower": f"{result.maxPower:.1f}",
+                "maxRise": f"{result.maxRise:.1f}",
+                "finalRise": f"{result.finalRise:.1f}",
+                "compression": f"{result.compression:.2f}",
+                "limited": f"{result.limited * 100:.2f}",
+            }
+        )
+    return 0
+
+
+def monitorCommand(args: argparse.Namespace) -> int:
+    """Write live levels of an input every interval, against a limiter threshold."""
+
+    from src.audioAnalysis import openSamples
+    from src.liveMonitor import FileSource, LiveMonitor, SoundCardSource
+
+    if args.threshold is not None and args.ampli:
+        print("Give either --threshold or --ampli", file=sys.stderr)
+        return 1
+    if bool(args.ampli) != bool(args.speaker):
+        print("Give --ampli with --speaker", file=sys.stderr)
+        return 1
+    try:
+        threshold = args.threshold
+        if args.ampli:
+            catalog = loadCatalog()
+            threshold = float(
+                speakerTresholds(
+                    [catalog.getSpeaker(args.speaker)],
+                    catalog.getAmplifier(args.ampli),
+                    args.mode,
+                    not args.true_limit,
+                    args.sensitivity,
+                )[0]
+            )
+        if args.source is None:
+            sampleRate, channels = SoundCardSource.defaultSettings(args.device)
+            sampleRate, channels = args.rate or sampleRate, args.channels or channels
+        elif args.source == "-":
+            sampleRate, channels = args.rate or 48000, args.channels or 2
+        else:
+            header, _ = openSamples(args.source)
+            sampleRate, channels = header.sampleRate, header.channels
+        monitor = LiveMonitor(
+            sampleRate, channels, args.full_scale, args.sensitivity, args.window
+        )
+        monitor.threshold = threshold
+        if args.source is None:
+            source = SoundCardSource(monitor, args.device)
+        elif args.source == "-":
+            source = FileSource(monitor, stream=sys.stdin.buffer)
+        else:
+            source = FileSource(monitor, args.source, loop=args.loop)
+    except KeyError as e:
+        print(f"Unknown catalog reference: {e}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(f"Invalid values: {e}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"Cannot read track: {e}", file=sys.stderr)
+        return 1
+    except ImportError:
+        print(
+            "Sound card input needs sounddevice (pip install sounddevice)",
+            file=sys.stderr,
+        )
+        return 1
+
+    writer = RowWriter(sys.stdout, args.output_format)
+    monitor.start()
+    source.start()
+    start = time.perf_counter()
+    try:
+        while args.duration is None or time.perf_counter() - start < args.duration:
+            time.sleep(args.interval)
+            levels = monitor.levels()
+            writer.write(
+                {
+                    "time": f"{time.perf_counter() - start:.2f}",
+                    "rms": f"{levels.rms:.2f}",
+                    "peak": f"{levels.peak:.2f}",
+                    "maxRms": f"{levels.maxRms:.2f}",
+                    "maxPeak": f"{levels.maxPeak:.2f}",
+                    "over": f"{levels.over * 100:.2f}",
+                    "dropped": levels.dropped,
+                }
+            )
+            sys.stdout.flush()
+            # File played once or stream closed, and its last steps measured
+            if (
+                isinstance(source, FileSource)
+                and not source.running
+                and monitor.ring.available() < monitor.stepFrames
+            ):
+                break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.stop()
+        monitor.stop()
+    return 0
+
+
+def _guessFormat(path: str, fmt: str | None) -> str:
+    """Return input format from option or file extension, CSV by default."""
+
+    if fmt:
+        return fmt
+    if path.endswith(".jsonl"):
+        return "jsonl"
+    if path.endswith(".json"):
+        return "json"
+    return "csv"
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Parse arguments, stream input rows through the command and write results."""
+
+    parser = argparse.ArgumentParser(
+        prog="python -m src.cli",
+        description="Headless LimiterRMS computations.",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="1",
+        metavar="TRACE",
+        help="print timings on exit and write a Chrome trace (default: "
+        "limiterRMS-trace.json)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help in (
+        ("limiter", "compute smart and true limiter thresholds"),
+        ("ampgain", "compute amplifier gain from measured voltages"),
+        ("convert", "convert frequencies, lambdas and periods"),
+        ("rig", "assign speakers to amplifier channels for a whole rig"),
+    ):
+        subparser = subparsers.add_parser(name, help=help)
+        subparser.add_argument(
+            "input", nargs="?", default="-", help="input file, '-' for stdin"
+        )
+        subparser.add_argument(
+            "--format", choices=["csv", "json", "jsonl"], help="input format"
+        )
+        subparser.add_argument(
+            "--output-format",
+            choices=["csv", "jsonl"],
+            default="csv",
+            help="output format (default: csv)",
+        )
+    subparsers.choices["limiter"].add_argument(
+        "--chunk-size", type=int, default=1024, help="rows per vectorized pass"
+    )
+    subparsers.choices["limiter"].add_argument(
+        "--sensitivity", type=float, default=0.775, help="sensitivity in V"
+    )
+    subparsers.choices["limiter"].add_argument(
+        "--processor",
+        action="append",
+        choices=list(PROFILES),
+        help="add smart threshold in units of this processor (repeatable)",
+    )
+    subparsers.choices["rig"].add_argument(
+        "--objective",
+        choices=OBJECTIVES,
+        default="headroom",
+        help="maximize minimum margin or minimize amplifiers (default: headroom)",
+    )
+    subparsers.choices["rig"].add_argument(
+        "--min-margin", type=float, help="minimum margin in dB on every channel"
+    )
+    delay = subparsers.add_parser(
+        "delay", help="align sources and map arrival spread over the audience"
+    )
+    delay.add_argument(
+        "input", nargs="?", default="-", help="input file, '-' for stdin"
+    )
+    delay.add_argument(
+        "--format", choices=["csv", "json", "jsonl"], help="input format"
+    )
+    alignment = delay.add_mutually_exclusive_group(required=True)
+    alignment.add_argument(
+        "--reference", metavar="X,Y[,Z]", help="listener position to align on (m)"
+    )
+    alignment.add_argument(
+        "--direction", metavar="X,Y[,Z]", help="end-fire steering direction"
+    )
+    delay.add_argument(
+        "--temperature",
+        type=float,
+        default=DEFAULT_TEMPERATURE,
+        help="temperature in C (default: 20)",
+    )
+    delay.add_argument(
+        "--grid",
+        metavar="X0:X1,Y0:Y1",
+        help="print arrival spread over this audience area instead of delays",
+    )
+    delay.add_argument(
+        "--grid-size",
+        type=int,
+        nargs=2,
+        default=[100, 100],
+        metavar=("ROWS", "COLUMNS"),
+        help="listeners along y and x (default: 100 100)",
+    )
+    delay.add_argument(
+        "--height",
+        type=float,
+        default=EAR_HEIGHT,
+        help=f"listener height in m (default: {EAR_HEIGHT})",
+    )
+    delay.add_argument(
+        "--output-format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="output format (default: csv)",
+    )
+    subparsers.choices["convert"].add_argument(
+        "--model",
+        choices=SOUND_SPEED_MODELS,
+        default="linear",
+        help="speed of sound model (default: linear)",
+    )
+    table = subparsers.add_parser(
+        "table", help="print lambdas and periods of bands across temperatures"
+    )
+    freqs = table.add_mutually_exclusive_group()
+    freqs.add_argument(
+        "--bands",
+        type=int,
+        choices=BAND_FRACTIONS,
+        default=3,
+        help="1/N octave bands (default: 3)",
+    )
+    freqs.add_argument(
+        "--freqs", metavar="F", help="frequencies, 'A:B:STEP' range or 'X,Y,...'"
+    )
+    table.add_argument("--low", type=float, default=20, help="lowest band (Hz)")
+    table.add_argument("--high", type=float, default=20000, help="highest band (Hz)")
+    table.add_argument(
+        "--temperatures",
+        default=str(DEFAULT_TEMPERATURE),
+        metavar="T",
+        help="temperatures (C), 'A:B:STEP' range or 'X,Y,...' (default: 20)",
+    )
+    table.add_argument(
+        "--model",
+        choices=SOUND_SPEED_MODELS,
+        default="linear",
+        help="speed of sound model (default: linear)",
+    )
+    table.add_argument(
+        "--humidity",
+        type=float,
+        default=DEFAULT_HUMIDITY,
+        help=f"relative humidity in %%, cramer model (default: {DEFAULT_HUMIDITY})",
+    )
+    table.add_argument(
+        "--pressure",
+        type=float,
+        default=STANDARD_PRESSURE,
+        help=f"pressure in hPa, cramer model (default: {STANDARD_PRESSURE})",
+    )
+    table.add_argument(
+        "--output-format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="output format (default: csv)",
+    )
+    writePresets = subparsers.add_parser(
+        "writepresets", help="write limiter thresholds into DSP408 preset files"
+    )
+    writePresets.add_argument(
+        "input", nargs="?", default="-", help="input file, '-' for stdin"
+    )
+    writePresets.add_argument(
+        "--format", choices=["csv", "json", "jsonl"], help="input format"
+    )
+    writePresets.add_argument(
+        "--base",
+        default=DEFAULT_BASE_PRESET,
+        help="preset patched when rows have no base column "
+        "(default: resources/presets/2023/20231213_reset.prs)",
+    )
+    writePresets.add_argument(
+        "--output-dir", default=".", help="directory of written presets"
+    )
+    writePresets.add_argument(
+        "--true-limit",
+        action="store_true",
+        help="write true thresholds instead of smart ones",
+    )
+    writePresets.add_argument(
+        "--overwrite",
+        action="store_true",
+        help="replace existing presets (base presets are always kept)",
+    )
+    writePresets.add_argument(
+        "--sensitivity", type=float, default=0.775, help="sensitivity in V"
+    )
+    writePresets.add_argument(
+        "--output-format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="output format (default: csv)",
+    )
+    presets = subparsers.add_parser(
+        "presets", help="list outputs of DSP408 preset files (*.prs)"
+    )
+    presets.add_argument(
+        "directory",
+        nargs="?",
+        default=PRESETS_PATH,
+        help="directory searched recursively (default: resources/presets)",
+    )
+    presets.add_argument(
+        "--min-threshold", type=float, metavar="DBU", help="lowest threshold"
+    )
+    presets.add_argument(
+        "--max-threshold", type=float, metavar="DBU", help="highest threshold"
+    )
+    presets.add_argument(
+        "--max-low-pass", type=float, metavar="HZ", help="e.g. 200 for subs"
+    )
+    presets.add_argument(
+        "--min-high-pass", type=float, metavar="HZ", help="e.g. 1000 for highs"
+    )
+    presets.add_argument("--name", help="part of output name, case insensitive")
+    presets.add_argument(
+        "--output-format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="output format (default: csv)",
+    )
+    thermal = subparsers.add_parser(
+        "thermal", help="simulate voice coil heating by a track behind the limiter"
+    )
+    thermal.add_argument("track", nargs="?", help="WAV file played")
+    thermal.add_argument(
+        "--pink", type=float, metavar="SECONDS", help="play pink noise instead"
+    )
+    thermal.add_argument(
+        "--level",
+        type=float,
+        default=-12.0,
+        metavar="DBFS",
+        help="pink noise RMS level (default: -12)",
+    )
+    thermal.add_argument("--ampli", required=True, help="amplifier reference")
+    thermal.add_argument(
+        "--mode", choices=IMPEDANCE_MODES, default="8", help="amplifier mode"
+    )
+    thermal.add_argument(
+        "--speaker",
+        action="append",
+        help="speaker reference (repeatable, default: all usable in mode)",
+    )
+    thermal.add_argument(
+        "--threshold",
+        type=float,
+        metavar="DBU",
+        help="limiter threshold of all speakers (default: computed per speaker)",
+    )
+    thermal.add_argument(
+        "--true-limit",
+        action="store_true",
+        help="compute true thresholds instead of smart ones",
+    )
+    thermal.add_argument(
+        "--attack",
+        type=float,
+        default=ATTACK,
+        metavar="MS",
+        help=f"limiter attack (default: {ATTACK})",
+    )
+    thermal.add_argument(
+        "--release",
+        type=float,
+        default=RELEASE,
+        metavar="MS",
+        help=f"limiter release (default: {RELEASE})",
+    )
+    thermal.add_argument(
+        "--block",
+        type=float,
+        default=BLOCK_TIME,
+        metavar="MS",
+        help=f"power measurement block (default: {BLOCK_TIME})",
+    )
+    thermal.add_argument(
+        "--full-scale",
+        type=float,
+        default=FULL_SCALE,
+        metavar="DBU",
+        help=f"level of 0 dBFS at the limiter input (default: {FULL_SCALE})",
+    )
+    thermal.add_argument(
+        "--output-format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="output format (default: csv)",
+    )
+    limit = subparsers.add_parser(
+        "limit", help="simulate RMS limiters over tracks, with gain reduction"
+    )
+    limit.add_argument("tracks", nargs="+", help="WAV files played")
+    limit.add_argument(
+        "--threshold", type=float, metavar="DBU", help="threshold of one limiter"
+    )
+    limit.add_argument("--ampli", help="amplifier reference, one limiter per speaker")
+    limit.add_argument(
+        "--mode", choices=IMPEDANCE_MODES, default="8", help="amplifier mode"
+    )
+    limit.add_argument(
+        "--speaker",
+        action="append",
+        help="speaker reference (repeatable, default: all usable in mode)",
+    )
+    limit.add_argument(
+        "--true-limit",
+        action="store_true",
+        help="compute true thresholds instead of smart ones",
+    )
+    limit.add_argument(
+        "--attack",
+        type=float,
+        default=ATTACK,
+        metavar="MS",
+        help=f"attack (default: {ATTACK})",
+    )
+    limit.add_argument(
+        "--release",
+        type=float,
+        default=RELEASE,
+        metavar="MS",
+        help=f"release (default: {RELEASE})",
+    )
+    limit.add_argument(
+        "--knee", type=float, default=0.0, metavar="DB", help="knee width"
+    )
+    limit.add_argument(
+        "--ratio",
+        type=float,
+        default=float("inf"),
+        help="compression ratio (default: inf, a limiter)",
+    )
+    limit.add_argument(
+        "--window",
+        type=float,
+        default=RMS_WINDOW,
+        metavar="MS",
+        help=f"RMS window (default: {RMS_WINDOW})",
+    )
+    limit.add_argument(
+        "--hop",
+        type=float,
+        default=HOP,
+        metavar="MS",
+        help=f"control period (default: {HOP})",
+    )
+    limit.add_argument(
+        "--full-scale",
+        type=float,
+        default=FULL_SCALE,
+        metavar="DBU",
+        help=f"level of 0 dBFS at the limiter input (default: {FULL_SCALE})",
+    )
+    limit.add_argument(
+        "-j", "--workers", type=int, help="processes (default: one per core)"
+    )
+    limit.add_argument(
+        "--output-format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="output format (default: csv)",
+    )
+    bands = subparsers.add_parser(
+        "bands", help="measure levels of each way of a multi-way box over a track"
+    )
+    bands.add_argument("track", help="WAV file played")
+    bands.add_argument("--box", help='multi-way box, e.g. "Eric Audio LA8C"')
+    bands.add_argument(
+        "--speaker", action="append", help="way speaker reference (repeatable)"
+    )
+    bands.add_argument(
+        "--ampli", help="amplifier reference, for the threshold of each way"
+    )
+    bands.add_argument(
+        "--true-limit",
+        action="store_true",
+        help="compute true thresholds instead of smart ones",
+    )
+    bands.add_argument(
+        "--order",
+        type=int,
+        default=CROSSOVER_ORDER,
+        help=f"Linkwitz-Riley crossover order (default: {CROSSOVER_ORDER})",
+    )
+    bands.add_argument(
+        "--window",
+        type=float,
+        default=RMS_WINDOW,
+        metavar="MS",
+        help=f"RMS window (default: {RMS_WINDOW})",
+    )
+    bands.add_argument(
+        "--full-scale",
+        type=float,
+        default=FULL_SCALE,
+        metavar="DBU",
+        help=f"level of 0 dBFS at the limiter input (default: {FULL_SCALE})",
+    )
+    bands.add_argument(
+        "--output-format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="output format (default: csv)",
+    )
+    monitor = subparsers.add_parser(
+        "monitor", help="print live RMS and peak levels of an input, in dBu"
+    )
+    monitor.add_argument(
+        "source",
+        nargs="?",
+        help='WAV file played in real time, "-" for raw float32 frames on '
+        "stdin (default: sound card input, needs sounddevice)",
+    )
+    monitor.add_argument("--device", help="sound card input device")
+    monitor.add_argument(
+        "--rate", type=int, help="sample rate of stdin or sound card (Hz)"
+    )
+    monitor.add_argument("--channels", type=int, help="channels of stdin or sound card")
+    monitor.add_argument(
+        "--loop", action="store_true", help="play WAV file again once finished"
+    )
+    monitor.add_argument(
+        "--threshold", type=float, metavar="DBU", help="limiter threshold"
+    )
+    monitor.add_argument(
+        "--ampli", help="amplifier reference, for the threshold of --speaker"
+    )
+    monitor.add_argument("--speaker", help="speaker reference")
+    monitor.add_argument(
+        "--mode", choices=IMPEDANCE_MODES, default="8", help="amplifier mode"
+    )
+    monitor.add_argument(
+        "--true-limit",
+        action="store_true",
+        help="compute true threshold instead of smart one",
+    )
+    monitor.add_argument(
+        "--sensitivity",
+        type=float,
+        default=0.775,
+        help="sensitivity in volts (default: 0.775)",
+    )
+    monitor.add_argument(
+        "--window",
+        type=float,
+        default=RMS_WINDOW,
+        metavar="MS",
+        help=f"RMS window (default: {RMS_WINDOW})",
+    )
+    monitor.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        metavar="SECONDS",
+        help="delay between two rows (default: 0.5)",
+    )
+    monitor.add_argument(
+        "--duration", type=float, metavar="SECONDS", help="stop after duration"
+    )
+    monitor.add_argument(
+        "--full-scale",
+        type=float,
+        default=FULL_SCALE,
+        metavar="DBU",
+        help=f"level of 0 dBFS at the limiter input (default: {FULL_SCALE})",
+    )
+    monitor.add_argument(
+        "--output-format",
+        choices=["csv", "jsonl"],
+        default="csv",
+        help="output format (default: csv)",
+    )
+    args = parser.parse_args(argv)
+    if args.profile:
+        enable(None if args.profile == "1" else args.profile)
+    commands = {
+        "table": tableCommand,
+        "presets": presetsCommand,
+        "thermal": thermalCommand,
+        "limit": limitCommand,
+        "bands": bandsCommand,
+        "monitor": monitorCommand,
+    }
+    try:
+        return commands.get(args.command, rowsCommand)(args)
+    except BrokenPipeError:
+        # Reader of stdout left early (e.g. head), drop the remaining rows
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+
+def rowsCommand(args: argparse.Namespace) -> int:
+    """Stream input rows through a row command and write its results."""
+
+    fmt = _guessFormat(args.input, args.format)
+    try:
+        stream = sys.stdin if args.input == "-" else open(args.input, newline="")
+    except OSError as e:
+        print(f"Cannot read input: {e}", file=sys.stderr)
+        return 1
+    try:
+        rows = readRows(stream, fmt)
+        if args.command == "limiter":
+            results = limiterRows(
+                rows, args.chunk_size, args.sensitivity, args.processor
+            )
+        elif args.command == "delay":
+            results = delayRows(
+                rows,
+                args.reference and parseValues(args.reference),
+                args.direction and parseValues(args.direction),
+                computeC(args.temperature),
+                args.grid and parseGrid(args.grid, args.grid_size, args.height),
+            )
+        elif args.command == "writepresets":
+            results = writePresetRows(
+                rows,
+                args.base,
+                args.output_dir,
+                not args.true_limit,
+                args.sensitivity,
+                args.overwrite,
+            )
+        elif args.command == "rig":
+            results = rigRows(rows, args.objective, args.min_margin)
+        elif args.command == "ampgain":
+            results = ampGainRows(rows)
+        else:
+            results = convertRows(rows, args.model)
+
+        columns = None
+        if args.command == "limiter":
+            columns = LIMITER_INPUT_COLUMNS + LIMITER_COLUMNS + (args.processor or [])
+        writer = RowWriter(sys.stdout, args.output_format, columns)
+        with span(f"cli.{args.command}"):
+            for result in results:
+                writer.write(result)
+    except KeyError as e:
+        print(f"Unknown catalog reference: {e}", file=sys.stderr)
+        return 1
+    except ValueError as e:
+        print(f"Invalid values: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
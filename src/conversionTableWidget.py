@@ -0,0 +1,354 @@
+import numpy as np
+
+from PySide6.QtCore import (
+    QAbstractTableModel,
+    QModelIndex,
+    QPersistentModelIndex,
+    Qt,
+    QTimer,
+)
+from PySide6.QtGui import QDoubleValidator
+from PySide6.QtWidgets import (
+    QComboBox,
+    QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QLineEdit,
+    QPushButton,
+    QTableView,
+    QVBoxLayout,
+    QWidget,
+)
+
+from src.constants import BOLD_STYLESHEET, FIXED_WIDTH
+from src.converter import (
+    BAND_FRACTIONS,
+    SOUND_SPEED_MODELS,
+    TABLE_COLUMNS,
+    bandFrequencies,
+    conversionTable,
+    writeTableCsv,
+)
+from src.profiling import profiled
+from src.soundSpeed import DEFAULT_HUMIDITY, STANDARD_PRESSURE
+
+
+# Header of each table column
+COLUMN_TITLES = {
+    "temperature": "T (℃)",
+    "c": "c (m.s-1)",
+    "freq": "Freq (Hz)",
+    "distance": "Lambda (m)",
+    "distance2": "Lambda/2 (m)",
+    "distance4": "Lambda/4 (m)",
+    "time": "Period (ms)",
+    "time2": "Period/2 (ms)",
+    "time4": "Period/4 (ms)",
+}
+
+
+class ConversionTableModel(QAbstractTableModel):
+    """Read-only table model over conversion table columns.
+
+    Values are only formatted when a cell is shown, so huge tables cost
+    nothing more than their arrays.
+    """
+
+    def __init__(self, parent: QWidget = None) -> None:
+        """Start with an empty table."""
+
+        super().__init__(parent)
+        self.names = list(TABLE_COLUMNS)
+        self.table = {name: np.empty(0) for name in self.names}
+
+    def setTable(self, table: dict[str, np.ndarray]) -> None:
+        """Replace all rows by given table columns."""
+
+        self.beginResetModel()
+        self.table = table
+        self.endResetModel()
+
+    def rowCount(
+        self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()
+    ) -> int:
+        """Return number of rows, the table has no children."""
+
+        return 0 if parent.isValid() else len(self.table["freq"])
+
+    def columnCount(
+        self, parent: QModelIndex | QPersistentModelIndex = QModelIndex()
+    ) -> int:
+        """Return number of columns, the table has no children."""
+
+        return 0 if parent.isValid() else len(self.names)
+
+    def data(
+        self,
+        index: QModelIndex | QPersistentModelIndex,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> object:
+        """Return formatted value of given cell."""
+
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            name = self.names[index.column()]
+            return f"{self.table[name][index.row()]:.{TABLE_COLUMNS[name]}f}"
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def headerData(
+        self,
+        section: int,
+        orientation: Qt.Orientation,
+        role: int = Qt.ItemDataRole.DisplayRole,
+    ) -> object:
+        """Return column titles, rows have no header."""
+
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return COLUMN_TITLES[self.names[section]]
+        return None
+
+
+class ConversionTableWidget(QWidget):
+    """Conversion table widget for associated tab."""
+
+    conversionTableWidgetName = "Band tables"
+    rangeText = "Range"
+    defaultBands = 3
+    defaultLow = 20
+    defaultHigh = 20000
+    defaultStep = 10
+    defaultTemperatures = (10, 30, 5)
+    # Delay in ms without input change before table is rebuilt
+    updateDelay = 40
+
+    def __init__(self, parent: QWidget = None) -> None:
+        """Create band and temperature inputs above the table."""
+
+        super().__init__(parent)
+
+        # Main tab widget
+        self.conversionTableWidget = QWidget(parent)
+
+        freqValidator = QDoubleValidator()
+        freqValidator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        freqValidator.setRange(0, 40000)
+        freqValidator.setDecimals(2)
+        temperatureValidator = QDoubleValidator()
+        temperatureValidator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        temperatureValidator.setRange(-100, 100)
+        temperatureValidator.setDecimals(2)
+
+        # Frequencies: standard bands or linear range
+        self.bandsComboBox = QComboBox()
+        for fraction in BAND_FRACTIONS:
+            self.bandsComboBox.addItem(f"1/{fraction} octave", fraction)
+        self.bandsComboBox.addItem(self.rangeText, None)
+        self.bandsComboBox.setCurrentIndex(BAND_FRACTIONS.index(self.defaultBands))
+        self.low = getLineEdit(f"{self.defaultLow}", freqValidator)
+        self.high = getLineEdit(f"{self.defaultHigh}", freqValidator)
+        self.step = getLineEdit(f"{self.defaultStep}", freqValidator)
+        self.step.setEnabled(False)
+
+        # Temperature sweep
+        start, stop, step = self.defaultTemperatures
+        self.temperatureStart = getLineEdit(f"{start}", temperatureValidator)
+        self.temperatureStop = getLineEdit(f"{stop}", temperatureValidator)
+        self.temperatureStep = getLineEdit(f"{step}", temperatureValidator)
+
+        # Speed of sound model, humidity and pressure are only used by Cramer's
+        humidityValidator = QDoubleValidator()
+        humidityValidator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        humidityValidator.setRange(0, 100)
+        humidityValidator.setDecimals(1)
+        pressureValidator = QDoubleValidator()
+        pressureValidator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        pressureValidator.setRange(300, 1200)
+        pressureValidator.setDecimals(2)
+        self.modelComboBox = QComboBox()
+        self.modelComboBox.addItems(SOUND_SPEED_MODELS)
+        self.humidity = getLineEdit(f"{DEFAULT_HUMIDITY}", humidityValidator)
+        self.pressure = getLineEdit(f"{STANDARD_PRESSURE}", pressureValidator)
+        self.humidity.setEnabled(False)
+        self.pressure.setEnabled(False)
+
+        self.exportButton = QPushButton("Export CSV...")
+        self.exportButton.clicked.connect(self._exportCsv)
+        self.info = QLabel()
+
+        self.model = ConversionTableModel(self)
+        self.tableView = QTableView()
+        self.tableView.setModel(self.model)
+        self.tableView.verticalHeader().setVisible(False)
+        # Fixed sizes, no cell is measured when the table changes
+        self.tableView.verticalHeader().setDefaultSectionSize(
+            self.tableView.fontMetrics().height() + 6
+        )
+        self.tableView.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+
+        # Rebuild table once inputs stop changing
+        self.updateTimer = QTimer(self)
+        self.updateTimer.setSingleShot(True)
+        self.updateTimer.setInterval(self.updateDelay)
+        self.updateTimer.timeout.connect(self._updateTable)
+        self.bandsComboBox.currentIndexChanged.connect(self._updateMode)
+        self.modelComboBox.currentIndexChanged.connect(self._updateMode)
+        for lineEdit in (
+            self.low,
+            self.high,
+            self.step,
+            self.temperatureStart,
+            self.temperatureStop,
+            self.temperatureStep,
+            self.humidity,
+            self.pressure,
+        ):
+            lineEdit.textChanged.connect(self.updateTimer.start)
+
+        # Inputs layout
+        freqsLayout = QHBoxLayout()
+        freqsLayout.addWidget(boldLabel("Frequencies:"))
+        freqsLayout.addWidget(self.bandsComboBox)
+        freqsLayout.addWidget(QLabel("from"))
+        freqsLayout.addWidget(self.low)
+        freqsLayout.addWidget(QLabel("to"))
+        freqsLayout.addWidget(self.high)
+        freqsLayout.addWidget(QLabel("step"))
+        freqsLayout.addWidget(self.step)
+        freqsLayout.addWidget(QLabel("Hz"))
+        freqsLayout.addStretch()
+        temperaturesLayout = QHBoxLayout()
+        temperaturesLayout.addWidget(boldLabel("Temperatures:"))
+        temperaturesLayout.addWidget(QLabel("from"))
+        temperaturesLayout.addWidget(self.temperatureStart)
+        temperaturesLayout.addWidget(QLabel("to"))
+        temperaturesLayout.addWidget(self.temperatureStop)
+        temperaturesLayout.addWidget(QLabel("step"))
+        temperaturesLayout.addWidget(self.temperatureStep)
+        temperaturesLayout.addWidget(QLabel("℃"))
+        temperaturesLayout.addWidget(boldLabel("Model:"))
+        temperaturesLayout.addWidget(self.modelComboBox)
+        temperaturesLayout.addWidget(self.humidity)
+        temperaturesLayout.addWidget(QLabel("%"))
+        temperaturesLayout.addWidget(self.pressure)
+        temperaturesLayout.addWidget(QLabel("hPa"))
+        temperaturesLayout.addStretch()
+        temperaturesLayout.addWidget(self.info)
+        temperaturesLayout.addWidget(self.exportButton)
+
+        # Main tab layout
+        mainLayout = QVBoxLayout(self.conversionTableWidget)
+        mainLayout.addLayout(freqsLayout)
+        mainLayout.addLayout(temperaturesLayout)
+        mainLayout.addWidget(self.tableView)
+
+        self._updateTable()
+
+    def getWidget(self) -> QWidget:
+        """Return created QWidget."""
+
+        return self.conversionTableWidget
+
+    def getWidgetName(self) -> str:
+        """Return widget name."""
+
+        return self.conversionTableWidgetName
+
+    def _updateMode(self) -> None:
+        """Enable inputs used by current bands and model, then rebuild table."""
+
+        self.step.setEnabled(self.bandsComboBox.currentData() is None)
+        usesConditions = self.modelComboBox.currentText() == "cramer"
+        self.humidity.setEnabled(usesConditions)
+        self.pressure.setEnabled(usesConditions)
+        self.updateTimer.start()
+
+    def _values(self) -> tuple | None:
+        """Return conversionTable() arguments, None if an input is invalid."""
+
+        try:
+            low, high, step, start, stop, temperatureStep, humidity, pressure = (
+                float(lineEdit.text().replace(",", "."))
+                for lineEdit in (
+                    self.low,
+                    self.high,
+                    self.step,
+                    self.temperatureStart,
+                    self.temperatureStop,
+                    self.temperatureStep,
+                    self.humidity,
+                    self.pressure,
+                )
+            )
+        except ValueError:
+            return None
+        if not (0 < low <= high) or temperatureStep <= 0 or start > stop:
+            return None
+
+        fraction = self.bandsComboBox.currentData()
+        if fraction is not None:
+            freqs = bandFrequencies(fraction, low, high)
+        elif step > 0:
+            freqs = np.arange(low, high + step / 2, step)
+        else:
+            return None
+        temperatures = np.arange(start, stop + temperatureStep / 2, temperatureStep)
+        model = self.modelComboBox.currentText()
+        return freqs, temperatures, humidity, pressure, model
+
+    @profiled(slot=True)
+    def _updateTable(self) -> None:
+        """Rebuild table from current inputs, emptied when they are invalid."""
+
+        values = self._values()
+        if values is None:
+            self.model.setTable(conversionTable([], []))
+            self.info.setText("Invalid values")
+            self.exportButton.setEnabled(False)
+            return
+        self.model.setTable(conversionTable(*values))
+        self.info.setText(f"{self.model.rowCount()} rows")
+        self.exportButton.setEnabled(self.model.rowCount() > 0)
+
+    def _exportCsv(self) -> None:
+        """Ask for a file and write current table to it."""
+
+        path, _ = QFileDialog.getSaveFileName(
+            self.conversionTableWidget,
+            "Export table",
+            "conversion-table.csv",
+            "CSV files (*.csv)",
+        )
+        if not path:
+            return
+        try:
+            with open(path, "w", newline="") as f:
+                writeTableCsv(self.model.table, f)
+        except OSError as e:
+            self.info.setText(f"Cannot write {path}: {e.strerror}")
+            return
+        self.info.setText(f"{self.model.rowCount()} rows written")
+
+
+def getLineEdit(text: str, validator: QDoubleValidator) -> QLineEdit:
+    """Return QLineEdit with given text and validator."""
+
+    lineEdit = QLineEdit(text)
+    lineEdit.setFixedWidth(FIXED_WIDTH)
+    lineEdit.setValidator(validator)
+    return lineEdit
+
+
+def boldLabel(text: str) -> QLabel:
+    """Return QLabel with bold text."""
+
+    label = QLabel(text)
+    label.setStyleSheet(BOLD_STYLESHEET)
+    return label
@@ -1,59 +1,237 @@
+import csv
+
 from decimal import Decimal
-from math import sqrt
+from typing import TextIO
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from src import numeric
+from src.rounding import quantize, roundHalfEven, roundHalfEvenArray
+from src.soundSpeed import DEFAULT_HUMIDITY, STANDARD_PRESSURE, soundSpeedTable
+
+
+# Columns of conversion tables, with their number of decimal places
+TABLE_COLUMNS = {
+    "temperature": 1,
+    "c": 2,
+    "freq": 2,
+    "distance": 2,
+    "distance2": 2,
+    "distance4": 2,
+    "time": 3,
+    "time2": 3,
+    "time4": 3,
+}
+# Speed of sound models of computeC()
+SOUND_SPEED_MODELS = ["linear", "cramer"]
+# Octave fractions of standard band lists (IEC 61260 base-ten series)
+BAND_FRACTIONS = [1, 3, 6, 12, 24]
 
 
 def freqToDistance(freq: int, c: float) -> Decimal:
     """Return wave length (m) from given freq (Hz) and c (m.s-1)."""
 
-    distance = c / freq
-    return Decimal(distance).quantize(Decimal(".01"))
+    return quantize(numeric.freqToDistance(freq, c), 2)
 
 
 def freqToTime(freq: int, c: float) -> Decimal:
     """Return period (ms) from given freq (Hs)."""
 
-    time = 1 / (freq * 0.001)
-    return Decimal(time).quantize(Decimal(".001"))
+    return quantize(numeric.freqToTime(freq, c), 3)
 
 
 def distanceToTime(distance: float, c: float) -> Decimal:
     """Return time (ms) from given d and c."""
 
-    time = (distance / c) * 1000  # time (ms)
-    return Decimal(time).quantize(Decimal(".001"))
+    return quantize(numeric.distanceToTime(distance, c), 3)
 
 
 def distanceToFreq(distance: float, c: float) -> Decimal:
     """ "Return freq (Hz) from given distance (m) and c (m.s-1)."""
 
-    freq = c / distance
-    return Decimal(freq).quantize(Decimal(".01"))
+    return quantize(numeric.distanceToFreq(distance, c), 2)
 
 
 def timeToFreq(time: float) -> Decimal:
     """Return freq (Hz) from given time (ms)."""
 
-    freq = 1 / (time * 0.001)
-    return Decimal(freq).quantize(Decimal(".01"))
+    return quantize(numeric.timeToFreq(time), 2)
 
 
 def timeToDistance(time: float, c: float) -> Decimal:
     """Return distance (m) from given time (ms)."""
 
-    distance = (time * c) / 1000
-    return Decimal(distance).quantize(Decimal(".01"))
+    return quantize(numeric.timeToDistance(time, c), 2)
 
 
-def computeC(temperature: float) -> int:
-    """Return speed of sound in air at given temperature."""
+def computeC(
+    temperature: float,
+    humidity: float = DEFAULT_HUMIDITY,
+    pressure: float = STANDARD_PRESSURE,
+    model: str = "linear",
+) -> int | float:
+    """Return speed of sound in air at given conditions.
 
-    # NASA WAY
-    """
-    g = 1.4  # gamma is adiabatic index of air
-    R = 286  # molar gas constant (m2/s2/K0)
-    T = 273.15 + temperature  # absolute temperature (K)
-    return Decimal(sqrt(g * R * T)).quantize(Decimal(".01"))
+    Parameters:
+        temperature: Air temperature (C)
+        humidity: Relative humidity (%), only used by the "cramer" model
+        pressure: Atmospheric pressure (hPa), only used by the "cramer" model
+        model: "linear" (Wikipedia way, truncated to int) or "cramer"
+            (Cramer's formula through its lookup table, rounded to .01)
     """
 
+    if model == "cramer":
+        c = soundSpeedTable()(float(temperature), float(humidity), float(pressure))
+        return roundHalfEven(c, 100.0) / 100
+
     # Wikipedia way
     return int(331.3 + temperature * 0.606)
+
+
+def _roundArray(values: np.ndarray, places: int) -> np.ndarray:
+    """Return values rounded like quantize(), as floats."""
+
+    scale = 10.0**places
+    return roundHalfEvenArray(values, scale) / scale
+
+
+def freqsToDistances(freqs: ArrayLike, c: ArrayLike) -> np.ndarray:
+    """Return freqToDistance() of each freq (Hz) and c (m.s-1)."""
+
+    freqs = np.asarray(freqs, dtype=np.float64)
+    return _roundArray(numeric.freqToDistance(freqs, c), 2)
+
+
+def freqsToTimes(freqs: ArrayLike, c: ArrayLike = None) -> np.ndarray:
+    """Return freqToTime() of each freq (Hz)."""
+
+    freqs = np.asarray(freqs, dtype=np.float64)
+    return _roundArray(numeric.freqToTime(freqs, c), 3)
+
+
+def distancesToTimes(distances: ArrayLike, c: ArrayLike) -> np.ndarray:
+    """Return distanceToTime() of each distance (m) and c (m.s-1)."""
+
+    distances = np.asarray(distances, dtype=np.float64)
+    return _roundArray(numeric.distanceToTime(distances, c), 3)
+
+
+def distancesToFreqs(distances: ArrayLike, c: ArrayLike) -> np.ndarray:
+    """Return distanceToFreq() of each distance (m) and c (m.s-1)."""
+
+    distances = np.asarray(distances, dtype=np.float64)
+    return _roundArray(numeric.distanceToFreq(distances, c), 2)
+
+
+def timesToFreqs(times: ArrayLike) -> np.ndarray:
+    """Return timeToFreq() of each time (ms)."""
+
+    times = np.asarray(times, dtype=np.float64)
+    return _roundArray(numeric.timeToFreq(times), 2)
+
+
+def timesToDistances(times: ArrayLike, c: ArrayLike) -> np.ndarray:
+    """Return timeToDistance() of each time (ms) and c (m.s-1)."""
+
+    times = np.asarray(times, dtype=np.float64)
+    return _roundArray(numeric.timeToDistance(times, c), 2)
+
+
+def computeCs(
+    temperatures: ArrayLike,
+    humidity: ArrayLike = DEFAULT_HUMIDITY,
+    pressure: ArrayLike = STANDARD_PRESSURE,
+    model: str = "linear",
+) -> np.ndarray:
+    """Return computeC() of each temperature, humidity and pressure, as floats."""
+
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    if model == "cramer":
+        c = soundSpeedTable()(temperatures, humidity, pressure)
+        return _roundArray(np.asarray(c, dtype=np.float64), 2)
+    return np.trunc(331.3 + temperatures * 0.606)
+
+
+def bandFrequencies(fraction: int, low: float = 20, high: float = 20000) -> np.ndarray:
+    """Return exact mid-band frequencies of 1/fraction octave bands.
+
+    Bands follow the IEC 61260 base-ten series around 1 kHz, so 1/3 octave
+    gives 19.95, 25.12, 31.62... for the nominal 20, 25, 31.5 Hz bands.
+
+    Parameters:
+        fraction: Bands per octave, e.g. 3 for 1/3 octave
+        low: Frequency (Hz) in the first band
+        high: Frequency (Hz) in the last band
+    """
+
+    ratio = 10 ** (3 / (10 * fraction))
+    # Odd fractions have a band at 1 kHz, even ones are centered around it
+    offset = 0.0 if fraction % 2 else 0.5
+    first = np.round(np.log(low / 1000) / np.log(ratio) - offset)
+    last = np.round(np.log(high / 1000) / np.log(ratio) - offset)
+    return 1000 * ratio ** (np.arange(first, last + 1) + offset)
+
+
+def conversionTable(
+    freqs: ArrayLike,
+    temperatures: ArrayLike,
+    humidity: float = DEFAULT_HUMIDITY,
+    pressure: float = STANDARD_PRESSURE,
+    model: str = "linear",
+) -> dict[str, np.ndarray]:
+    """Return lambda and period of each frequency at each temperature.
+
+    Rows are all temperatures for the first frequency, then all temperatures
+    for the next one. Values are rounded as in the converter tab, by 2 and by
+    4 values included.
+
+    Parameters:
+        freqs: Frequencies (Hz)
+        temperatures: Temperatures (C)
+        humidity: Relative humidity (%) of the "cramer" model
+        pressure: Atmospheric pressure (hPa) of the "cramer" model
+        model: Speed of sound model, see computeC()
+
+    Returns:
+        Columns of TABLE_COLUMNS, as arrays of the same length
+    """
+
+    freqs = np.asarray(freqs, dtype=np.float64)
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    freq = np.repeat(freqs, temperatures.size)
+    temperature = np.tile(temperatures, freqs.size)
+    # Speed of sound only depends on the temperature
+    c = np.tile(computeCs(temperatures, humidity, pressure, model), freqs.size)
+
+    distance = freqsToDistances(freq, c)
+    distance2 = _roundArray(distance / 2, 2)
+    distance4 = _roundArray(distance / 4, 2)
+    return {
+        "temperature": temperature,
+        "c": c,
+        "freq": _roundArray(freq, 2),
+        "distance": distance,
+        "distance2": distance2,
+        "distance4": distance4,
+        "time": freqsToTimes(freq, c),
+        "time2": distancesToTimes(distance2, c),
+        "time4": distancesToTimes(distance4, c),
+    }
+
+
+def formatTable(table: dict[str, np.ndarray]) -> dict[str, list[str]]:
+    """Return table columns as lists of strings, with their decimal places."""
+
+    return {
+        name: list(map(f"{{:.{TABLE_COLUMNS[name]}f}}".format, values.tolist()))
+        for name, values in table.items()
+    }
+
+
+def writeTableCsv(table: dict[str, np.ndarray], stream: TextIO) -> None:
+    """Write conversion table to stream as CSV, with a header line."""
+
+    writer = csv.writer(stream, lineterminator="\n")
+    writer.writerow(table)
+    writer.writerows(zip(*formatTable(table).values()))
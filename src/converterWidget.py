@@ -1,7 +1,7 @@
 from decimal import Decimal
 
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QDoubleValidator, QIntValidator, QValidator
+from PySide6.QtGui import QDoubleValidator, QValidator
 from PySide6.QtWidgets import (
     QHBoxLayout,
     QVBoxLayout,
@@ -9,6 +9,7 @@ from PySide6.QtWidgets import (
     QLabel,
     QLineEdit,
     QLayout,
+    QComboBox,
 )
 
 from src.constants import RO_STYLESHEET, FIXED_WIDTH, BOLD_STYLESHEET
@@ -21,6 +22,8 @@ from src.converter import (
     timeToDistance,
     computeC,
 )
+from src.profiling import countSignal, profiled
+from src.soundSpeed import DEFAULT_HUMIDITY, STANDARD_PRESSURE
 
 
 class ConverterWidget(QWidget):
@@ -86,6 +89,9 @@ class ConverterWidget(QWidget):
 class CLayout(QWidget):
     """Class for speed of sound (c) layout with all connections."""
 
+    # Speed of sound models, see computeC()
+    models = {"Linear (temperature)": "linear", "Cramer (humidity, pressure)": "cramer"}
+
     def __init__(self, parent: QWidget, defaultTemperature: float):
         """Define all widgets in layout and make connections."""
 
@@ -97,17 +103,38 @@ class CLayout(QWidget):
         temperatureValidator.setNotation(QDoubleValidator.Notation.StandardNotation)
         temperatureValidator.setRange(-100, 100)
         temperatureValidator.setDecimals(2)
-        cValidator = QIntValidator()
+        humidityValidator = QDoubleValidator()
+        humidityValidator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        humidityValidator.setRange(0, 100)
+        humidityValidator.setDecimals(1)
+        pressureValidator = QDoubleValidator()
+        pressureValidator.setNotation(QDoubleValidator.Notation.StandardNotation)
+        pressureValidator.setRange(300, 1200)
+        pressureValidator.setDecimals(2)
+        cValidator = QDoubleValidator()
         cValidator.setRange(0, 400)
+        cValidator.setDecimals(2)
 
         # Values input
         self.temperature = getQLineEdit(FIXED_WIDTH, temperatureValidator)
+        self.humidity = getQLineEdit(FIXED_WIDTH, humidityValidator)
+        self.pressure = getQLineEdit(FIXED_WIDTH, pressureValidator)
         self.c = getQLineEdit(
             FIXED_WIDTH, cValidator, readOnly=True, styleSheet=RO_STYLESHEET
         )
+        self.model = QComboBox()
+        for text, model in self.models.items():
+            self.model.addItem(text, model)
+        self.humidity.setText(f"{DEFAULT_HUMIDITY}")
+        self.pressure.setText(f"{STANDARD_PRESSURE}")
+        self.humidity.setEnabled(False)
+        self.pressure.setEnabled(False)
 
         # Connections to update on each user input
         self.temperature.textChanged.connect(self._updateC)
+        self.humidity.textChanged.connect(self._updateC)
+        self.pressure.textChanged.connect(self._updateC)
+        self.model.currentIndexChanged.connect(self._updateModel)
 
         # Default values
         self.temperature.setText(f"{defaultTemperature}")
@@ -115,30 +142,39 @@ class CLayout(QWidget):
 
         # Units
         temperatureUnit = QLabel("℃")
+        humidityUnit = QLabel("%")
+        pressureUnit = QLabel("hPa")
         cUnit = QLabel("m.s-1")
 
         # Labels for speed of sound
+        modelLabel = QLabel("Model: ")
         temperatureLabel = QLabel("Temperature: ")
+        humidityLabel = QLabel("Humidity: ")
+        pressureLabel = QLabel("Pressure: ")
         cLabel = QLabel("Speed of sound (in air): ")
 
         # Speed of sound labels layout
         sosLabelsLayout = QVBoxLayout()
-        sosLabelsLayout.addWidget(
-            temperatureLabel, alignment=Qt.AlignmentFlag.AlignRight
-        )
-        sosLabelsLayout.addWidget(cLabel, alignment=Qt.AlignmentFlag.AlignRight)
+        for label in (
+            modelLabel,
+            temperatureLabel,
+            humidityLabel,
+            pressureLabel,
+            cLabel,
+        ):
+            sosLabelsLayout.addWidget(label, alignment=Qt.AlignmentFlag.AlignRight)
 
         # Speed of sound values layout
         sosValuesLayout = QVBoxLayout()
-        sosValuesLayout.addWidget(
-            self.temperature, alignment=Qt.AlignmentFlag.AlignCenter
-        )
-        sosValuesLayout.addWidget(self.c, alignment=Qt.AlignmentFlag.AlignCenter)
+        sosValuesLayout.addWidget(self.model, alignment=Qt.AlignmentFlag.AlignLeft)
+        for lineEdit in (self.temperature, self.humidity, self.pressure, self.c):
+            sosValuesLayout.addWidget(lineEdit, alignment=Qt.AlignmentFlag.AlignLeft)
 
         # Speed of sound units layout
         sosUnitsLayout = QVBoxLayout()
-        sosUnitsLayout.addWidget(temperatureUnit, alignment=Qt.AlignmentFlag.AlignLeft)
-        sosUnitsLayout.addWidget(cUnit, alignment=Qt.AlignmentFlag.AlignLeft)
+        sosUnitsLayout.addWidget(QLabel())  # empty cell
+        for unit in (temperatureUnit, humidityUnit, pressureUnit, cUnit):
+            sosUnitsLayout.addWidget(unit, alignment=Qt.AlignmentFlag.AlignLeft)
 
         # Speed of sound main layout (with padding)
         self.cLayout = QHBoxLayout()
@@ -155,6 +191,7 @@ class CLayout(QWidget):
 
         return self.cLayout
 
+    @profiled(slot=True)
     def _updateC(self) -> None:
         """Update speed of sound (m.s-1)."""
 
@@ -168,7 +205,26 @@ class CLayout(QWidget):
         else:
             temperature = float(self.temperature.text())
 
-        self.c.setText(f"{computeC(temperature)}")
+        humidity = self._value(self.humidity, DEFAULT_HUMIDITY)
+        pressure = self._value(self.pressure, STANDARD_PRESSURE)
+        model = self.model.currentData()
+        self.c.setText(f"{computeC(temperature, humidity, pressure, model)}")
+
+    def _updateModel(self) -> None:
+        """Enable humidity and pressure for models using them, update c."""
+
+        usesConditions = self.model.currentData() == "cramer"
+        self.humidity.setEnabled(usesConditions)
+        self.pressure.setEnabled(usesConditions)
+        self._updateC()
+
+    def _value(self, lineEdit: QLineEdit, default: float) -> float:
+        """Return value of given QLineEdit, default when empty or incomplete."""
+
+        try:
+            return float(lineEdit.text().replace(",", "."))
+        except ValueError:
+            return default
 
     def checkTemperature(self):
         """Check that temperature is set so we have c.
@@ -226,6 +282,9 @@ class ValuesLayout(QWidget):
         self.distance.textChanged.connect(self._updateValuesFromDistance)
         self.time.textChanged.connect(self._updateValuesFromTime)
         self.freq.textChanged.connect(self._updateValuesFromFreq)
+        countSignal(self.distance.textChanged, "ValuesLayout.distance changed")
+        countSignal(self.time.textChanged, "ValuesLayout.time changed")
+        countSignal(self.freq.textChanged, "ValuesLayout.freq changed")
 
         # Default values
         self.freq.setText(f"{defaultFreq}")
@@ -290,6 +349,7 @@ class ValuesLayout(QWidget):
 
         return self.valuesLayout
 
+    @profiled(slot=True)
     def _updateValuesFromDistance(self) -> None:
         """Update time and frequency values."""
 
@@ -319,6 +379,7 @@ class ValuesLayout(QWidget):
         # Update by 2 and by 4 values
         self._updateValues24()
 
+    @profiled(slot=True)
     def _updateValuesFromTime(self) -> None:
         """Update distance and frequency values."""
 
@@ -348,6 +409,7 @@ class ValuesLayout(QWidget):
         # Update by 2 and by 4 values
         self._updateValues24()
 
+    @profiled(slot=True)
     def _updateValuesFromFreq(self) -> None:
         """Update time and distance values."""
 
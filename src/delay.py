@@ -0,0 +1,167 @@
+"""Delay alignment of sources (subs, mains, delay towers, fills) for listeners.
+
+Positions are in meters, as (x, y) or (x, y, z) with z = 0 for 2D points.
+Delays and arrival times are in ms. Distances between sources and a listener
+grid are computed once by AlignmentMap, so that changing delays or speed of
+sound only costs one multiply-add over the grid.
+"""
+
+from typing import NamedTuple, Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from src import numeric
+
+
+# Default listener height (m), ears of a standing audience
+EAR_HEIGHT = 1.7
+
+
+class Source(NamedTuple):
+    """One source to align, offset is added to its computed delay (ms)."""
+
+    name: str
+    position: tuple[float, ...]
+    offset: float = 0.0
+
+
+def toPoints(points: ArrayLike) -> np.ndarray:
+    """Return points as a (..., 3) float array, z = 0 for 2D points."""
+
+    points = np.asarray(points, dtype=np.float64)
+    if points.shape[-1] == 2:
+        points = np.concatenate([points, np.zeros(points.shape[:-1] + (1,))], -1)
+    if points.shape[-1] != 3:
+        raise ValueError(f"points must have 2 or 3 coordinates, not {points.shape[-1]}")
+    return points
+
+
+def sourcePoints(sources: Sequence[Source]) -> np.ndarray:
+    """Return (n, 3) positions of given sources."""
+
+    return np.array([toPoints(source.position) for source in sources]).reshape(-1, 3)
+
+
+def distances(sources: Sequence[Source], listeners: ArrayLike) -> np.ndarray:
+    """Return distance (m) from each listener to each source.
+
+    Parameters:
+        sources: Sources to align
+        listeners: Listener positions, any (..., 2 or 3) shape
+
+    Returns:
+        Array of listeners shape with one more axis for sources
+    """
+
+    offsets = toPoints(listeners)[..., np.newaxis, :] - sourcePoints(sources)
+    return np.sqrt(np.einsum("...i,...i->...", offsets, offsets))
+
+
+def alignmentDelays(
+    sources: Sequence[Source], reference: ArrayLike, c: float
+) -> np.ndarray:
+    """Return delays (ms) making all sources arrive together at reference.
+
+    The farthest source is not delayed, then offsets of each source are
+    added, e.g. a few ms on delay towers so that the main PA is heard first.
+
+    Parameters:
+        sources: Sources to align
+        reference: Listener position to align on
+        c: Speed of sound (m.s-1)
+    """
+
+    times = numeric.distanceToTime(distances(sources, reference), c)
+    return times.max() - times + [source.offset for source in sources]
+
+
+def endFireDelays(
+    sources: Sequence[Source], direction: ArrayLike, c: float
+) -> np.ndarray:
+    """Return delays (ms) steering sources toward given direction.
+
+    Each source waits for the wave of the sources behind it, so that all
+    arrivals add up along the direction: end-fire arrays, and the rear box
+    of a cardioid pair (whose polarity is then inverted on the processor).
+
+    Parameters:
+        sources: Sources to align
+        direction: Firing direction, e.g. (0, 1) toward the audience
+        c: Speed of sound (m.s-1)
+    """
+
+    direction = toPoints(direction)
+    norm = np.linalg.norm(direction)
+    if not norm:
+        raise ValueError("direction must not be null")
+    depth = sourcePoints(sources) @ (direction / norm)
+    times = numeric.distanceToTime(depth - depth.min(), c)
+    return times + [source.offset for source in sources]
+
+
+def listenerGrid(
+    x: tuple[float, float],
+    y: tuple[float, float],
+    shape: tuple[int, int] = (100, 100),
+    z: float = EAR_HEIGHT,
+) -> np.ndarray:
+    """Return (rows, columns, 3) listener positions covering an audience area.
+
+    Parameters:
+        x: First and last x (m)
+        y: First and last y (m)
+        shape: Number of rows (along y) and columns (along x)
+        z: Listener height (m)
+    """
+
+    rows, columns = shape
+    gridX, gridY = np.meshgrid(np.linspace(*x, columns), np.linspace(*y, rows))
+    return np.stack([gridX, gridY, np.full_like(gridX, z)], axis=-1)
+
+
+class AlignmentMap:
+    """Arrival times of sources over a listener grid."""
+
+    def __init__(self, sources: Sequence[Source], listeners: ArrayLike) -> None:
+        """Compute distances once, they only depend on positions.
+
+        Parameters:
+            sources: Sources to align
+            listeners: Listener positions, e.g. from listenerGrid()
+        """
+
+        self.sources = list(sources)
+        self.listeners = toPoints(listeners)
+        self.distances = distances(self.sources, self.listeners)
+
+    def arrivalTimes(self, delays: ArrayLike, c: float) -> np.ndarray:
+        """Return arrival time (ms) of each source at each listener.
+
+        Parameters:
+            delays: Delay of each source (ms)
+            c: Speed of sound (m.s-1)
+        """
+
+        return numeric.distanceToTime(self.distances, c) + np.asarray(delays)
+
+    def spread(self, delays: ArrayLike, c: float) -> np.ndarray:
+        """Return time (ms) between first and last arrival at each listener.
+
+        Parameters:
+            delays: Delay of each source (ms)
+            c: Speed of sound (m.s-1)
+        """
+
+        times = self.arrivalTimes(delays, c)
+        return times.max(axis=-1) - times.min(axis=-1)
+
+    def firstArrivals(self, delays: ArrayLike, c: float) -> np.ndarray:
+        """Return index of the source heard first at each listener.
+
+        Parameters:
+            delays: Delay of each source (ms)
+            c: Speed of sound (m.s-1)
+        """
+
+        return self.arrivalTimes(delays, c).argmin(axis=-1)
@@ -1,12 +1,29 @@
-from decimal import Decimal, ROUND_DOWN, ROUND_UP
-from math import log10, sqrt
+from decimal import Decimal
+from typing import TYPE_CHECKING, Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from src import numeric
+from src.amplifier import Amplifier, ImpedanceMode
+from src.rounding import (
+    quantize,
+    quantizeThreshold,
+    roundFloorArray,
+    roundHalfEvenArray,
+)
+
+
+if TYPE_CHECKING:
+    from src.processorProfile import ProcessorProfile
+    from src.speaker import Speaker
 
 
 class Limiter:
     # El famoso "smart limiter" from Hornplans
-    baffleFactorOpen = 1.5625
-    baffleFactorClosed = 2.34375
-    ampliFactor = 2
+    baffleFactorOpen = numeric.BAFFLE_FACTOR_OPEN
+    baffleFactorClosed = numeric.BAFFLE_FACTOR_CLOSED
+    ampliFactor = numeric.AMPLI_FACTOR
 
     def __init__(
         self,
@@ -38,61 +55,230 @@ class Limiter:
     def computeTreshold(self, smartLimit: bool) -> tuple[Decimal, Decimal, Decimal]:
         """Compute threshold for given speaker, amplifier and impedance at 0.775V sensitivity.
 
+        Raw values come from numeric.computeTreshold(), they are only
+        rounded here for display.
+
         Parameters:
             smartLimit: Compute threshold with strict factor on power values
         """
 
-        baffleFactor = (
-            1
-            if not smartLimit
-            else (
-                self.baffleFactorOpen
-                if self.speakerBaffle == "OPEN"
-                else self.baffleFactorClosed
-            )
+        vSpkMax, vAmpMax, threshold = numeric.computeTreshold(
+            self.impedance,
+            self.speakerBaffle,
+            self.speakerPower,
+            self.ampliGain,
+            self.ampliPower,
+            smartLimit,
+            self.sensitivity,
         )
-        ampliFactor = 1 if not smartLimit else self.ampliFactor
 
+        return quantize(vSpkMax, 2), quantize(vAmpMax, 2), quantizeThreshold(threshold)
+
+    def computeProfileTreshold(
+        self, profile: "ProcessorProfile", smartLimit: bool
+    ) -> Decimal:
+        """Compute threshold in the units of a processor, see src.processorProfile.
+
+        Parameters:
+            profile: Target processor profile
+            smartLimit: Compute threshold with strict factor on power values
         """
-        Dans un ampli,
 
-            P = U ^ 2 / R
-        <=> U = sqrt( P * R )
+        _, _, threshold = numeric.computeTreshold(
+            self.impedance,
+            self.speakerBaffle,
+            self.speakerPower,
+            self.ampliGain,
+            self.ampliPower,
+            smartLimit,
+            self.sensitivity,
+        )
 
-            U_out = U_in * 10 ^ ( gain_dB / 20 )
-        <=> U_in = U_out / 10 ^ ( gain_dB / 20 )
+        return profile.quantize(threshold)
 
-        Or,
 
-            dBu = 20 * log10( U / 0.775 )
+def computeTresholds(
+    impedance: ArrayLike,
+    speakerBaffle: ArrayLike,
+    speakerPower: ArrayLike,
+    ampliGain: ArrayLike,
+    ampliPower: ArrayLike,
+    smartLimit: ArrayLike,
+    sensitivity: ArrayLike = 0.775,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Compute thresholds for columns of speaker, amplifier and impedance values.
 
-        Donc, on a
+    All parameters are broadcast against each other, so scalars can be mixed
+    with columns. Results are rounded exactly like Limiter.computeTreshold():
+    V_spk_max and V_amp_max to .01 (half even), threshold to .1 (ROUND_DOWN
+    when positive, ROUND_UP otherwise). Impossible rows (power or impedance
+    of 0) give inf or nan instead of raising.
 
-            dBu_in = 20 * log10( U_out / 0.775 ) - gain_dB
-        """
+    Parameters:
+        impedance: Working impedances
+        speakerBaffle: Types of baffle, either "OPEN" or "CLOSED"
+        speakerPower: AES speaker powers
+        ampliGain: Ampli gains in dBu
+        ampliPower: RMS ampli powers
+        smartLimit: Compute thresholds with strict factor on power values
+        sensitivity: Sensitivity, defaults to 0.775V
+
+    Returns:
+        Arrays of V_spk_max (V), V_amp_max (V) and threshold (dBu)
+    """
+
+    vSpkMax, vAmpMax, threshold = _computeTresholdsScaled(
+        impedance,
+        speakerBaffle,
+        speakerPower,
+        ampliGain,
+        ampliPower,
+        smartLimit,
+        sensitivity,
+    )
+    return vSpkMax / 100, vAmpMax / 100, threshold / 10
+
+
+def _computeTresholdsScaled(
+    impedance: ArrayLike,
+    speakerBaffle: ArrayLike,
+    speakerPower: ArrayLike,
+    ampliGain: ArrayLike,
+    ampliPower: ArrayLike,
+    smartLimit: ArrayLike,
+    sensitivity: ArrayLike,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return V_spk_max and V_amp_max in hundredths and threshold in tenths.
+
+    Values are integral floats so that callers can build exact Decimal objects.
+    """
+
+    vSpkMax, vAmpMax, threshold = rawTresholds(
+        impedance,
+        speakerBaffle,
+        speakerPower,
+        ampliGain,
+        ampliPower,
+        smartLimit,
+        sensitivity,
+    )
+    with np.errstate(invalid="ignore"):
+        return (
+            roundHalfEvenArray(vSpkMax, 100.0),
+            roundHalfEvenArray(vAmpMax, 100.0),
+            roundFloorArray(threshold, 10.0),
+        )
 
+
+def rawTresholds(
+    impedance: ArrayLike,
+    speakerBaffle: ArrayLike,
+    speakerPower: ArrayLike,
+    ampliGain: ArrayLike,
+    ampliPower: ArrayLike,
+    smartLimit: ArrayLike,
+    sensitivity: ArrayLike = 0.775,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return unrounded V_spk_max (V), V_amp_max (V) and threshold (dBu).
+
+    Same parameters as computeTresholds(), for callers rounding thresholds
+    their own way (see src.processorProfile).
+    """
+
+    impedance = np.asarray(impedance, dtype=np.float64)
+    speakerPower = np.asarray(speakerPower, dtype=np.float64)
+    ampliGain = np.asarray(ampliGain, dtype=np.float64)
+    ampliPower = np.asarray(ampliPower, dtype=np.float64)
+    sensitivity = np.asarray(sensitivity, dtype=np.float64)
+    smartLimit = np.asarray(smartLimit, dtype=bool)
+    isOpen = np.asarray(speakerBaffle) == "OPEN"
+
+    baffleFactor = np.where(
+        smartLimit,
+        np.where(isOpen, Limiter.baffleFactorOpen, Limiter.baffleFactorClosed),
+        1.0,
+    )
+    ampliFactor = np.where(smartLimit, float(Limiter.ampliFactor), 1.0)
+
+    """
+    Dans un ampli,
+
+        P = U ^ 2 / R
+    <=> U = sqrt( P * R )
+
+        U_out = U_in * 10 ^ ( gain_dB / 20 )
+    <=> U_in = U_out / 10 ^ ( gain_dB / 20 )
+
+    Or,
+
+        dBu = 20 * log10( U / 0.775 )
+
+    Donc, on a
+
+        dBu_in = 20 * log10( U_out / 0.775 ) - gain_dB
+    """
+
+    with np.errstate(divide="ignore", invalid="ignore"):
         # RMS voltage corresponding to given speaker power at given impedance
-        V_spk_max = sqrt((self.speakerPower / baffleFactor) * self.impedance)
-        # We convert this RMS voltage to dBu at 0.775V sensitivity
-        dBu_spk_max = 20 * log10(V_spk_max / self.sensitivity)
+        vSpkMax = np.sqrt((speakerPower / baffleFactor) * impedance)
+        # We convert this RMS voltage to dBu at given sensitivity
+        dBuSpkMax = 20 * np.log10(vSpkMax / sensitivity)
         # Then we remove gain of the amplifier
-        threshold_spk = dBu_spk_max - self.ampliGain
+        thresholdSpk = dBuSpkMax - ampliGain
 
         # RMS voltage corresponding to given amplifier power at given impedance
-        V_amp_max = sqrt((self.ampliPower / ampliFactor) * self.impedance)
+        vAmpMax = np.sqrt((ampliPower / ampliFactor) * impedance)
         # RMS to dBu conversion
-        dBu_amp_max = 20 * log10(V_amp_max / self.sensitivity)
+        dBuAmpMax = 20 * np.log10(vAmpMax / sensitivity)
         # Gain substraction
-        threshold_amp = dBu_amp_max - self.ampliGain
+        thresholdAmp = dBuAmpMax - ampliGain
 
         # We take the most strict threshold to protect ampli & speaker
-        threshold = min(threshold_spk, threshold_amp)
-        threshold = Decimal(threshold).quantize(
-            Decimal(".1"), rounding=(ROUND_DOWN if threshold > 0 else ROUND_UP)
-        )
+        return vSpkMax, vAmpMax, np.minimum(thresholdSpk, thresholdAmp)
 
-        return (
-            Decimal(V_spk_max).quantize(Decimal(".01")),
-            Decimal(V_amp_max).quantize(Decimal(".01")),
-            threshold,
-        )
+
+def speakerTresholds(
+    speakers: Sequence["Speaker"],
+    ampli: Amplifier,
+    mode: ImpedanceMode | str,
+    smartLimit: bool = True,
+    sensitivity: float = 0.775,
+) -> np.ndarray:
+    """Return thresholds (dBu) of speakers driven by an amplifier, as the limiter tab.
+
+    Raise ValueError if the amplifier has no power in mode or if a speaker
+    cannot work at the mode impedance.
+
+    Parameters:
+        speakers: Speakers driven one by one
+        ampli: Amplifier
+        mode: Amplifier impedance mode, or its label
+        smartLimit: Compute thresholds with strict factor on power values
+        sensitivity: Sensitivity, defaults to 0.775V
+    """
+
+    mode = ImpedanceMode.fromLabel(mode)
+    ampliPower = ampli.getPower(mode)
+    if not ampliPower:
+        raise ValueError(f"{ampli.reference} has no power in {mode.label} mode")
+    for speaker in speakers:
+        if mode.impedance > speaker.impedance:
+            raise ValueError(
+                f"{speaker.reference} cannot be driven in {mode.label} mode"
+            )
+    speakerImpedance = np.array([s.impedance for s in speakers], dtype=np.float64)
+    # Same power scaling as the limiter tab, powers are truncated to W
+    speakerPower = np.floor(
+        np.array([s.power for s in speakers], dtype=np.float64)
+        * (speakerImpedance / mode.impedance)
+    )
+    _, _, thresholds = computeTresholds(
+        mode.impedance,
+        [s.baffle for s in speakers],
+        speakerPower,
+        ampli.gain,
+        ampliPower,
+        smartLimit,
+        sensitivity,
+    )
+    return thresholds
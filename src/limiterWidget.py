@@ -1,7 +1,6 @@
-import json
+from functools import lru_cache
 
-from pathlib import Path
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QSignalBlocker, Qt, QTimer
 from PySide6.QtGui import QDoubleValidator, QIntValidator
 from PySide6.QtWidgets import (
     QListWidget,
@@ -12,17 +11,50 @@ from PySide6.QtWidgets import (
     QLabel,
     QLineEdit,
     QComboBox,
+    QPushButton,
 )
 
-from src.amplifier import Amplifier
+from src.amplifier import IMPEDANCE_MODES
+from src.catalog import loadCatalog
+from src.catalogModel import DeviceListView, amplifierToolTip, speakerToolTip
 from src.limiter import Limiter
-from src.speaker import Speaker
+from src.processorProfile import PROFILES
+from src.profiling import countSignal, profiled
 
 
 OHM = "\u2126"
-AMPLIFIERS_FILE = r"amplifiers.json"
-SPEAKERS_FILE = r"speakers.json"
-BASE_PATH = str(Path(__file__).parent.parent.resolve()) + "\\json\\"
+
+
+@lru_cache(maxsize=1024)
+def _computeTreshold(
+    impedance: int,
+    speakerBaffle: str,
+    speakerPower: int,
+    ampliGain: float,
+    ampliPower: int,
+    smartLimit: bool,
+) -> tuple:
+    """Return Limiter.computeTreshold() result, memoized on all inputs."""
+
+    limit = Limiter(impedance, speakerBaffle, speakerPower, ampliGain, ampliPower)
+    return limit.computeTreshold(smartLimit=smartLimit)
+
+
+@lru_cache(maxsize=1024)
+def _computeProfileTresholds(
+    impedance: int,
+    speakerBaffle: str,
+    speakerPower: int,
+    ampliGain: float,
+    ampliPower: int,
+) -> tuple:
+    """Return smart threshold in units of each processor profile, memoized."""
+
+    limit = Limiter(impedance, speakerBaffle, speakerPower, ampliGain, ampliPower)
+    return tuple(
+        (profile, limit.computeProfileTreshold(profile, smartLimit=True))
+        for profile in PROFILES.values()
+    )
 
 
 class LimiterWidget(QWidget):
@@ -36,6 +68,8 @@ class LimiterWidget(QWidget):
     customText = "[Custom]"
     limiterWidgetName = "LimiterRMS"
     fixedWidth = 68
+    # Delay in ms without input change before threshold is recomputed
+    updateDelay = 40
 
     def __init__(self, parent: QWidget = None) -> None:
         """Create the widget."""
@@ -43,75 +77,39 @@ class LimiterWidget(QWidget):
         super().__init__(parent)
 
         # Get amplis and speakers data
-        self.amplis = self._getAmplisSpecs(BASE_PATH + AMPLIFIERS_FILE)
-        self.speakers = self._getSpeakersSpecs(BASE_PATH + SPEAKERS_FILE)
+        catalog = loadCatalog()
+        self.amplis = catalog.amplifiers
+        self.speakers = catalog.speakers
 
         # Amplis layout
         amplisColumnNameLabel = QLabel("Amplifiers")
         amplisColumnNameLabel.setStyleSheet("font-weight: bold")
-        self.amplisListWidget = QListWidget()
-        for ampli in self.amplis.values():
-            item = QListWidgetItem(self.tr(ampli.reference))
-            item.setToolTip(
-                f"{ampli.reference}\n\n"
-                + f"gain: {ampli.gain}dB\n"
-                + f"power (8{OHM}): {str(ampli.power["8"])+'W' if ampli.power["8"] else 'Missing'}\n"
-                + f"power (4{OHM}): {str(ampli.power["4"])+'W' if ampli.power["4"] else 'Missing'}\n"
-                + f"power (2{OHM}): {str(ampli.power["2"])+'W' if ampli.power["2"] else 'Missing'}\n"
-                + f"bridge (8{OHM}): {str(ampli.power["8 (bridge)"])+'W' if ampli.power["8 (bridge)"] else 'Missing'}\n"
-                + f"bridge (4{OHM}): {str(ampli.power["4 (bridge)"])+'W' if ampli.power["4 (bridge)"] else 'Missing'}\n"
-                + f"ouputs number: {ampli.outputs}"
-            )
-            self.amplisListWidget.addItem(item)
-        self.amplisListWidget.setCurrentRow(0)
-        self.amplisListWidget.setMinimumWidth(
-            self._computeMinimumWidth(self.amplisListWidget)
-            + self.amplisListWidget.frameWidth() * 10
-        )
-        self.amplisListWidget.setMinimumHeight(
-            self.amplisListWidget.sizeHintForRow(0) * 10
-            + 10 * self.amplisListWidget.frameWidth()
+        self.amplisListView = DeviceListView(
+            list(self.amplis.values()), amplifierToolTip
         )
         amplisSelectionLayout = QVBoxLayout()
         amplisSelectionLayout.addWidget(
             amplisColumnNameLabel, alignment=Qt.AlignmentFlag.AlignCenter
         )
-        amplisSelectionLayout.addWidget(self.amplisListWidget)
+        amplisSelectionLayout.addWidget(self.amplisListView)
 
         # Speakers layout
         speakersColumnNameLabel = QLabel("Speakers")
         speakersColumnNameLabel.setStyleSheet("font-weight: bold")
-        self.speakersListWidget = QListWidget()
-        for speaker in self.speakers.values():
-            item = QListWidgetItem(self.tr(speaker.reference))
-            item.setToolTip(
-                f"{speaker.reference}\n\n"
-                + f"impedance: {speaker.impedance}{OHM}\n"
-                + f"power ({speaker.impedance}{OHM}): {speaker.power}W\n"
-                + f"frequency response: {speaker.response} Hz\n"
-                + f"baffle: {speaker.baffle}"
-            )
-            self.speakersListWidget.addItem(item)
-        self.speakersListWidget.setCurrentRow(0)
-        self.speakersListWidget.setMinimumWidth(
-            self._computeMinimumWidth(self.speakersListWidget)
-            + self.speakersListWidget.frameWidth() * 10
-        )
-        self.speakersListWidget.setMinimumHeight(
-            self.speakersListWidget.sizeHintForRow(0) * 10
-            + 10 * self.speakersListWidget.frameWidth()
+        self.speakersListView = DeviceListView(
+            list(self.speakers.values()), speakerToolTip
         )
         speakersSelectionLayout = QVBoxLayout()
         speakersSelectionLayout.addWidget(
             speakersColumnNameLabel, alignment=Qt.AlignmentFlag.AlignCenter
         )
-        speakersSelectionLayout.addWidget(self.speakersListWidget)
+        speakersSelectionLayout.addWidget(self.speakersListView)
 
         # Impedance layout
         impedanceColumnNameLabel = QLabel("Impedance")
         impedanceColumnNameLabel.setStyleSheet("font-weight: bold")
         self.impedanceListWidget = QListWidget()
-        for impedance in ["8", "4", "2", "8 (bridge)", "4 (bridge)"]:
+        for impedance in IMPEDANCE_MODES:
             self.impedanceListWidget.addItem(QListWidgetItem(self.tr(impedance)))
         self.impedanceListWidget.setCurrentRow(0)
         self.impedanceListWidget.setMinimumWidth(
@@ -263,14 +261,32 @@ class LimiterWidget(QWidget):
         recapUnitsLayout.addWidget(ampliPowerUnitLabel)
         recapUnitsLayout.addWidget(thresholdUnitLabel)
 
+        # Bursts of textChanged signals (selection, typing) trigger one update
+        self.updateTimer = QTimer(self)
+        self.updateTimer.setSingleShot(True)
+        self.updateTimer.setInterval(self.updateDelay)
+        self.updateTimer.timeout.connect(self._updatethreshold)
+        self.lastInputs = None
+
         # Connections with labels and set default values at start
-        self.amplisListWidget.itemSelectionChanged.connect(self._updateOnSelection)
-        self.speakersListWidget.itemSelectionChanged.connect(self._updateOnSelection)
+        for deviceListView in (self.amplisListView, self.speakersListView):
+            deviceListView.listView.selectionModel().currentChanged.connect(
+                self._updateOnSelection
+            )
         self.impedanceListWidget.itemSelectionChanged.connect(self._updateOnSelection)
         self._updateOnSelection()
 
+        for name, signal in (
+            ("impedance", self.impedanceValue.textChanged),
+            ("speakerBaffle", self.speakerBaffleValue.currentTextChanged),
+            ("speakerPower", self.speakerPowerValue.textChanged),
+            ("ampliGain", self.ampliGainValue.textChanged),
+            ("ampliPower", self.ampliPowerValue.textChanged),
+        ):
+            countSignal(signal, f"LimiterWidget.{name} changed")
+
         # Anytime a value changes we update threshold
-        self.impedanceValue.textChanged.connect(self._updatethreshold)
+        self.impedanceValue.textChanged.connect(self.updateTimer.start)
         self.speakerBaffleValue.currentTextChanged.connect(self._updateOnInputsSpeaker)
         self.speakerPowerValue.textChanged.connect(self._updateOnInputsSpeaker)
         self.ampliGainValue.textChanged.connect(self._updateOnInputsAmpli)
@@ -292,6 +308,11 @@ class LimiterWidget(QWidget):
         recapLayout.addLayout(recapLayoutLeft)
         recapLayout.addLayout(recapLayoutRight)
 
+        # Live input meter against current threshold, built on first use
+        self.monitorWidget = None
+        self.monitorButton = QPushButton("Live monitor")
+        self.monitorButton.clicked.connect(self._openMonitor)
+
         # Create QWidget for Limiter tab
         self.limiterWidget = QWidget(parent)
 
@@ -299,6 +320,8 @@ class LimiterWidget(QWidget):
         limiterLayout = QVBoxLayout(self.limiterWidget)
         limiterLayout.addLayout(selectionLayout)
         limiterLayout.addLayout(recapLayout)
+        limiterLayout.addWidget(self.monitorButton)
+        self.limiterLayout = limiterLayout
         self.limiterWidget.setLayout(limiterLayout)
 
     def getWidget(self) -> QWidget:
@@ -311,21 +334,32 @@ class LimiterWidget(QWidget):
 
         return self.limiterWidgetName
 
+    def _openMonitor(self) -> None:
+        """Replace monitor button with the live meter, importing it only now."""
+
+        from src.monitorWidget import MonitorWidget
+
+        self.monitorWidget = MonitorWidget()
+        self.monitorWidget.setThreshold(self.thresholdValue.text())
+        self.thresholdValue.textChanged.connect(self.monitorWidget.setThreshold)
+        self.limiterLayout.replaceWidget(self.monitorButton, self.monitorWidget)
+        self.monitorButton.deleteLater()
+
     def _computeMinimumWidth(self, listWidget: QListWidget) -> int:
         """Return max length of a QListWidget so we have its minimum width."""
 
-        res = listWidget.sizeHintForColumn(0)
-        for i in range(listWidget.count()):
-            if listWidget.sizeHintForColumn(i) > res:
-                res = listWidget.sizeHintForColumn(i)
-        return res
+        # Size hint of column 0 already covers the widest row
+        return listWidget.sizeHintForColumn(0)
 
+    @profiled(slot=True)
     def _updateOnSelection(self) -> None:
         """Update value labels."""
 
         # Get selected speaker, ampli and impedance
-        spk = self.speakersListWidget.currentItem().text()
-        ampli = self.amplisListWidget.currentItem().text()
+        spk = self.speakersListView.currentReference()
+        ampli = self.amplisListView.currentReference()
+        if spk is None or ampli is None:
+            return  # Selection filtered out by search, keep current values
         impedanceMode = self.impedanceListWidget.currentItem().text()
         impedanceInt = int(
             self.impedanceListWidget.currentItem().text().replace(" (bridge)", "")
@@ -337,7 +371,7 @@ class LimiterWidget(QWidget):
             self.speakers[spk].power * (self.speakers[spk].impedance / impedanceInt)
         )
         ampliGain = self.amplis[ampli].gain
-        ampliPower = self.amplis[ampli].power.get(impedanceMode)
+        ampliPower = self.amplis[ampli].getPower(impedanceMode)
 
         # Update value labels, set empty string if not possible
         self.impedanceValue.setText(f"{impedanceInt}")
@@ -364,20 +398,27 @@ class LimiterWidget(QWidget):
         """Update selected speaker to custom and update threshold."""
 
         self.selectedSpeakerLabel.setText(self.customText)
-        self._updatethreshold()
+        self.updateTimer.start()
 
     def _updateOnInputsAmpli(self) -> None:
         """Update selected ampli to custom and update threshold."""
 
         self.selectedAmpliLabel.setText(self.customText)
-        self._updatethreshold()
+        self.updateTimer.start()
 
+    @profiled(slot=True)
     def _updatethreshold(self) -> None:
         """Update threshold result with current parameters."""
 
-        self.speakerPowerValue.setText(self.speakerPowerValue.text().replace(",", "."))
-        self.ampliGainValue.setText(self.ampliGainValue.text().replace(",", "."))
-        self.ampliPowerValue.setText(self.ampliPowerValue.text().replace(",", "."))
+        # Only rewrite fields with a comma, without emitting textChanged again
+        for lineEdit in (
+            self.speakerPowerValue,
+            self.ampliGainValue,
+            self.ampliPowerValue,
+        ):
+            if "," in lineEdit.text():
+                with QSignalBlocker(lineEdit):
+                    lineEdit.setText(lineEdit.text().replace(",", "."))
 
         # Not empty and not 0
         if not (
@@ -390,21 +431,26 @@ class LimiterWidget(QWidget):
             and self.ampliPowerValue.text()
             and int(self.ampliPowerValue.text())
         ):
+            self.lastInputs = None
             self.thresholdValue.setText("")
+            self.thresholdValue.setToolTip("")
             return
 
-        limit = Limiter(
-            int(self.impedanceValue.text()),
-            self.speakerBaffleValue.currentText(),
-            int(self.speakerPowerValue.text()),
-            float(self.ampliGainValue.text()),
-            int(self.ampliPowerValue.text()),
-        )
+        impedance = int(self.impedanceValue.text())
+        speakerBaffle = self.speakerBaffleValue.currentText()
+        speakerPower = int(self.speakerPowerValue.text())
+        ampliGain = float(self.ampliGainValue.text())
+        ampliPower = int(self.ampliPowerValue.text())
+        inputs = (impedance, speakerBaffle, speakerPower, ampliGain, ampliPower)
+        if inputs == self.lastInputs:
+            return
+        self.lastInputs = inputs
 
-        smartSpkMax, smartAmpMax, smartThreshold = limit.computeTreshold(
-            smartLimit=True
+        smartSpkMax, smartAmpMax, smartThreshold = _computeTreshold(*inputs, True)
+        # True limit does not depend on baffle, share its cache entry
+        trueSpkMax, trueAmpMax, trueThreshold = _computeTreshold(
+            impedance, "CLOSED", speakerPower, ampliGain, ampliPower, False
         )
-        trueSpkMax, trueAmpMax, trueThreshold = limit.computeTreshold(smartLimit=False)
 
         self.thresholdValue.setText(f"{smartThreshold}")
         self.thresholdValue.setToolTip(
@@ -414,62 +460,10 @@ class LimiterWidget(QWidget):
             + "---------------------------------\n"
             + f"true limit = {trueThreshold} dBu\n"
             + f"true speaker Vmax = {trueSpkMax} V\n"
-            + f"true ampli Vmax = {trueAmpMax} V"
-        )
-
-    def _getAmplisSpecs(self, path: str) -> dict[str, Amplifier]:
-        """Return amplifiers specs from given JSON file.
-
-        For instance:
-            {
-                "reference": "Admark K420",
-                "gain": 41,
-                "power": {
-                    "8": 2000, [Optional]
-                    "4": 3400, [Optional]
-                    "2": 4760, [Optional]
-                    "8 (bridge)": 6800, [Optional]
-                    "4 (bridge)": 9520 [Optional]
-                },
-                "outputs": 4 [Optional]
-            }
-        """
-
-        with open(path) as f:
-            amplisData = json.load(f)
-            amplisData.sort(key=lambda x: x["reference"])
-        amplis = {}
-        for ampli in amplisData:
-            amplis[ampli["reference"]] = Amplifier(
-                reference=ampli["reference"],
-                gain=ampli["gain"],
-                power={
-                    "8": ampli["power"].get("8"),
-                    "4": ampli["power"].get("4"),
-                    "2": ampli["power"].get("2"),
-                    "8 (bridge)": ampli["power"].get("8 (bridge)"),
-                    "4 (bridge)": ampli["power"].get("4 (bridge)"),
-                },
-                outputs=ampli.get("outputs"),
-            )
-        return amplis
-
-    def _getSpeakersSpecs(self, path: str) -> dict[str, Speaker]:
-        """Return speakers specs from given JSON file.
-
-        No optional values here.
-        """
-
-        with open(path) as f:
-            speakersData = json.load(f)
-            speakersData.sort(key=lambda x: x["reference"])
-        speakers = {}
-        for spk in speakersData:
-            speakers[spk["reference"]] = Speaker(
-                reference=spk["reference"],
-                impedance=spk["impedance"],
-                power=spk["power"],
-                response=spk["response"],
-                baffle=spk["baffle"],
+            + f"true ampli Vmax = {trueAmpMax} V\n"
+            + "---------------------------------\n"
+            + "\n".join(
+                f"{profile.name} = {threshold} {profile.unit}"
+                for profile, threshold in _computeProfileTresholds(*inputs)
             )
-        return speakers
+        )
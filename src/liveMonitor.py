@@ -0,0 +1,408 @@
+"""Live RMS and peak levels of an audio input, for line checks.
+
+Audio blocks come from a sound card (sounddevice, optional) or from a stand
+in: a WAV file played in real time, or raw float32 frames from a pipe. They
+go through a single-producer single-consumer RingBuffer to a processing
+thread, which measures them step by step (10 ms) into preallocated arrays
+and publishes levels with a sequence counter instead of a lock. The audio
+callback never waits for the processing thread, which never waits for the
+GUI: a slow reader only gets levels a little later.
+
+Levels are in dBu at the limiter input: 0 dBFS is fullScale dBu (+18 dBu
+by default, EBU R68) and dBu are relative to the sensitivity of Limiter
+(0.775 V), so that they compare with Limiter.computeTreshold() thresholds.
+"""
+
+import math
+import os
+import select
+import threading
+import time
+
+from typing import BinaryIO, NamedTuple
+
+import numpy as np
+
+from src.audioAnalysis import FULL_SCALE, RMS_WINDOW, openSamples, toFloat
+
+
+# Measurement step (ms), levels are published once per step
+STEP = 10
+# Ring buffer length (s), how late processing may run before frames are dropped
+RING_LENGTH = 2.0
+# Frames read at once from files and pipes
+SOURCE_BLOCK = 1024
+
+
+class MeterLevels(NamedTuple):
+    """Levels (dBu) of the last RMS window and step, and highest ones since reset.
+
+    over is the share of steps whose RMS is above threshold, dropped the
+    number of frames lost because processing was late.
+    """
+
+    rms: float
+    peak: float
+    maxRms: float
+    maxPeak: float
+    over: float
+    dropped: int
+
+
+class RingBuffer:
+    """Lock-free ring of (frames, channels) float32 samples, one writer and one reader.
+
+    Each side only updates its own counter, after copying frames, so that
+    the other side never sees frames which are not completely copied.
+    """
+
+    def __init__(self, capacity: int, channels: int) -> None:
+        """Allocate the whole buffer once.
+
+        Parameters:
+            capacity: Number of frames
+            channels: Number of channels
+        """
+
+        self.buffer = np.zeros((capacity, channels), dtype=np.float32)
+        self.capacity = capacity
+        # Frames written and read since start, only updated by their side
+        self.written = 0
+        self.read = 0
+
+    def available(self) -> int:
+        """Return number of frames written and not read yet."""
+
+        return self.written - self.read
+
+    def write(self, block: np.ndarray) -> bool:
+        """Copy (frames, channels) block, return False if there is no room for it."""
+
+        frames = len(block)
+        if self.written - self.read + frames > self.capacity:
+            return False
+        start = self.written % self.capacity
+        first = min(frames, self.capacity - start)
+        self.buffer[start : start + first] = block[:first]
+        self.buffer[: frames - first] = block[first:]
+        self.written += frames
+        return True
+
+    def readInto(self, out: np.ndarray) -> bool:
+        """Fill out with the oldest frames, return False if there are not enough."""
+
+        frames = len(out)
+        if self.written - self.read < frames:
+            return False
+        start = self.read % self.capacity
+        first = min(frames, self.capacity - start)
+        out[:first] = self.buffer[start : start + first]
+        out[first:] = self.buffer[: frames - first]
+        self.read += frames
+        return True
+
+
+def toDbu(meanSquare: float, scale: float) -> float:
+    """Return level (dBu) of a mean square of samples, -inf for silence.
+
+    Parameters:
+        meanSquare: Mean square of samples, full scale is 1
+        scale: Squared ratio of full scale voltage over sensitivity
+    """
+
+    value = meanSquare * scale
+    return 10 * math.log10(value) if value > 0 else -math.inf
+
+
+class LiveMonitor:
+    """Processing thread measuring frames written into its ring buffer."""
+
+    def __init__(
+        self,
+        sampleRate: int,
+        channels: int,
+        fullScale: float = FULL_SCALE,
+        sensitivity: float = 0.775,
+        window: float = RMS_WINDOW,
+    ) -> None:
+        """Allocate every buffer used while processing.
+
+        Parameters:
+            sampleRate: Sample rate (Hz)
+            channels: Number of channels
+            fullScale: Level (dBu at 0.775 V) of 0 dBFS at the limiter input
+            sensitivity: Sensitivity, defaults to 0.775V
+            window: RMS window (ms), rounded to whole steps
+        """
+
+        self.sampleRate = sampleRate
+        self.channels = channels
+        self.ring = RingBuffer(round(sampleRate * RING_LENGTH), channels)
+        # Full scale voltage over sensitivity, squared
+        self.scale = (0.775 * 10 ** (fullScale / 20) / sensitivity) ** 2
+        self.stepFrames = max(1, round(sampleRate * STEP / 1000))
+        self.steps = max(1, round(window / STEP))
+        # Limiter threshold (dBu) written by the GUI, None for no threshold
+        self.threshold: float | None = None
+        # Frames dropped by sources when the ring buffer is full
+        self.dropped = 0
+
+        self.block = np.zeros((self.stepFrames, channels), dtype=np.float32)
+        self.squares = np.zeros((self.stepFrames, channels), dtype=np.float32)
+        self.stepSum = np.zeros(channels)
+        self.stepSums = np.zeros((self.steps, channels))
+        self.windowSum = np.zeros(channels)
+        self.index = 0
+        self.counts = [0, 0]  # Steps measured, steps over threshold
+        # rms, peak, maxRms, maxPeak, published under sequence
+        self.values = np.full(4, -math.inf)
+        self.sequence = 0
+        self.resetRequested = False
+
+        self.running = False
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start the processing thread."""
+
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop the processing thread, frames left in the ring are not measured."""
+
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def reset(self) -> None:
+        """Ask the processing thread to forget highest levels and over count."""
+
+        self.resetRequested = True
+
+    def _run(self) -> None:
+        """Measure steps as soon as they are available, sleep otherwise."""
+
+        idle = STEP / 1000 / 2
+        while self.running:
+            if self.ring.readInto(self.block):
+                self.process(self.block)
+            else:
+                time.sleep(idle)
+
+    def process(self, block: np.ndarray) -> None:
+        """Measure one step of frames and publish levels, without allocating arrays."""
+
+        np.multiply(block, block, out=self.squares)
+        np.sum(self.squares, axis=0, out=self.stepSum)
+        # Window sum slides by one step, recomputed on each turn against drift
+        self.windowSum -= self.stepSums[self.index]
+        self.stepSums[self.index] = self.stepSum
+        self.windowSum += self.stepSum
+        self.index = (self.index + 1) % self.steps
+        if not self.index:
+            np.sum(self.stepSums, axis=0, out=self.windowSum)
+
+        peak = max(float(block.max()), -float(block.min()))
+        rms = toDbu(
+            float(self.windowSum.max()) / (self.steps * self.stepFrames), self.scale
+        )
+        peak = toDbu(peak * peak, self.scale)
+
+        if self.resetRequested:
+            self.resetRequested = False
+            self.counts[:] = 0, 0
+            self.values[2:] = -math.inf
+        threshold = self.threshold
+        self.counts[0] += 1
+        if threshold is not None and rms > threshold:
+            self.counts[1] += 1
+
+        # Odd while values are being written, see levels()
+        self.sequence += 1
+        self.values[0] = rms
+        self.values[1] = peak
+        self.values[2] = max(self.values[2], rms)
+        self.values[3] = max(self.values[3], peak)
+        self.sequence += 1
+
+    def levels(self) -> MeterLevels:
+        """Return last published levels, from any thread."""
+
+        while True:
+            sequence = self.sequence
+            if not sequence % 2:
+                rms, peak, maxRms, maxPeak = self.values.tolist()
+                steps, over = self.counts
+                if sequence == self.sequence:
+                    break
+            # Levels being published, let the processing thread finish them
+            time.sleep(STEP / 1000)
+        return MeterLevels(
+            rms, peak, maxRms, maxPeak, over / max(1, steps), self.dropped
+        )
+
+
+class FileSource:
+    """Thread writing a WAV file or raw float32 frames into a monitor ring buffer.
+
+    Stand-in for a sound card: WAV files are played in real time (and
+    looped), raw streams (e.g. a pipe from a recorder) are written as they
+    come. Frames are dropped when the ring buffer is full.
+    """
+
+    def __init__(
+        self,
+        monitor: LiveMonitor,
+        path: str | None = None,
+        stream: BinaryIO | None = None,
+        loop: bool = True,
+    ) -> None:
+        """Prepare reading, raise ValueError for unreadable WAV files.
+
+        Parameters:
+            monitor: Monitor fed, with sample rate and channels of the source
+            path: WAV file played in real time
+            stream: Raw little-endian float32 interleaved frames, if no path
+            loop: Play WAV file again from the start once finished
+        """
+
+        self.monitor = monitor
+        self.stream = stream
+        self.loop = loop
+        self.samples = None
+        if path is not None:
+            header, self.samples = openSamples(path)
+            self.bits = header.bitsPerSample
+            if header.channels != monitor.channels:
+                raise ValueError(
+                    f"{path} has {header.channels} channels, not {monitor.channels}"
+                )
+        self.running = False
+        self.thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Start writing frames."""
+
+        self.running = True
+        target = self._playFile if self.samples is not None else self._readStream
+        self.thread = threading.Thread(target=target, daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """Stop writing frames.
+
+        Stream readers are waited for two steps at most: polled ones end
+        within a step, others (in memory, or on Windows) may stay blocked in
+        a read of their daemon thread until frames come.
+        """
+
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(None if self.stream is None else 2 * STEP / 1000)
+            self.thread = None
+
+    def _write(self, block: np.ndarray) -> None:
+        """Write block to the monitor ring, count it as dropped if full."""
+
+        if not self.monitor.ring.write(block):
+            self.monitor.dropped += len(block)
+
+    def _playFile(self) -> None:
+        """Write WAV blocks at the pace of their sample rate."""
+
+        sampleRate = self.monitor.sampleRate
+        start, played = time.perf_counter(), 0
+        while self.running:
+            for offset in range(0, len(self.samples), SOURCE_BLOCK):
+                if not self.running:
+                    return
+                block = toFloat(self.samples[offset : offset + SOURCE_BLOCK], self.bits)
+                self._write(block)
+                played += len(block)
+                delay = start + played / sampleRate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            if not self.loop or not len(self.samples):
+                self.running = False
+
+    def _readStream(self) -> None:
+        """Write raw frames as soon as a whole block is read."""
+
+        channels = self.monitor.channels
+        data = bytearray(SOURCE_BLOCK * channels * 4)
+        frames = np.frombuffer(data, dtype="<f4").reshape(SOURCE_BLOCK, channels)
+        view = memoryview(data)
+        try:
+            fd = self.stream.fileno() if os.name == "posix" else None
+        except OSError:
+            fd = None  # In memory stream
+        while self.running:
+            size = 0
+            while size < len(data) and self.running:
+                if fd is None:
+                    read = self.stream.readinto(view[size:])
+                else:
+                    # Wake up every step to see stop() instead of blocking in
+                    # a read, which would also hang interpreter shutdown
+                    if not select.select([fd], [], [], STEP / 1000)[0]:
+                        continue
+                    read = os.readv(fd, [view[size:]])
+                if not read:
+                    self.running = False
+                    break
+                size += read
+            self._write(frames[: size // (channels * 4)])
+
+
+class SoundCardSource:
+    """Sound card input stream writing into a monitor ring buffer (sounddevice)."""
+
+    def __init__(self, monitor: LiveMonitor, device: int | str | None = None) -> None:
+        """Open the input stream, raise ImportError without sounddevice.
+
+        Parameters:
+            monitor: Monitor fed, with sample rate and channels of the input
+            device: sounddevice input device, the default one if None
+        """
+
+        import sounddevice
+
+        self.monitor = monitor
+        self.stream = sounddevice.InputStream(
+            device=device,
+            channels=monitor.channels,
+            samplerate=monitor.sampleRate,
+            dtype="float32",
+            callback=self._callback,
+        )
+
+    @staticmethod
+    def defaultSettings(device: int | str | None = None) -> tuple[int, int]:
+        """Return sample rate and channels (2 at most) of an input device."""
+
+        import sounddevice
+
+        info = sounddevice.query_devices(device, "input")
+        return int(info["default_samplerate"]), min(2, info["max_input_channels"])
+
+    def _callback(self, indata: np.ndarray, frames: int, time, status) -> None:
+        """Copy frames into the ring, called by the audio thread."""
+
+        if not self.monitor.ring.write(indata):
+            self.monitor.dropped += frames
+
+    def start(self) -> None:
+        """Start capturing."""
+
+        self.stream.start()
+
+    def stop(self) -> None:
+        """Stop capturing and close the stream."""
+
+        self.stream.stop()
+        self.stream.close()
@@ -0,0 +1,207 @@
+from importlib.util import find_spec
+
+from PySide6.QtCore import QLineF, QRectF, QTimer
+from PySide6.QtGui import QColor, QPainter, QPen
+from PySide6.QtWidgets import (
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QPushButton,
+    QSizePolicy,
+    QWidget,
+)
+
+from src.audioAnalysis import openSamples
+from src.liveMonitor import FileSource, LiveMonitor, SoundCardSource
+from src.profiling import profiled
+
+
+class LevelMeter(QWidget):
+    """Horizontal RMS bar with peak mark and limiter threshold line, in dBu."""
+
+    minLevel = -40.0
+    maxLevel = 24.0
+    # Scale marks every ticks dB
+    ticks = 10
+
+    def __init__(self, parent: QWidget = None) -> None:
+        """Create an empty meter."""
+
+        super().__init__(parent)
+        self.rms = self.peak = self.maxPeak = float("-inf")
+        self.threshold: float | None = None
+        self.setMinimumHeight(28)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+
+    def setLevels(self, rms: float, peak: float, maxPeak: float) -> None:
+        """Set levels (dBu) and repaint."""
+
+        self.rms, self.peak, self.maxPeak = rms, peak, maxPeak
+        self.update()
+
+    def setThreshold(self, threshold: float | None) -> None:
+        """Set threshold (dBu) line, None to hide it, and repaint."""
+
+        self.threshold = threshold
+        self.update()
+
+    def _x(self, level: float) -> float:
+        """Return horizontal position of a level, clamped to the meter range."""
+
+        level = min(max(level, self.minLevel), self.maxLevel)
+        return (level - self.minLevel) / (self.maxLevel - self.minLevel) * self.width()
+
+    def paintEvent(self, event) -> None:
+        """Paint bar, peak marks, threshold and scale."""
+
+        painter = QPainter(self)
+        height = self.height()
+        painter.fillRect(self.rect(), QColor("#111111"))
+
+        over = self.threshold is not None and self.rms > self.threshold
+        painter.fillRect(
+            QRectF(0, 4, self._x(self.rms), height - 8),
+            QColor("#D03030" if over else "#30B030"),
+        )
+        for level, color, width in (
+            (self.peak, "#FFFFFF", 2),
+            (self.maxPeak, "#A0A0A0", 1),
+        ):
+            painter.setPen(QPen(QColor(color), width))
+            painter.drawLine(QLineF(self._x(level), 2, self._x(level), height - 2))
+        if self.threshold is not None:
+            painter.setPen(QPen(QColor("#FF4040"), 2))
+            x = self._x(self.threshold)
+            painter.drawLine(QLineF(x, 0, x, height))
+
+        painter.setPen(QColor("#808080"))
+        level = self.minLevel
+        while level <= self.maxLevel:
+            x = self._x(level)
+            painter.drawLine(QLineF(x, height - 4, x, height))
+            painter.drawText(int(x) + 2, height - 6, f"{level:g}")
+            level += self.ticks
+        painter.end()
+
+
+class MonitorWidget(QWidget):
+    """Live input meter of the limiter tab, against its current threshold."""
+
+    # Delay in ms between two meter refreshes
+    refreshDelay = 50
+
+    def __init__(self, parent: QWidget = None) -> None:
+        """Create buttons and meter, nothing is captured before start."""
+
+        super().__init__(parent)
+        self.monitor: LiveMonitor | None = None
+        self.source: FileSource | SoundCardSource | None = None
+        self.threshold: float | None = None
+
+        self.soundCardButton = QPushButton("Sound card")
+        if find_spec("sounddevice") is None:
+            self.soundCardButton.setEnabled(False)
+            self.soundCardButton.setToolTip("Install sounddevice to monitor inputs")
+        self.soundCardButton.clicked.connect(self._startSoundCard)
+        self.fileButton = QPushButton("WAV file...")
+        self.fileButton.clicked.connect(self._startFile)
+        self.stopButton = QPushButton("Stop")
+        self.stopButton.setEnabled(False)
+        self.stopButton.clicked.connect(self.stop)
+        self.resetButton = QPushButton("Reset")
+        self.resetButton.clicked.connect(self._reset)
+        self.meter = LevelMeter()
+        self.info = QLabel()
+
+        layout = QHBoxLayout(self)
+        layout.addWidget(QLabel("Monitor:"))
+        layout.addWidget(self.soundCardButton)
+        layout.addWidget(self.fileButton)
+        layout.addWidget(self.stopButton)
+        layout.addWidget(self.resetButton)
+        layout.addWidget(self.meter, stretch=1)
+        layout.addWidget(self.info)
+
+        # Levels are polled, the processing thread never signals the GUI
+        self.refreshTimer = QTimer(self)
+        self.refreshTimer.setInterval(self.refreshDelay)
+        self.refreshTimer.timeout.connect(self._refresh)
+
+    def setThreshold(self, text: str) -> None:
+        """Set threshold (dBu) from the threshold field text, empty for none."""
+
+        try:
+            self.threshold = float(text)
+        except ValueError:
+            self.threshold = None
+        if self.monitor is not None:
+            self.monitor.threshold = self.threshold
+        self.meter.setThreshold(self.threshold)
+
+    def _startSoundCard(self) -> None:
+        """Monitor the default sound card input."""
+
+        try:
+            sampleRate, channels = SoundCardSource.defaultSettings()
+            monitor = LiveMonitor(sampleRate, channels)
+            self._start(monitor, SoundCardSource(monitor))
+        except Exception as e:  # PortAudio errors have no common base class
+            self.info.setText(f"Cannot open sound card: {e}")
+
+    def _startFile(self) -> None:
+        """Ask for a WAV file and monitor it, played in a loop."""
+
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Monitor file", "", "WAV files (*.wav)"
+        )
+        if not path:
+            return
+        try:
+            header, _ = openSamples(path)
+            monitor = LiveMonitor(header.sampleRate, header.channels)
+            self._start(monitor, FileSource(monitor, path))
+        except (OSError, ValueError) as e:
+            self.info.setText(f"Cannot read {path}: {e}")
+
+    def _start(
+        self, monitor: LiveMonitor, source: FileSource | SoundCardSource
+    ) -> None:
+        """Replace current monitor, then start processing before capture."""
+
+        self.stop()
+        self.monitor, self.source = monitor, source
+        monitor.threshold = self.threshold
+        monitor.start()
+        source.start()
+        self.refreshTimer.start()
+        self.stopButton.setEnabled(True)
+
+    def stop(self) -> None:
+        """Stop capture and processing, keep last levels displayed."""
+
+        self.refreshTimer.stop()
+        if self.source is not None:
+            self.source.stop()
+            self.source = None
+        if self.monitor is not None:
+            self.monitor.stop()
+        self.stopButton.setEnabled(False)
+
+    def _reset(self) -> None:
+        """Forget highest levels and time over threshold."""
+
+        if self.monitor is not None:
+            self.monitor.reset()
+
+    @profiled(slot=True)
+    def _refresh(self) -> None:
+        """Show last published levels."""
+
+        levels = self.monitor.levels()
+        self.meter.setLevels(levels.rms, levels.peak, levels.maxPeak)
+        text = f"RMS {levels.rms:.1f} / max {levels.maxRms:.1f} dBu"
+        if self.threshold is not None:
+            text += f", over {levels.over * 100:.1f}%"
+        if levels.dropped:
+            text += f", {levels.dropped} frames dropped"
+        self.info.setText(text)
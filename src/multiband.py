@@ -0,0 +1,306 @@
+"""Per-band levels of program material for multi-way speakers.
+
+Speaker.response gives the range played by each way of a box, e.g.
+"50-330" for the Eric Audio LA8C Low and "2.2k-18k" for its High. Program
+material is split by Linkwitz-Riley crossovers at these frequencies (LR4 by
+default, two cascaded Butterworth filters), run as second-order sections
+whose state is carried from block to block. Every band is measured with a
+sliding RMS window as analyzeWav(), moved by steps of 1 ms instead of one
+frame, so that many bands cost little more than filtering them.
+
+Comparing band levels with the limiter threshold of each way tells which
+way limits first on a given track, which a single full-range level cannot.
+"""
+
+import math
+import re
+
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from src.amplifier import Amplifier, ImpedanceMode
+from src.audioAnalysis import (
+    BLOCK_SIZE,
+    FULL_SCALE,
+    RMS_WINDOW,
+    SlidingRms,
+    openSamples,
+    toDb,
+    toFloat,
+)
+from src.limiter import speakerTresholds
+from src.profiling import profiled
+from src.speaker import Speaker
+
+
+# Linkwitz-Riley order, LR4 is 24 dB per octave
+CROSSOVER_ORDER = 4
+# Ways of a box at the end of catalog references, e.g. "T3V (IA3V) Mid"
+WAY_PATTERN = re.compile(r"^(.+?)\s+(?:Sub|Kick|Low|Mid|High|Mid/High)(?:\s+\(.*\))?$")
+
+
+class BandAnalysis(NamedTuple):
+    """Levels of one way of a box, in dBu at the limiter input.
+
+    share is the band RMS over the full-range RMS (dB), engaged is the
+    share of windows above threshold.
+    """
+
+    speaker: str
+    low: float | None
+    high: float | None
+    rms: float
+    maxRms: float
+    share: float
+    threshold: float | None = None
+    engaged: float = 0.0
+
+    @property
+    def overshoot(self) -> float | None:
+        """Return loudest window over threshold (dB), None without threshold."""
+
+        return None if self.threshold is None else self.maxRms - self.threshold
+
+
+def boxName(reference: str) -> str:
+    """Return box of a speaker reference, the reference itself for one way boxes."""
+
+    match = WAY_PATTERN.match(reference)
+    return match.group(1) if match else reference
+
+
+def boxWays(speakers: Sequence[Speaker]) -> dict[str, list[Speaker]]:
+    """Return speakers grouped by box, ways sorted from lowest to highest."""
+
+    boxes: dict[str, list[Speaker]] = {}
+    for speaker in speakers:
+        boxes.setdefault(boxName(speaker.reference), []).append(speaker)
+    for ways in boxes.values():
+        ways.sort(key=lambda s: (s.responseLow or 0.0, s.responseHigh or math.inf))
+    return boxes
+
+
+def nominalMode(speaker: Speaker) -> ImpedanceMode:
+    """Return the unbridged mode driving one speaker alone on a channel."""
+
+    for mode in (ImpedanceMode.OHM_8, ImpedanceMode.OHM_4, ImpedanceMode.OHM_2):
+        if mode.impedance <= speaker.impedance:
+            return mode
+    return ImpedanceMode.OHM_2
+
+
+def crossoverSos(
+    low: float | None,
+    high: float | None,
+    sampleRate: int,
+    order: int = CROSSOVER_ORDER,
+) -> np.ndarray:
+    """Return second-order sections of a Linkwitz-Riley band-pass.
+
+    Raise ValueError if order is not a multiple of 2.
+
+    Parameters:
+        low: High-pass frequency (Hz), None or 0 to leave it open
+        high: Low-pass frequency (Hz), None or above Nyquist to leave it open
+        sampleRate: Sample rate (Hz)
+        order: Linkwitz-Riley order, e.g. 4 for LR4
+
+    Returns:
+        (sections, 6) array, no sections when both sides are open
+    """
+
+    # scipy.signal is slow to import, commands which do not split bands skip it
+    from scipy.signal import butter
+
+    if order < 2 or order % 2:
+        raise ValueError(f"Linkwitz-Riley order must be even, not {order}")
+    sections = [np.zeros((0, 6))]
+    # Each Linkwitz-Riley filter is a Butterworth of half order, twice
+    if low:
+        highPass = butter(order // 2, low, "highpass", fs=sampleRate, output="sos")
+        sections += [highPass, highPass]
+    if high and high < sampleRate / 2:
+        lowPass = butter(order // 2, high, "lowpass", fs=sampleRate, output="sos")
+        sections += [lowPass, lowPass]
+    return np.concatenate(sections)
+
+
+class BandMeter:
+    """Streaming sliding-window mean squares of frequency bands, per band.
+
+    Windows move by steps of 1 ms: squares are summed per step, then
+    windows are sums of steps, which is much lighter than one window per
+    frame on many bands.
+    """
+
+    def __init__(
+        self,
+        bands: Sequence[tuple[float | None, float | None]],
+        sampleRate: int,
+        channels: int,
+        window: float = RMS_WINDOW,
+        order: int = CROSSOVER_ORDER,
+    ) -> None:
+        """Design crossovers, start with empty filter states and windows.
+
+        Parameters:
+            bands: (low, high) frequencies (Hz) of each band, see crossoverSos()
+            sampleRate: Sample rate of blocks (Hz)
+            channels: Number of channels of blocks
+            window: RMS window (ms)
+            order: Linkwitz-Riley order
+        """
+
+        self.channels = channels
+        self.sos = [crossoverSos(low, high, sampleRate, order) for low, high in bands]
+        self.states = [np.zeros((len(sos), channels, 2)) for sos in self.sos]
+        self.step = max(1, round(sampleRate / 1000))
+        self.window = max(1, round(window * sampleRate / 1000 / self.step))
+        # Squares of frames after the last whole step per (band, channel),
+        # and sums of the steps of the last window
+        self.pending = np.zeros((len(self.sos), channels, 0))
+        self.tail = np.zeros((0, len(self.sos), channels))
+        self.sums = np.zeros((len(self.sos), channels))
+        self.frames = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Return (windows, bands) mean squares of the loudest channel of each band."""
+
+        from scipy.signal import sosfilt
+
+        pending = self.pending.shape[-1] + len(block)
+        whole = pending // self.step * self.step
+        steps = np.empty((whole // self.step, len(self.sos), self.channels))
+        nextPending = np.empty((len(self.sos), self.channels, pending - whole))
+        # Channels first, frame sums of each step are then contiguous
+        block = np.ascontiguousarray(block.T)
+        for i, sos in enumerate(self.sos):
+            if len(sos):
+                filtered, self.states[i] = sosfilt(sos, block, zi=self.states[i])
+            else:
+                filtered = block
+            squares = np.concatenate([self.pending[i], filtered * filtered], axis=1)
+            stepSums = squares[:, :whole].reshape(self.channels, -1, self.step).sum(2)
+            steps[:, i] = stepSums.T
+            nextPending[i] = squares[:, whole:]
+        self.pending = nextPending
+        self.sums += steps.sum(axis=0)
+        self.frames += whole
+
+        steps = np.concatenate([self.tail, steps])
+        self.tail = steps[max(0, len(steps) - self.window + 1) :]
+        if len(steps) < self.window:
+            return np.zeros((0, len(self.sos)))
+        # Same cumulative sums as SlidingRms, restarted on each block
+        sums = np.cumsum(steps, axis=0)
+        means = np.empty((len(steps) - self.window + 1,) + steps.shape[1:])
+        means[0] = sums[self.window - 1]
+        np.subtract(sums[self.window :], sums[: -self.window], out=means[1:])
+        means /= self.window * self.step
+        np.maximum(means, 0.0, out=means)
+        return means.max(axis=2)
+
+    def meanSquares(self) -> np.ndarray:
+        """Return mean square of the loudest channel of each band, since the start."""
+
+        sums = self.sums + self.pending.sum(axis=2)
+        frames = self.frames + self.pending.shape[-1]
+        return (sums / max(1, frames)).max(axis=1)
+
+
+@profiled()
+def analyzeBands(
+    path: str,
+    speakers: Sequence[Speaker],
+    thresholds: Sequence[float] | None = None,
+    fullScale: float = FULL_SCALE,
+    window: float = RMS_WINDOW,
+    order: int = CROSSOVER_ORDER,
+    blockSize: int = BLOCK_SIZE,
+) -> list[BandAnalysis]:
+    """Return band levels of a WAV file for each way of a box.
+
+    Ways with an unknown range (e.g. "ACTIVE") get the full-range signal.
+    Raise ValueError for files which are not readable PCM or float WAV.
+
+    Parameters:
+        path: WAV file path
+        speakers: Ways of the box, see boxWays()
+        thresholds: Limiter threshold (dBu) of each way, see wayTresholds()
+        fullScale: Level (dBu) of 0 dBFS at the limiter input
+        window: RMS window (ms)
+        order: Linkwitz-Riley order
+        blockSize: Frames converted at once
+    """
+
+    header, samples = openSamples(path)
+    bands = [(s.responseLow, s.responseHigh) for s in speakers]
+    # Last band is full range, for the share of each way
+    meter = BandMeter(
+        bands + [(None, None)], header.sampleRate, header.channels, window, order
+    )
+    limits = (
+        None
+        if thresholds is None
+        else 10 ** ((np.asarray(thresholds, dtype=np.float64) - fullScale) / 10)
+    )
+
+    maxMeanSquares = np.zeros(len(bands) + 1)
+    windows = 0
+    engaged = np.zeros(len(bands))
+    for start in range(0, len(samples), blockSize):
+        meanSquares = meter.process(
+            toFloat(samples[start : start + blockSize], header.bitsPerSample)
+        )
+        windows += len(meanSquares)
+        np.maximum(
+            maxMeanSquares, meanSquares.max(axis=0, initial=0.0), out=maxMeanSquares
+        )
+        if limits is not None:
+            engaged += np.count_nonzero(meanSquares[:, :-1] > limits, axis=0)
+    del samples
+
+    meanSquares = meter.meanSquares()
+    if not windows:
+        # Track shorter than the window, one window over the whole track
+        windows = 1
+        maxMeanSquares = meanSquares
+        if limits is not None:
+            engaged = (meanSquares[:-1] > limits).astype(np.float64)
+    fullRange = toDb(math.sqrt(meanSquares[-1]))
+    results = []
+    for i, speaker in enumerate(speakers):
+        rms = toDb(math.sqrt(meanSquares[i]))
+        results.append(
+            BandAnalysis(
+                speaker=speaker.reference,
+                low=speaker.responseLow,
+                high=speaker.responseHigh,
+                rms=rms + fullScale,
+                maxRms=toDb(math.sqrt(maxMeanSquares[i])) + fullScale,
+                share=rms - fullRange,
+                threshold=None if thresholds is None else float(thresholds[i]),
+                engaged=float(engaged[i]) / windows,
+            )
+        )
+    return results
+
+
+def wayTresholds(
+    speakers: Sequence[Speaker],
+    ampli: Amplifier,
+    smartLimit: bool = True,
+    sensitivity: float = 0.775,
+) -> np.ndarray:
+    """Return limiter threshold (dBu) of each way, alone on a channel of ampli.
+
+    Raise ValueError if the amplifier has no power in the mode of a way.
+    """
+
+    thresholds = np.empty(len(speakers))
+    for i, speaker in enumerate(speakers):
+        thresholds[i] = speakerTresholds(
+            [speaker], ampli, nominalMode(speaker), smartLimit, sensitivity
+        )[0]
+    return thresholds
@@ -0,0 +1,101 @@
+"""Float-native computations, without any Decimal allocation.
+
+These are the formulas behind converter, Limiter and AmpGain, returning raw
+floats for bulk and real-time use. Rounding for display or export is done
+afterwards with src.rounding, which reproduces the Decimal results exactly.
+Converter functions only use arithmetic so they also accept numpy arrays.
+"""
+
+from math import log10, sqrt
+
+
+# El famoso "smart limiter" from Hornplans
+BAFFLE_FACTOR_OPEN = 1.5625
+BAFFLE_FACTOR_CLOSED = 2.34375
+AMPLI_FACTOR = 2
+
+
+def freqToDistance(freq: float, c: float) -> float:
+    """Return wave length (m) from given freq (Hz) and c (m.s-1)."""
+
+    return c / freq
+
+
+def freqToTime(freq: float, c: float) -> float:
+    """Return period (ms) from given freq (Hz), c is unused."""
+
+    return 1 / (freq * 0.001)
+
+
+def distanceToTime(distance: float, c: float) -> float:
+    """Return time (ms) from given distance (m) and c (m.s-1)."""
+
+    return (distance / c) * 1000
+
+
+def distanceToFreq(distance: float, c: float) -> float:
+    """Return freq (Hz) from given distance (m) and c (m.s-1)."""
+
+    return c / distance
+
+
+def timeToFreq(time: float) -> float:
+    """Return freq (Hz) from given time (ms)."""
+
+    return 1 / (time * 0.001)
+
+
+def timeToDistance(time: float, c: float) -> float:
+    """Return distance (m) from given time (ms) and c (m.s-1)."""
+
+    return (time * c) / 1000
+
+
+def ampGain(voltageIn: float, voltageOut: float) -> float:
+    """Return amplifier gain (dB) from V_IN and V_OUT."""
+
+    return 20 * log10(voltageOut / voltageIn)
+
+
+def computeTreshold(
+    impedance: float,
+    speakerBaffle: str,
+    speakerPower: float,
+    ampliGain: float,
+    ampliPower: float,
+    smartLimit: bool,
+    sensitivity: float = 0.775,
+) -> tuple[float, float, float]:
+    """Return raw V_spk_max (V), V_amp_max (V) and threshold (dBu).
+
+    Raise ValueError (math domain error) when a power or the impedance is 0.
+
+    Parameters:
+        impedance: Working impedance
+        speakerBaffle: Type of baffle, either "OPEN" or "CLOSED"
+        speakerPower: AES speaker power
+        ampliGain: Ampli gain in dBu
+        ampliPower: RMS ampli power
+        smartLimit: Compute threshold with strict factor on power values
+        sensitivity: Sensitivity, defaults to 0.775V
+    """
+
+    if not smartLimit:
+        baffleFactor = 1
+    elif speakerBaffle == "OPEN":
+        baffleFactor = BAFFLE_FACTOR_OPEN
+    else:
+        baffleFactor = BAFFLE_FACTOR_CLOSED
+    ampliFactor = AMPLI_FACTOR if smartLimit else 1
+
+    # RMS voltage corresponding to given speaker power at given impedance
+    vSpkMax = sqrt((speakerPower / baffleFactor) * impedance)
+    # We convert this RMS voltage to dBu, then remove gain of the amplifier
+    thresholdSpk = 20 * log10(vSpkMax / sensitivity) - ampliGain
+
+    # Same for the amplifier power
+    vAmpMax = sqrt((ampliPower / ampliFactor) * impedance)
+    thresholdAmp = 20 * log10(vAmpMax / sensitivity) - ampliGain
+
+    # We take the most strict threshold to protect ampli & speaker
+    return vSpkMax, vAmpMax, min(thresholdSpk, thresholdAmp)
@@ -0,0 +1,415 @@
+"""Reader of DSP408 preset files (*.prs) and indexed preset library.
+
+A preset is 1452 bytes of little-endian fields: the ***DSP408V010***
+magic, the preset name, 4 input blocks of 140 bytes, 8 output blocks of 104
+bytes and a 30 bytes trailer. Each block starts with the 8 bytes channel
+name followed by unsigned 16 bits values, decoded here with struct straight
+from a memoryview of the file, without copying blocks.
+
+Raw values are converted to the units of the vendor software:
+    gains: (raw - 280) / 10 dB, 280 is 0 dB
+    EQ gains: (raw - 120) / 10 dB
+    thresholds: raw / 2 - 90 dBu, 220 (+20 dBu) is the default
+    attack and release: raw + 1 ms
+    frequencies: 20 * 1000 ** (raw / 300) Hz, 0 is 20 Hz and 300 is 20 kHz
+
+Q, crossover slopes and delays are kept as raw vendor values. patchPreset()
+writes limiter thresholds and output names back into a copy of a preset,
+every other byte of the base file is kept as is.
+"""
+
+import math
+import os
+import struct
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator, NamedTuple
+
+import numpy as np
+
+from src.profiling import profiled
+
+
+MAGIC = b"***DSP408V010***"
+PRESET_SIZE = 1452
+PRESETS_PATH = Path(__file__).parent.parent.resolve() / "resources" / "presets"
+
+INPUTS = 4
+OUTPUTS = 8
+HEADER = struct.Struct("<16s14s")
+# Name, 4 unknown values, 31 band graphic EQ, 8 (gain, freq, q) bands,
+# high pass, low pass, slopes, gain, phase, delay and channel bit
+INPUT = struct.Struct("<8s4H31H24H3H4H")
+# Name, routed inputs mask, 4 input mix gains, high pass, low pass, slopes,
+# 9 (gain, freq, q) bands, compressor (ratio, attack, release, unknown,
+# threshold), limiter (attack, release, unknown, threshold), gain, phase,
+# delay and linked outputs mask
+OUTPUT = struct.Struct("<8sH4H3H27H5H4H4H")
+INPUTS_OFFSET = HEADER.size
+OUTPUTS_OFFSET = INPUTS_OFFSET + INPUTS * INPUT.size
+TRAILER_OFFSET = OUTPUTS_OFFSET + OUTPUTS * OUTPUT.size
+
+# Byte offsets of output fields, relative to the output block
+OUTPUT_RATIO = 78
+OUTPUT_COMPRESSOR_THRESHOLD = 86
+OUTPUT_LIMITER_THRESHOLD = 94
+OUTPUT_GAIN = 96
+NAME = struct.Struct("8s")
+U16 = struct.Struct("<H")
+# Last compressor ratio of the vendor list, "Limit"
+RATIO_LIMIT = 15
+# Limiter threshold range (dBu) and step (dB)
+THRESHOLD_MIN = -90.0
+THRESHOLD_MAX = 20.0
+THRESHOLD_STEP = 0.5
+
+
+def freqFromIndex(index: int) -> float:
+    """Return frequency (Hz) of a raw frequency index."""
+
+    return 20 * 1000 ** (index / 300)
+
+
+def gainFromRaw(raw: int) -> float:
+    """Return gain (dB) of a raw channel gain."""
+
+    return (raw - 280) / 10
+
+
+def thresholdFromRaw(raw: int) -> float:
+    """Return threshold (dBu) of a raw compressor or limiter threshold."""
+
+    return raw * THRESHOLD_STEP + THRESHOLD_MIN
+
+
+def thresholdToRaw(threshold: float) -> int:
+    """Return raw threshold of a threshold (dBu).
+
+    Thresholds are rounded down to the 0.5 dB step of the processor, so the
+    written limit is never above the computed one, and clamped to its range.
+    """
+
+    if math.isnan(threshold):
+        raise ValueError("threshold must be a number")
+    threshold = min(max(threshold, THRESHOLD_MIN), THRESHOLD_MAX)
+    raw = math.floor((threshold - THRESHOLD_MIN) / THRESHOLD_STEP)
+    # threshold - THRESHOLD_MIN rounds up for thresholds just below a step
+    return raw - 1 if raw and thresholdFromRaw(raw) > threshold else raw
+
+
+class EqBand(NamedTuple):
+    """One parametric EQ band."""
+
+    gain: float
+    freq: float
+    q: int
+
+
+class Crossover(NamedTuple):
+    """High pass and low pass frequencies (Hz) with their raw slopes."""
+
+    highPass: float
+    lowPass: float
+    highPassSlope: int
+    lowPassSlope: int
+
+
+class Dynamics(NamedTuple):
+    """Compressor or limiter settings, ratio is None for the limiter."""
+
+    threshold: float
+    attack: int
+    release: int
+    ratio: int | None = None
+
+
+class InputChannel(NamedTuple):
+    """Decoded input block."""
+
+    index: int
+    name: str
+    gain: float
+    phase: bool
+    delay: int
+    crossover: Crossover
+    graphicEq: tuple[float, ...]
+    eq: tuple[EqBand, ...]
+
+
+class OutputChannel(NamedTuple):
+    """Decoded output block."""
+
+    index: int
+    name: str
+    inputs: int
+    mixGains: tuple[float, ...]
+    gain: float
+    phase: bool
+    delay: int
+    link: int
+    crossover: Crossover
+    eq: tuple[EqBand, ...]
+    compressor: Dynamics
+    limiter: Dynamics
+
+    @property
+    def threshold(self) -> float:
+        """Return threshold (dBu) above which output is actually limited.
+
+        Compressor at "Limit" ratio is used as a limiter in most presets,
+        the lowest of both thresholds wins.
+        """
+
+        if self.compressor.ratio == RATIO_LIMIT:
+            return min(self.compressor.threshold, self.limiter.threshold)
+        return self.limiter.threshold
+
+
+class Preset(NamedTuple):
+    """Decoded preset file."""
+
+    path: str
+    name: str
+    inputs: tuple[InputChannel, ...]
+    outputs: tuple[OutputChannel, ...]
+    trailer: bytes
+
+
+def _decodeName(raw: bytes) -> str:
+    """Return channel or preset name without its NUL padding."""
+
+    return raw.split(b"\0", 1)[0].decode("latin-1").strip()
+
+
+def _eqBands(values: tuple[int, ...]) -> tuple[EqBand, ...]:
+    """Return EQ bands of flat (gain, freq, q) raw values."""
+
+    return tuple(
+        EqBand((values[i] - 120) / 10, freqFromIndex(values[i + 1]), values[i + 2])
+        for i in range(0, len(values), 3)
+    )
+
+
+def _crossover(highPass: int, lowPass: int, slopes: int) -> Crossover:
+    """Return crossover of raw frequency indexes and packed slopes."""
+
+    return Crossover(
+        freqFromIndex(highPass), freqFromIndex(lowPass), slopes & 0xFF, slopes >> 8
+    )
+
+
+def _parseInput(view: memoryview, index: int) -> InputChannel:
+    """Return input channel of given index."""
+
+    values = INPUT.unpack_from(view, INPUTS_OFFSET + index * INPUT.size)
+    gain, phase, delay, _ = values[63:67]
+    return InputChannel(
+        index=index,
+        name=_decodeName(values[0]),
+        gain=gainFromRaw(gain),
+        phase=bool(phase),
+        delay=delay,
+        crossover=_crossover(*values[60:63]),
+        graphicEq=tuple((value - 120) / 10 for value in values[5:36]),
+        eq=_eqBands(values[36:60]),
+    )
+
+
+def _parseOutput(view: memoryview, index: int) -> OutputChannel:
+    """Return output channel of given index."""
+
+    values = OUTPUT.unpack_from(view, OUTPUTS_OFFSET + index * OUTPUT.size)
+    ratio, attack, release, _, threshold = values[36:41]
+    limiterAttack, limiterRelease, _, limiterThreshold = values[41:45]
+    gain, phase, delay, link = values[45:49]
+    return OutputChannel(
+        index=index,
+        name=_decodeName(values[0]),
+        inputs=values[1],
+        mixGains=tuple(gainFromRaw(value) for value in values[2:6]),
+        gain=gainFromRaw(gain),
+        phase=bool(phase),
+        delay=delay,
+        link=link,
+        crossover=_crossover(*values[6:9]),
+        eq=_eqBands(values[9:36]),
+        compressor=Dynamics(
+            thresholdFromRaw(threshold), attack + 1, release + 1, ratio
+        ),
+        limiter=Dynamics(
+            thresholdFromRaw(limiterThreshold), limiterAttack + 1, limiterRelease + 1
+        ),
+    )
+
+
+def parsePreset(data: bytes | memoryview, path: str = "") -> Preset:
+    """Return decoded preset, raise ValueError if data is not a DSP408 preset.
+
+    Parameters:
+        data: Whole preset file content
+        path: File the data comes from, kept in the result
+    """
+
+    view = memoryview(data)
+    if len(view) != PRESET_SIZE or view[: len(MAGIC)] != MAGIC:
+        raise ValueError(f"Not a DSP408 preset: {path or 'data'}")
+    _, name = HEADER.unpack_from(view)
+    return Preset(
+        path=path,
+        name=_decodeName(name),
+        inputs=tuple(_parseInput(view, i) for i in range(INPUTS)),
+        outputs=tuple(_parseOutput(view, i) for i in range(OUTPUTS)),
+        trailer=bytes(view[TRAILER_OFFSET:]),
+    )
+
+
+def readPreset(path: str | Path) -> Preset:
+    """Return decoded preset of given file."""
+
+    with open(path, "rb") as f:
+        return parsePreset(f.read(), str(path))
+
+
+def patchOutput(
+    data: bytearray,
+    index: int,
+    threshold: float | None = None,
+    name: str | None = None,
+) -> None:
+    """Write threshold and name of an output in place.
+
+    The threshold goes to the compressor when its ratio is "Limit", as most
+    presets use it, else to the limiter. The limiter is only raised when it
+    would still cap the output lower, so OutputChannel.threshold reads the
+    written threshold back.
+
+    Parameters:
+        data: Whole preset file content
+        index: Output index, from 0 to 7
+        threshold: Limiter threshold (dBu), None to keep it
+        name: Output name, at most 8 latin-1 characters, None to keep it
+    """
+
+    if not 0 <= index < OUTPUTS:
+        raise ValueError(f"output must be between 1 and {OUTPUTS}, not {index + 1}")
+    offset = OUTPUTS_OFFSET + index * OUTPUT.size
+    if threshold is not None:
+        raw = thresholdToRaw(threshold)
+        (ratio,) = U16.unpack_from(data, offset + OUTPUT_RATIO)
+        (limiter,) = U16.unpack_from(data, offset + OUTPUT_LIMITER_THRESHOLD)
+        if ratio == RATIO_LIMIT:
+            U16.pack_into(data, offset + OUTPUT_COMPRESSOR_THRESHOLD, raw)
+        if ratio != RATIO_LIMIT or limiter < raw:
+            U16.pack_into(data, offset + OUTPUT_LIMITER_THRESHOLD, raw)
+    if name is not None:
+        encoded = name.encode("latin-1")
+        if len(encoded) > NAME.size:
+            raise ValueError(f"output name must be {NAME.size} characters max")
+        # Padded with NUL bytes
+        NAME.pack_into(data, offset, encoded)
+
+
+def patchPreset(
+    base: bytes, outputs: dict[int, tuple[float | None, str | None]]
+) -> bytes:
+    """Return copy of base preset with thresholds and names of given outputs.
+
+    Parameters:
+        base: Whole base preset file content
+        outputs: (threshold, name) of output indexes, None values are kept
+    """
+
+    parsePreset(base)
+    data = bytearray(base)
+    for index, (threshold, name) in outputs.items():
+        patchOutput(data, index, threshold, name)
+    return bytes(data)
+
+
+class PresetLibrary:
+    """Presets of a directory tree, with outputs indexed for queries."""
+
+    @profiled()
+    def __init__(self, directory: str | Path = PRESETS_PATH) -> None:
+        """Scan directory once, files which are not presets are skipped.
+
+        Parameters:
+            directory: Root directory, searched recursively for *.prs files
+        """
+
+        self.directory = Path(directory)
+        self.presets: list[Preset] = []
+        self.errors: list[str] = []
+        for root, dirs, files in os.walk(self.directory):
+            dirs.sort()
+            for file in sorted(files):
+                if not file.lower().endswith(".prs"):
+                    continue
+                try:
+                    self.presets.append(readPreset(os.path.join(root, file)))
+                except (OSError, ValueError) as e:
+                    self.errors.append(f"{os.path.join(root, file)}: {e}")
+
+        # One row per output of every preset, struct of arrays for queries
+        self.outputs = [
+            (preset, output) for preset in self.presets for output in preset.outputs
+        ]
+        self.thresholds = np.array(
+            [output.threshold for _, output in self.outputs], dtype=np.float64
+        )
+        self.highPass = np.array(
+            [output.crossover.highPass for _, output in self.outputs],
+            dtype=np.float64,
+        )
+        self.lowPass = np.array(
+            [output.crossover.lowPass for _, output in self.outputs],
+            dtype=np.float64,
+        )
+        self.names = np.array(
+            [output.name.lower() for _, output in self.outputs], dtype=str
+        )
+
+    def __len__(self) -> int:
+        """Return number of presets."""
+
+        return len(self.presets)
+
+    def find(
+        self,
+        minThreshold: float | None = None,
+        maxThreshold: float | None = None,
+        maxLowPass: float | None = None,
+        minHighPass: float | None = None,
+        name: str | None = None,
+    ) -> Iterator[tuple[Preset, OutputChannel]]:
+        """Yield outputs matching all given criteria, in preset order.
+
+        Parameters:
+            minThreshold: Lowest threshold (dBu), e.g. subs limited above X
+            maxThreshold: Highest threshold (dBu), default +20 dBu is unlimited
+            maxLowPass: Highest low pass (Hz), e.g. 200 for subwoofers
+            minHighPass: Lowest high pass (Hz), e.g. 1000 for highs
+            name: Case insensitive part of output name
+        """
+
+        mask = np.ones(len(self.outputs), dtype=bool)
+        if minThreshold is not None:
+            mask &= self.thresholds >= minThreshold
+        if maxThreshold is not None:
+            mask &= self.thresholds <= maxThreshold
+        if maxLowPass is not None:
+            mask &= self.lowPass <= maxLowPass
+        if minHighPass is not None:
+            mask &= self.highPass >= minHighPass
+        if name:
+            mask &= np.char.find(self.names, name.lower()) >= 0
+        for i in np.flatnonzero(mask):
+            yield self.outputs[i]
+
+
+@lru_cache(maxsize=None)
+def loadPresetLibrary(directory: str | Path = PRESETS_PATH) -> PresetLibrary:
+    """Return preset library of directory, scanned on first call only."""
+
+    return PresetLibrary(directory)
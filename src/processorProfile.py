@@ -0,0 +1,180 @@
+"""Limiter thresholds in the units of target processors.
+
+Ported from resources/calc_hornplans.js: each processor adds an offset (dB)
+to the raw dBu threshold, e.g. -2.5 on T.Racks DS2/4 or -22 + 1.5 on DCX2496
+subs, then rounds it down to its resolution (calc_hornplans.js "rounddown if
+positive, roundup otherwise", which is a floor). The "dBu" profile gives
+exactly Limiter.computeTreshold() thresholds.
+
+Profiles are NamedTuples, so the whole registry is evaluated in one
+broadcast pass over any array of thresholds, e.g. every speaker, amplifier
+and impedance mode of the catalog with catalogTresholds().
+"""
+
+from decimal import Decimal
+from typing import NamedTuple, Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from src.amplifier import ImpedanceMode
+from src.catalog import Catalog
+from src.limiter import rawTresholds
+from src.rounding import quantizeThreshold, roundFloorArray
+
+
+# Input level offset of Behringer DCX2496 limiters (dB)
+DCX_OFFSET = -22
+
+
+class ProcessorProfile(NamedTuple):
+    """Limiter of a processor, offset (dB) is added to dBu thresholds."""
+
+    name: str
+    unit: str
+    offset: float = 0.0
+    places: int = 1
+
+    def quantize(self, threshold: float) -> Decimal:
+        """Return raw dBu threshold in processor units, as displayed."""
+
+        return quantizeThreshold(threshold + self.offset, self.places)
+
+    def convert(self, thresholds: ArrayLike) -> np.ndarray:
+        """Return raw dBu thresholds in processor units, as floats."""
+
+        return _convert(
+            np.asarray(thresholds, dtype=np.float64), self.offset, self.places
+        )
+
+
+PROFILES: dict[str, ProcessorProfile] = {}
+
+
+def registerProfile(profile: ProcessorProfile) -> ProcessorProfile:
+    """Add profile to the registry, replacing any profile of same name."""
+
+    PROFILES[profile.name] = profile
+    return profile
+
+
+def getProfile(name: str) -> ProcessorProfile:
+    """Return profile with given name, raise KeyError if unknown."""
+
+    return PROFILES[name]
+
+
+for _profile in (
+    ProcessorProfile("dBu", "dBu"),
+    ProcessorProfile("T.Racks DS2/4", "dB", -2.5, 0),
+    ProcessorProfile("DCX2496 SUB", "dB", DCX_OFFSET + 1.5),
+    ProcessorProfile("DCX2496 Top", "dB", DCX_OFFSET + 3.75),
+):
+    registerProfile(_profile)
+
+
+def _convert(
+    thresholds: np.ndarray, offset: ArrayLike, places: ArrayLike
+) -> np.ndarray:
+    """Return thresholds plus offset, floored to places, all broadcast."""
+
+    scale = 10.0 ** np.asarray(places, dtype=np.float64)
+    # Impossible combinations are inf or nan, and stay so
+    with np.errstate(invalid="ignore"):
+        return roundFloorArray(thresholds + offset, scale) / scale
+
+
+def profileTresholds(
+    thresholds: ArrayLike, profiles: Sequence[ProcessorProfile] | None = None
+) -> np.ndarray:
+    """Return raw dBu thresholds in units of each profile, in one pass.
+
+    Parameters:
+        thresholds: Raw thresholds (dBu), any shape
+        profiles: Profiles to evaluate, the whole registry by default
+
+    Returns:
+        Array of thresholds shape with one more leading axis for profiles
+    """
+
+    if profiles is None:
+        profiles = list(PROFILES.values())
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    # Profile axis first, then as many axes as thresholds
+    axes = (-1,) + (1,) * thresholds.ndim
+    offsets = np.array([p.offset for p in profiles], dtype=np.float64).reshape(axes)
+    places = np.array([p.places for p in profiles], dtype=np.float64).reshape(axes)
+    return _convert(thresholds, offsets, places)
+
+
+class CatalogTresholds(NamedTuple):
+    """Thresholds of every (profile, speaker, amplifier, mode) of a catalog.
+
+    Values are nan when the amplifier has no power in a mode or when the
+    speaker cannot work at the mode impedance (e.g. F221 cannot be 8 Ohm).
+    """
+
+    profiles: list[ProcessorProfile]
+    speakers: list[str]
+    amplifiers: list[str]
+    modes: list[ImpedanceMode]
+    values: np.ndarray
+
+
+def catalogTresholds(
+    catalog: Catalog,
+    smartLimit: bool = True,
+    profiles: Sequence[ProcessorProfile] | None = None,
+    sensitivity: float = 0.775,
+) -> CatalogTresholds:
+    """Return thresholds of all catalog combinations in all profiles.
+
+    The result is dense, profiles x speakers x amplifiers x modes floats.
+
+    Parameters:
+        catalog: Catalog whose speakers and amplifiers are combined
+        smartLimit: Compute thresholds with strict factor on power values
+        profiles: Profiles to evaluate, the whole registry by default
+        sensitivity: Sensitivity, defaults to 0.775V
+    """
+
+    if profiles is None:
+        profiles = list(PROFILES.values())
+    speakers = list(catalog.speakers.values())
+    modes = list(ImpedanceMode)
+
+    # (speakers, 1, modes) against (amplifiers, modes)
+    impedance = np.array([mode.impedance for mode in modes], dtype=np.float64)
+    speakerImpedance = np.array([s.impedance for s in speakers], dtype=np.float64)
+    speakerPower = np.array([s.power for s in speakers], dtype=np.float64)
+    # Same power scaling as the limiter tab, powers are truncated to W
+    speakerPower = np.where(
+        impedance <= speakerImpedance[:, np.newaxis],
+        np.floor(
+            speakerPower[:, np.newaxis] * (speakerImpedance[:, np.newaxis] / impedance)
+        ),
+        np.nan,
+    )[:, np.newaxis, :]
+    baffle = np.array([s.baffle for s in speakers])[:, np.newaxis, np.newaxis]
+    ampliPower = catalog.amplifierPowers.astype(np.float64)
+    ampliPower[ampliPower == 0] = np.nan
+    ampliGain = np.array(
+        [ampli.gain for ampli in catalog.amplifiers.values()], dtype=np.float64
+    )[:, np.newaxis]
+
+    _, _, thresholds = rawTresholds(
+        impedance,
+        baffle,
+        speakerPower,
+        ampliGain,
+        ampliPower,
+        smartLimit,
+        sensitivity,
+    )
+    return CatalogTresholds(
+        list(profiles),
+        list(catalog.speakers),
+        list(catalog.amplifiers),
+        modes,
+        profileTresholds(thresholds, profiles),
+    )
@@ -0,0 +1,196 @@
+"""Opt-in timings and call counts of startup and hot paths.
+
+Enabled with the LIMITERRMS_PROFILE environment variable (or --profile
+flag of the app and of the command line), whose value is the Chrome trace
+file written on exit ("1" writes limiterRMS-trace.json in the current
+directory). A text report is printed on stderr at the same time, and the
+trace can be opened in chrome://tracing or https://ui.perfetto.dev.
+
+When disabled, instrumented functions only pay one boolean check.
+"""
+
+import atexit
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+
+ENV_VAR = "LIMITERRMS_PROFILE"
+DEFAULT_TRACE_FILE = "limiterRMS-trace.json"
+
+
+class Profiler:
+    """Collected timings, call counts and trace events."""
+
+    def __init__(self) -> None:
+        """Init all attributes, profiler starts disabled."""
+
+        self.enabled = False
+        self.tracePath = None
+        self.origin = time.perf_counter()
+        # name -> [calls, total seconds, max seconds]
+        self.timings: dict[str, list] = {}
+        self.counts: dict[str, int] = {}
+        self.events: list[dict] = []
+        self.lock = threading.Lock()
+
+    def record(self, name: str, start: float, duration: float) -> None:
+        """Record one timed call of given name."""
+
+        with self.lock:
+            stats = self.timings.setdefault(name, [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += duration
+            stats[2] = max(stats[2], duration)
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self.origin) * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+    def count(self, name: str) -> None:
+        """Record one occurrence of given event, e.g. a signal emission."""
+
+        with self.lock:
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "i",
+                    "s": "t",
+                    "ts": (time.perf_counter() - self.origin) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                }
+            )
+
+    def report(self) -> str:
+        """Return text report, slowest paths first."""
+
+        lines = [
+            f"{'path':<56} {'calls':>7} {'total ms':>10} {'mean ms':>9} {'max ms':>9}"
+        ]
+        for name, (calls, total, longest) in sorted(
+            self.timings.items(), key=lambda item: -item[1][1]
+        ):
+            lines.append(
+                f"{name:<56} {calls:>7} {total * 1e3:>10.2f} "
+                f"{total / calls * 1e3:>9.3f} {longest * 1e3:>9.3f}"
+            )
+        if self.counts:
+            lines.append("")
+            lines.append(f"{'event':<56} {'count':>7}")
+            for name, count in sorted(self.counts.items(), key=lambda item: -item[1]):
+                lines.append(f"{name:<56} {count:>7}")
+        return "\n".join(lines)
+
+    def dump(self) -> None:
+        """Print text report and write Chrome trace file."""
+
+        if not self.enabled:
+            return
+        print(self.report(), file=sys.stderr)
+        try:
+            with open(self.tracePath, "w") as f:
+                json.dump({"traceEvents": self.events, "displayTimeUnit": "ms"}, f)
+            print(f"Trace written to {self.tracePath}", file=sys.stderr)
+        except OSError as e:
+            print(f"Cannot write trace {self.tracePath}: {e}", file=sys.stderr)
+
+
+profiler = Profiler()
+
+
+def enable(tracePath: str | None = None) -> None:
+    """Start profiling, report and trace are written on exit.
+
+    Parameters:
+        tracePath: Chrome trace file, defaults to limiterRMS-trace.json
+    """
+
+    if not profiler.enabled:
+        atexit.register(profiler.dump)
+    profiler.enabled = True
+    profiler.tracePath = tracePath or DEFAULT_TRACE_FILE
+
+
+def profiled(name: str | None = None, slot: bool = False) -> Callable:
+    """Decorator recording timings of each call when profiling is enabled.
+
+    Arguments are passed through unchanged, except for slots: like Qt does
+    for them, extra positional arguments (e.g. the text sent by
+    textChanged) are dropped when the function does not accept them.
+
+    Parameters:
+        name: Name in report, defaults to the function qualified name
+        slot: Function is connected to Qt signals
+    """
+
+    def decorator(func: Callable) -> Callable:
+        parameters = inspect.signature(func).parameters.values()
+        if not slot or any(p.kind == p.VAR_POSITIONAL for p in parameters):
+            maxArgs = None
+        else:
+            maxArgs = sum(
+                p.kind in (p.POSITIONAL_ONLY, p.POSITIONAL_OR_KEYWORD)
+                for p in parameters
+            )
+        label = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if maxArgs is not None:
+                args = args[:maxArgs]
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.record(label, start, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Context manager recording timing of its block when profiling is enabled."""
+
+    if not profiler.enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record(name, start, time.perf_counter() - start)
+
+
+def countSignal(signal: object, name: str) -> None:
+    """Count emissions of given Qt signal when profiling is enabled.
+
+    Parameters:
+        signal: Bound signal, e.g. lineEdit.textChanged
+        name: Name in report
+    """
+
+    if profiler.enabled:
+        signal.connect(lambda *args: profiler.count(name))
+
+
+if os.environ.get(ENV_VAR):
+    enable(None if os.environ[ENV_VAR] == "1" else os.environ[ENV_VAR])
@@ -0,0 +1,335 @@
+"""Streaming RIFF/WAVE header parser, validator and in place repair.
+
+Only chunk headers and the fmt chunk are read: chunk bodies (audio data)
+are skipped with seek(), so a whole library is checked at the cost of a
+few small reads per file.
+"""
+
+import struct
+
+from typing import BinaryIO, NamedTuple
+
+
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# KSDATAFORMAT_SUBTYPE_* GUIDs are the format tag followed by this suffix
+KSDATAFORMAT_SUFFIX = b"\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71"
+
+# fmt chunk: tag, channels, sample rate, byte rate, block align, bits per sample
+FMT_STRUCT = struct.Struct("<HHIIHH")
+# WAVE_FORMAT_EXTENSIBLE extension: cbSize, valid bits, channel mask, sub-format
+EXTENSIBLE_STRUCT = struct.Struct("<HHI16s")
+CHUNK_STRUCT = struct.Struct("<4sI")
+
+RIFF_HEADER_SIZE = 12
+CHUNK_HEADER_SIZE = 8
+
+
+class Chunk(NamedTuple):
+    """One chunk of a RIFF file, offset is the one of its 8 bytes header."""
+
+    id: bytes
+    offset: int
+    size: int
+
+
+class Issue(NamedTuple):
+    """One problem found in a WAV header.
+
+    Fixable issues come with the patches (offset, bytes) repairing them.
+    """
+
+    code: str
+    message: str
+    patches: tuple[tuple[int, bytes], ...] = ()
+
+    @property
+    def fixable(self) -> bool:
+        """Return True if issue can be repaired in place."""
+
+        return bool(self.patches)
+
+
+class WavHeader:
+    """Parsed RIFF/WAVE header."""
+
+    def __init__(self, fileSize: int) -> None:
+        """Init all attributes, filled by parseWav().
+
+        Parameters:
+            fileSize: Size of the file in bytes
+        """
+
+        self.fileSize = fileSize
+        self.riffId = b""
+        self.riffSize = 0
+        self.waveId = b""
+        self.chunks: list[Chunk] = []
+        self.fmtOffset = None
+        self.fmtSize = 0
+        self.formatTag = None
+        self.channels = 0
+        self.sampleRate = 0
+        self.byteRate = 0
+        self.blockAlign = 0
+        self.bitsPerSample = 0
+        self.cbSize = None
+        self.validBits = None
+        self.channelMask = None
+        self.subFormat = None
+        self.issues: list[Issue] = []
+
+    @property
+    def dataChunk(self) -> Chunk | None:
+        """Return first data chunk if any."""
+
+        return next((chunk for chunk in self.chunks if chunk.id == b"data"), None)
+
+    @property
+    def subFormatTag(self) -> int | None:
+        """Return format tag embedded in the extensible sub-format GUID."""
+
+        if self.subFormat is None or self.subFormat[2:] != KSDATAFORMAT_SUFFIX:
+            return None
+        return int.from_bytes(self.subFormat[:2], "little")
+
+    @property
+    def fixable(self) -> bool:
+        """Return True if some issues can be repaired in place."""
+
+        return any(issue.fixable for issue in self.issues)
+
+
+def _isChunkId(chunkId: bytes) -> bool:
+    """Return True if given bytes look like a chunk id (printable ASCII)."""
+
+    return len(chunkId) == 4 and all(0x20 <= byte <= 0x7E for byte in chunkId)
+
+
+def parseWav(f: BinaryIO, fileSize: int) -> WavHeader:
+    """Walk chunks of given opened WAV file, reading headers only.
+
+    Parameters:
+        f: File opened in binary mode, positioned anywhere
+        fileSize: Size of the file in bytes
+    """
+
+    header = WavHeader(fileSize)
+    f.seek(0)
+    riff = f.read(RIFF_HEADER_SIZE)
+    if len(riff) < RIFF_HEADER_SIZE:
+        header.issues.append(Issue("truncated", "file shorter than RIFF header"))
+        return header
+    header.riffId, header.riffSize = CHUNK_STRUCT.unpack_from(riff)
+    header.waveId = riff[8:12]
+    if header.riffId != b"RIFF" or header.waveId != b"WAVE":
+        header.issues.append(Issue("not_wave", "not a RIFF/WAVE file"))
+        return header
+
+    offset = RIFF_HEADER_SIZE
+    while offset + CHUNK_HEADER_SIZE <= fileSize:
+        f.seek(offset)
+        chunkId, size = CHUNK_STRUCT.unpack(f.read(CHUNK_HEADER_SIZE))
+        if not _isChunkId(chunkId):
+            # Odd sized previous chunk written without its pad byte
+            f.seek(offset - 1)
+            unpadded = f.read(4)
+            if header.chunks and header.chunks[-1].size % 2 and _isChunkId(unpadded):
+                header.issues.append(
+                    Issue(
+                        "missing_pad",
+                        f"chunk {header.chunks[-1].id!r} has odd size and no pad byte",
+                    )
+                )
+                offset -= 1
+                continue
+            header.issues.append(
+                Issue("garbage", f"invalid chunk id {chunkId!r} at offset {offset}")
+            )
+            break
+        header.chunks.append(Chunk(chunkId, offset, size))
+
+        if chunkId == b"fmt " and header.fmtOffset is None:
+            header.fmtOffset = offset + CHUNK_HEADER_SIZE
+            header.fmtSize = size
+            _parseFmt(header, f.read(min(size, 40)))
+
+        offset += CHUNK_HEADER_SIZE + size + (size % 2)
+
+    _validate(header)
+    return header
+
+
+def _parseFmt(header: WavHeader, fmt: bytes) -> None:
+    """Fill format attributes of header from fmt chunk body."""
+
+    if len(fmt) < FMT_STRUCT.size:
+        return
+    (
+        header.formatTag,
+        header.channels,
+        header.sampleRate,
+        header.byteRate,
+        header.blockAlign,
+        header.bitsPerSample,
+    ) = FMT_STRUCT.unpack_from(fmt)
+    if len(fmt) >= FMT_STRUCT.size + 2:
+        header.cbSize = struct.unpack_from("<H", fmt, FMT_STRUCT.size)[0]
+    if len(fmt) >= FMT_STRUCT.size + EXTENSIBLE_STRUCT.size:
+        (
+            header.cbSize,
+            header.validBits,
+            header.channelMask,
+            header.subFormat,
+        ) = EXTENSIBLE_STRUCT.unpack_from(fmt, FMT_STRUCT.size)
+
+
+def _validate(header: WavHeader) -> None:
+    """Append issues found in parsed header, with patches when fixable."""
+
+    issues = header.issues
+    data = header.dataChunk
+
+    if header.fmtOffset is None:
+        issues.append(Issue("no_fmt", "missing fmt chunk"))
+    if data is None:
+        issues.append(Issue("no_data", "missing data chunk"))
+
+    # RIFF size must cover the whole file
+    lastChunkEnd = RIFF_HEADER_SIZE
+    if header.chunks:
+        last = header.chunks[-1]
+        lastChunkEnd = last.offset + CHUNK_HEADER_SIZE + last.size + (last.size % 2)
+    if (
+        data is not None
+        and data.offset + CHUNK_HEADER_SIZE + data.size > header.fileSize
+    ):
+        available = header.fileSize - data.offset - CHUNK_HEADER_SIZE
+        if header.blockAlign:
+            available -= available % header.blockAlign
+        issues.append(
+            Issue(
+                "truncated",
+                f"data chunk announces {data.size} bytes, only {available} available",
+                (
+                    (data.offset + 4, struct.pack("<I", available)),
+                    (4, struct.pack("<I", header.fileSize - 8)),
+                ),
+            )
+        )
+    elif header.riffSize != header.fileSize - 8 and lastChunkEnd >= header.fileSize:
+        issues.append(
+            Issue(
+                "riff_size",
+                f"RIFF size is {header.riffSize}, file needs {header.fileSize - 8}",
+                ((4, struct.pack("<I", header.fileSize - 8)),),
+            )
+        )
+
+    if header.fmtOffset is None:
+        return
+    if header.formatTag is None:
+        issues.append(Issue("fmt_size", f"fmt chunk too small ({header.fmtSize})"))
+        return
+
+    fmtOffset = header.fmtOffset
+    tag = header.formatTag
+    if tag == WAVE_FORMAT_EXTENSIBLE:
+        subTag = header.subFormatTag
+        if header.cbSize is None or header.cbSize < 22 or header.subFormat is None:
+            issues.append(
+                Issue("extensible_size", "extensible fmt chunk without extension")
+            )
+            return
+        if subTag is None:
+            issues.append(
+                Issue("sub_format", f"unknown sub-format GUID {header.subFormat.hex()}")
+            )
+            return
+        if header.validBits and header.validBits > header.bitsPerSample:
+            issues.append(
+                Issue(
+                    "valid_bits",
+                    f"{header.validBits} valid bits for {header.bitsPerSample} bits samples",
+                    ((fmtOffset + 18, struct.pack("<H", header.bitsPerSample)),),
+                )
+            )
+        # Same thing as plain PCM/float, which more players support
+        if (
+            subTag in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT)
+            and header.channels <= 2
+            and header.validBits in (0, header.bitsPerSample)
+        ):
+            issues.append(
+                Issue(
+                    "extensible",
+                    "WAVE_FORMAT_EXTENSIBLE header, not supported by some players",
+                    ((fmtOffset, struct.pack("<H", subTag)),),
+                )
+            )
+        tag = subTag
+    if tag not in (WAVE_FORMAT_PCM, WAVE_FORMAT_IEEE_FLOAT):
+        return
+
+    if not header.channels or not header.bitsPerSample:
+        issues.append(Issue("fmt_values", "no channel or no bits per sample"))
+        return
+    blockAlign = header.channels * ((header.bitsPerSample + 7) // 8)
+    if header.blockAlign != blockAlign:
+        issues.append(
+            Issue(
+                "block_align",
+                f"block align is {header.blockAlign}, should be {blockAlign}",
+                ((fmtOffset + 12, struct.pack("<H", blockAlign)),),
+            )
+        )
+    byteRate = header.sampleRate * blockAlign
+    if header.byteRate != byteRate:
+        issues.append(
+            Issue(
+                "byte_rate",
+                f"byte rate is {header.byteRate}, should be {byteRate}",
+                ((fmtOffset + 8, struct.pack("<I", byteRate)),),
+            )
+        )
+    if data is not None and data.size % blockAlign:
+        issues.append(
+            Issue("data_align", f"data size {data.size} not a multiple of {blockAlign}")
+        )
+
+
+def readWavHeader(path: str) -> WavHeader:
+    """Return parsed and validated header of given WAV file."""
+
+    with open(path, "rb") as f:
+        f.seek(0, 2)
+        return parseWav(f, f.tell())
+
+
+def repairWav(path: str, codes: set[str] | None = None) -> list[Issue]:
+    """Repair fixable issues of given WAV file in place, return fixed issues.
+
+    Only patched header bytes are written, audio data is never rewritten.
+    Header is parsed again under the same handle so patches are never
+    applied on a file modified since it was scanned.
+
+    Parameters:
+        path: WAV file path
+        codes: Only fix these issue codes, all fixable ones if None
+    """
+
+    with open(path, "r+b") as f:
+        f.seek(0, 2)
+        header = parseWav(f, f.tell())
+        fixed = [
+            issue
+            for issue in header.issues
+            if issue.fixable and (codes is None or issue.code in codes)
+        ]
+        for issue in fixed:
+            for offset, patch in issue.patches:
+                f.seek(offset)
+                f.write(patch)
+    return fixed
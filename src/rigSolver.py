@@ -0,0 +1,377 @@
+"""Speaker to amplifier channel assignment for a whole rig.
+
+Each channel drives identical speakers wired in parallel so that the load
+matches one of the impedance modes, bridge modes use two channels of the
+same amplifier. The margin of a channel is thresholdAmp - thresholdSpk of
+the smart limiter: positive when the amplifier can drive its speakers to
+their AES power with headroom left, negative when the amplifier clips first.
+
+Since channels of one amplifier model are interchangeable, the search is an
+integer program on the number of channels of each (speaker, amplifier, mode)
+load and on the number of units of each amplifier model, solved with
+scipy.optimize.milp. The headroom objective binary searches the best
+minimum margin with feasibility only programs, then solves the fewest
+amplifiers at that margin. Loads are finally laid out on amplifier units.
+"""
+
+import math
+
+from typing import NamedTuple
+
+import numpy as np
+
+from src.amplifier import Amplifier, ImpedanceMode
+from src.limiter import Limiter, computeTresholds
+from src.speaker import Speaker
+
+
+OBJECTIVES = ["headroom", "amps"]
+# Number of channels when an amplifier does not tell its outputs
+DEFAULT_OUTPUTS = 2
+# Margins are rounded to this step (dB)
+MARGIN_STEP = 0.1
+
+
+class ChannelConfig(NamedTuple):
+    """One way of loading a channel of an amplifier model with one speaker model."""
+
+    speaker: str
+    amplifier: str
+    mode: ImpedanceMode
+    count: int
+    margin: float
+
+    @property
+    def channels(self) -> int:
+        """Return number of amplifier channels used."""
+
+        return 2 if self.mode.bridge else 1
+
+
+class ChannelAssignment(NamedTuple):
+    """Speakers wired on one channel (or bridged pair) of one amplifier unit."""
+
+    amplifier: str
+    unit: int
+    channels: tuple[int, ...]
+    mode: str
+    speaker: str
+    count: int
+    threshold: float
+    margin: float
+
+
+class RigSolution(NamedTuple):
+    """Best assignment found, with its minimum margin and amplifiers used."""
+
+    assignments: list[ChannelAssignment]
+    minMargin: float
+    amps: dict[str, int]
+
+
+class RigSolver:
+    """Assign a speaker inventory to the channels of an amplifier inventory."""
+
+    def __init__(
+        self,
+        speakers: list[tuple[Speaker, int]],
+        amplifiers: list[tuple[Amplifier, int]],
+        sensitivity: float = 0.775,
+    ) -> None:
+        """Build all possible channel configurations.
+
+        Parameters:
+            speakers: Speaker models with their number of boxes
+            amplifiers: Amplifier models with their number of units
+            sensitivity: Sensitivity, defaults to 0.775V
+        """
+
+        self.speakers = {speaker.reference: (speaker, n) for speaker, n in speakers}
+        self.amplifiers = {ampli.reference: (ampli, n) for ampli, n in amplifiers}
+        self.sensitivity = sensitivity
+        self.configs = self._buildConfigs()
+
+    def _buildConfigs(self) -> list[ChannelConfig]:
+        """Return every (speaker, amplifier, mode) channel load with its margin."""
+
+        rows = []
+        for speaker, _ in self.speakers.values():
+            for ampli, _ in self.amplifiers.values():
+                if _outputs(ampli) < 2:
+                    modes = [m for m in ImpedanceMode if not m.bridge]
+                else:
+                    modes = list(ImpedanceMode)
+                for mode in modes:
+                    # Only parallel wiring, e.g. two 8 Ohm speakers on 4 Ohm
+                    count, rest = divmod(speaker.impedance, mode.impedance)
+                    if count and not rest and ampli.getPower(mode):
+                        rows.append((speaker, ampli, mode, count))
+        if not rows:
+            return []
+
+        speakerPower = np.array([s.power * n for s, _, _, n in rows], dtype=float)
+        ampliPower = np.array([a.getPower(m) for _, a, m, _ in rows], dtype=float)
+        baffleFactor = np.where(
+            np.array([s.baffle for s, _, _, _ in rows]) == "OPEN",
+            Limiter.baffleFactorOpen,
+            Limiter.baffleFactorClosed,
+        )
+        # Same impedance and gain on both sides, only power ratio remains
+        margins = 10 * np.log10(
+            (ampliPower / Limiter.ampliFactor) / (speakerPower / baffleFactor)
+        )
+        return [
+            ChannelConfig(s.reference, a.reference, m, n, round(float(margin), 1))
+            for (s, a, m, n), margin in zip(rows, margins)
+        ]
+
+    def solve(
+        self, objective: str = "headroom", minMargin: float | None = None
+    ) -> RigSolution:
+        """Return best assignment of all speakers.
+
+        Raise ValueError when the amplifiers cannot drive every speaker.
+
+        Parameters:
+            objective: "headroom" maximizes the minimum margin (then uses as few
+                amplifiers as possible), "amps" minimizes amplifiers used
+            minMargin: Minimum margin in dB required on every channel
+        """
+
+        if objective not in OBJECTIVES:
+            raise ValueError(f"unknown objective {objective!r}")
+        floor = -math.inf if minMargin is None else minMargin
+
+        if objective == "headroom":
+            best = self._bestMargin(floor)
+            if best is not None:
+                # Margins are rounded to .1 dB, stay clear of solver tolerance
+                floor = best - MARGIN_STEP / 2
+        usage = self._search(floor)
+        if usage is None:
+            raise ValueError(self._infeasible(floor))
+        return self._layout(usage)
+
+    def _usable(self, floor: float) -> list[ChannelConfig]:
+        """Return configs with a margin >= floor, dominated bridged ones removed.
+
+        A bridged load is never better than the same boxes on one channel of
+        the same amplifier, which wires them with half the channels.
+        """
+
+        configs = [c for c in self.configs if c.margin >= floor]
+        single = {
+            (c.speaker, c.amplifier, c.count) for c in configs if not c.mode.bridge
+        }
+        return [
+            c
+            for c in configs
+            if not (c.mode.bridge and (c.speaker, c.amplifier, c.count) in single)
+        ]
+
+    def _solve(
+        self,
+        configs: list[ChannelConfig],
+        cost: np.ndarray,
+        maxUnits: int | None = None,
+    ) -> np.ndarray | None:
+        """Return channels of each config then units of each amplifier model.
+
+        Every box is wired exactly once and channels and bridged pairs fit in
+        the units used, at most maxUnits of them. None if it is infeasible.
+        """
+
+        speakerRefs = list(self.speakers)
+        ampRefs = list(self.amplifiers)
+        nConfigs, nAmps = len(configs), len(ampRefs)
+        configSpeakers = [speakerRefs.index(c.speaker) for c in configs]
+        configAmps = [ampRefs.index(c.amplifier) for c in configs]
+        columns = np.arange(nConfigs)
+
+        boxes = np.zeros((len(speakerRefs), nConfigs + nAmps))
+        boxes[configSpeakers, columns] = [c.count for c in configs]
+        channels = np.zeros((nAmps, nConfigs + nAmps))
+        channels[configAmps, columns] = [c.channels for c in configs]
+        bridges = np.zeros((nAmps, nConfigs + nAmps))
+        bridges[configAmps, columns] = [c.mode.bridge for c in configs]
+        outputs = np.array([_outputs(ampli) for ampli, _ in self.amplifiers.values()])
+        channels[:, nConfigs:] = -np.diag(outputs)
+        bridges[:, nConfigs:] = -np.diag(outputs // 2)
+        units = np.concatenate([np.zeros(nConfigs), np.ones(nAmps)])[np.newaxis]
+
+        counts = [n for _, n in self.speakers.values()]
+        # scipy.optimize is slow to import, only load it to solve
+        from scipy.optimize import Bounds, LinearConstraint, milp
+
+        result = milp(
+            cost,
+            constraints=[
+                LinearConstraint(boxes, counts, counts),
+                LinearConstraint(np.vstack([channels, bridges]), -np.inf, 0),
+                LinearConstraint(units, 0, np.inf if maxUnits is None else maxUnits),
+            ],
+            integrality=np.ones(nConfigs + nAmps),
+            bounds=Bounds(
+                0, [np.inf] * nConfigs + [n for _, n in self.amplifiers.values()]
+            ),
+        )
+        return result.x
+
+    def _bestMargin(self, floor: float) -> float | None:
+        """Return best minimum margin >= floor of a full assignment, if any."""
+
+        wired = [ref for ref, (_, boxes) in self.speakers.items() if boxes]
+        # No assignment beats the best channel of its worst served speaker
+        ceiling = (
+            min(
+                max(
+                    (c.margin for c in self.configs if c.speaker == ref),
+                    default=-math.inf,
+                )
+                for ref in wired
+            )
+            if wired
+            else -math.inf
+        )
+        margins = sorted(
+            {c.margin for c in self.configs if floor <= c.margin <= ceiling}
+        )
+
+        # Infeasible inventories fail fast on their lowest margin
+        if not margins or not self._feasible(margins[0]):
+            return None
+        # Feasibility only grows when margin decreases, binary search on margins
+        best = margins[0]
+        low, high = 1, len(margins) - 1
+        while low <= high:
+            middle = (low + high) // 2
+            if self._feasible(margins[middle]):
+                best = margins[middle]
+                low = middle + 1
+            else:
+                high = middle - 1
+        return best
+
+    def _feasible(self, floor: float) -> bool:
+        """Return True if every box can be wired with all margins >= floor."""
+
+        configs = self._usable(floor)
+        # No objective, the solver stops at the first feasible point
+        cost = np.zeros(len(configs) + len(self.amplifiers))
+        return self._solve(configs, cost) is not None
+
+    def _search(self, floor: float) -> list[ChannelConfig] | None:
+        """Return channel loads using the fewest amplifiers, all margins >= floor."""
+
+        configs = self._usable(floor)
+        if not any(boxes for _, boxes in self.speakers.values()):
+            return []
+        if not configs:
+            return None
+
+        # Fewest units first, then fewest channels with that many units. One
+        # weighted objective is much slower to prove optimal.
+        nConfigs, nAmps = len(configs), len(self.amplifiers)
+        usage = self._solve(
+            configs, np.concatenate([np.zeros(nConfigs), np.ones(nAmps)])
+        )
+        if usage is None:
+            return None
+        cost = np.concatenate([[c.channels for c in configs], np.zeros(nAmps)])
+        usage = self._solve(configs, cost, round(usage[nConfigs:].sum()))
+
+        loads = []
+        for config, channels in zip(configs, np.round(usage[:nConfigs])):
+            loads += [config] * int(channels)
+        return loads
+
+    def _infeasible(self, floor: float) -> str:
+        """Return why speakers cannot all be wired with margins >= floor."""
+
+        above = "" if floor == -math.inf else f" with a margin of {floor:.1f} dB"
+        for speakerRef, (_, boxes) in self.speakers.items():
+            counts = {
+                c.count
+                for c in self.configs
+                if c.speaker == speakerRef and c.margin >= floor
+            }
+            if not boxes:
+                continue
+            if not counts:
+                return f"no amplifier channel can drive {speakerRef}{above}"
+            if boxes % math.gcd(*counts) or boxes < min(counts):
+                groups = ", ".join(map(str, sorted(counts)))
+                return (
+                    f"{boxes} {speakerRef} cannot be wired in parallel groups"
+                    f" of {groups}{above}"
+                )
+        return f"not enough amplifier channels for all speakers{above}"
+
+    def _layout(self, loads: list[ChannelConfig]) -> RigSolution:
+        """Place channel loads on amplifier units, bridged pairs first."""
+
+        byAmplifier: dict[str, list[ChannelConfig]] = {}
+        for load in sorted(loads, key=lambda c: (-c.channels, c.speaker, c.mode)):
+            byAmplifier.setdefault(load.amplifier, []).append(load)
+
+        placed = []
+        amps = {}
+        for ampliRef, ampliLoads in byAmplifier.items():
+            outputs = _outputs(self.amplifiers[ampliRef][0])
+            bridged = [load for load in ampliLoads if load.mode.bridge]
+            single = [load for load in ampliLoads if not load.mode.bridge]
+            unit = 0
+            while bridged or single:
+                unit += 1
+                channel = 1
+                # Bridged pairs first, never split over two units
+                while bridged and channel + 1 <= outputs:
+                    placed.append(
+                        (ampliRef, unit, (channel, channel + 1), bridged.pop(0))
+                    )
+                    channel += 2
+                while single and channel <= outputs:
+                    placed.append((ampliRef, unit, (channel,), single.pop(0)))
+                    channel += 1
+            amps[ampliRef] = unit
+
+        thresholds = self._thresholds([load for *_, load in placed])
+        assignments = [
+            ChannelAssignment(
+                ampliRef,
+                unit,
+                channels,
+                load.mode.label,
+                load.speaker,
+                load.count,
+                threshold,
+                load.margin,
+            )
+            for (ampliRef, unit, channels, load), threshold in zip(placed, thresholds)
+        ]
+        minMargin = min((load.margin for load in loads), default=math.inf)
+        return RigSolution(assignments, minMargin, amps)
+
+    def _thresholds(self, loads: list[ChannelConfig]) -> list[float]:
+        """Return smart limiter thresholds of given channel loads."""
+
+        if not loads:
+            return []
+        speakers = [self.speakers[load.speaker][0] for load in loads]
+        amplis = [self.amplifiers[load.amplifier][0] for load in loads]
+        _, _, thresholds = computeTresholds(
+            [load.mode.impedance for load in loads],
+            [speaker.baffle for speaker in speakers],
+            [speaker.power * load.count for speaker, load in zip(speakers, loads)],
+            [ampli.gain for ampli in amplis],
+            [ampli.getPower(load.mode) for ampli, load in zip(amplis, loads)],
+            True,
+            self.sensitivity,
+        )
+        return [round(float(threshold), 1) for threshold in thresholds]
+
+
+def _outputs(ampli: Amplifier) -> int:
+    """Return number of channels of given amplifier."""
+
+    return ampli.outputs or DEFAULT_OUTPUTS
@@ -0,0 +1,392 @@
+"""Time-domain simulation of RMS limiters and compressors.
+
+Signal goes through the usual feed-forward chain, evaluated every hop (1 ms
+by default) instead of every sample, as block-based processors do:
+
+    sliding RMS over window, loudest channel -> level (dBu) -> static curve
+    (threshold, ratio, soft knee) -> attack/release smoothing -> gain
+
+Many settings (e.g. the thresholds of every speaker of a rig) share one
+input: levels are computed once per window length and the envelope follower
+runs over all settings at once. Stretches where no setting is above its
+threshold are pure releases, computed in closed form, so that the follower
+only iterates over limited passages.
+"""
+
+import math
+import os
+
+from functools import partial
+from typing import Iterator, NamedTuple, Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from src.audioAnalysis import (
+    BLOCK_SIZE,
+    FULL_SCALE,
+    RMS_WINDOW,
+    SlidingRms,
+    openSamples,
+    toFloat,
+)
+
+
+# Control period (ms), gain is updated once per hop
+HOP = 1
+# Most common limiter times of resources/presets (ms)
+ATTACK = 50
+RELEASE = 500
+# Gain reduction (dB) from which a control point counts as limited
+LIMITED = 0.1
+# Up to this many settings, followers run one by one on Python floats,
+# faster than numpy rows that short
+SCALAR_SETTINGS = 8
+
+
+class LimiterSettings(NamedTuple):
+    """One limiter, levels in dBu and times in ms, ratio is inf for a limiter."""
+
+    threshold: float
+    attack: float = ATTACK
+    release: float = RELEASE
+    knee: float = 0.0
+    ratio: float = math.inf
+    window: float = RMS_WINDOW
+
+
+class LimiterTrace(NamedTuple):
+    """Gain reduction and limited signal of a buffer, see limitSignal().
+
+    Times (s) and reductions (dB) are per control point, reductions and
+    output have one more last axis for settings.
+    """
+
+    times: np.ndarray
+    reduction: np.ndarray
+    output: np.ndarray
+
+
+class LimiterSummary(NamedTuple):
+    """Gain reduction (dB) of one settings over a track, limited is a share."""
+
+    settings: LimiterSettings
+    maxReduction: float
+    meanReduction: float
+    limited: float
+
+
+class TrackLimiting(NamedTuple):
+    """Summaries of all settings over one track, or why it was not read."""
+
+    path: str
+    summaries: list[LimiterSummary]
+    error: str | None = None
+
+
+def timeCoefficient(time: ArrayLike, period: float) -> np.ndarray:
+    """Return one-pole coefficient of time constants (ms) updated every period (s)."""
+
+    time = np.maximum(np.asarray(time, dtype=np.float64), 1e-9)
+    return 1 - np.exp(-period * 1000 / time)
+
+
+def staticReduction(
+    levels: ArrayLike,
+    thresholds: ArrayLike,
+    knee: ArrayLike = 0.0,
+    ratio: ArrayLike = math.inf,
+) -> np.ndarray:
+    """Return gain reduction (dB) of the static curve, all parameters broadcast.
+
+    Above threshold plus half the knee, output rises by 1 / ratio dB per dB,
+    and the knee joins both slopes with a parabola.
+
+    Parameters:
+        levels: Input levels (dBu), -inf for silence
+        thresholds: Thresholds (dBu)
+        knee: Knee widths (dB), 0 for a hard knee
+        ratio: Ratios, inf for a limiter
+    """
+
+    overshoot = np.asarray(levels, dtype=np.float64) - thresholds
+    knee = np.asarray(knee, dtype=np.float64)
+    slope = 1 - 1 / np.asarray(ratio, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        soft = slope * (overshoot + knee / 2) ** 2 / (2 * knee)
+        return np.where(
+            2 * overshoot <= -knee,
+            0.0,
+            np.where(2 * overshoot >= knee, slope * overshoot, soft),
+        )
+
+
+def followReduction(
+    targets: np.ndarray,
+    attackCoef: np.ndarray,
+    releaseCoef: np.ndarray,
+    state: ArrayLike | None = None,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return smoothed gain reduction (dB) of each row of targets, and the last row.
+
+    Reduction moves toward its target by the attack coefficient when going
+    up and by the release one when going down.
+
+    Parameters:
+        targets: (points, settings) static reduction (dB)
+        attackCoef: Attack coefficient of each settings, see timeCoefficient()
+        releaseCoef: Release coefficient of each settings
+        state: Reduction before the first row, 0 by default
+    """
+
+    points, count = targets.shape
+    reductions = np.empty_like(targets)
+    reduction = np.zeros(count) if state is None else np.array(state, dtype=np.float64)
+    decay = 1 - releaseCoef
+    delta = np.empty(count)
+    # Runs of rows where some settings limit, or none does
+    loud = (targets > 0).any(axis=1)
+    edges = np.flatnonzero(np.diff(loud)) + 1
+    for start, end in zip(
+        np.concatenate([[0], edges]), np.concatenate([edges, [points]])
+    ):
+        if start == end:
+            continue
+        if not loud[start]:
+            # Released toward 0, reduction * decay ** n after n points
+            steps = np.arange(1, end - start + 1)[:, np.newaxis]
+            np.multiply(reduction, decay**steps, out=reductions[start:end])
+            reduction = reductions[end - 1].copy()
+            continue
+        if count <= SCALAR_SETTINGS:
+            for j in range(count):
+                reductions[start:end, j] = _followColumn(
+                    targets[start:end, j].tolist(),
+                    float(reduction[j]),
+                    float(attackCoef[j]),
+                    float(releaseCoef[j]),
+                )
+            reduction = reductions[end - 1].copy()
+            continue
+        for i in range(start, end):
+            np.subtract(targets[i], reduction, out=delta)
+            delta *= np.where(delta > 0, attackCoef, releaseCoef)
+            reduction += delta
+            reductions[i] = reduction
+    return reductions, reduction
+
+
+def _followColumn(
+    targets: list[float], reduction: float, attackCoef: float, releaseCoef: float
+) -> list[float]:
+    """Return followReduction() of one settings, on Python floats."""
+
+    reductions = []
+    append = reductions.append
+    for target in targets:
+        delta = target - reduction
+        reduction += delta * (attackCoef if delta > 0 else releaseCoef)
+        append(reduction)
+    return reductions
+
+
+class RmsLimiter:
+    """Streaming limiters sharing one multichannel input, one per settings.
+
+    Levels are those of the loudest channel (linked limiters), and the gain
+    of a control point is held until the next one.
+    """
+
+    def __init__(
+        self,
+        settings: Sequence[LimiterSettings],
+        sampleRate: int,
+        channels: int,
+        fullScale: float = FULL_SCALE,
+        hop: float = HOP,
+    ) -> None:
+        """Start with empty RMS windows and no gain reduction.
+
+        Parameters:
+            settings: Limiters run in parallel
+            sampleRate: Sample rate of blocks (Hz)
+            channels: Number of channels of blocks
+            fullScale: Level (dBu) of 0 dBFS at the limiter input
+            hop: Control period (ms)
+        """
+
+        self.settings = list(settings)
+        self.sampleRate = sampleRate
+        self.fullScale = fullScale
+        self.hop = max(1, round(sampleRate * hop / 1000))
+        period = self.hop / sampleRate
+        self.thresholds = np.array([s.threshold for s in self.settings], dtype=float)
+        self.knees = np.array([s.knee for s in self.settings], dtype=float)
+        self.ratios = np.array([s.ratio for s in self.settings], dtype=float)
+        self.attackCoef = timeCoefficient([s.attack for s in self.settings], period)
+        self.releaseCoef = timeCoefficient([s.release for s in self.settings], period)
+
+        # One detector per window length, with the settings using it
+        windows = np.array(
+            [max(1, round(sampleRate * s.window / 1000)) for s in self.settings]
+        )
+        self.detectors = []
+        for window in np.unique(windows):
+            detector = SlidingRms(channels, int(window))
+            # Primed with silence, so that there is one window per frame
+            detector.tail = np.zeros((detector.window - 1, channels))
+            self.detectors.append((detector, np.flatnonzero(windows == window)))
+
+        self.reduction = np.zeros(len(self.settings))
+        # Frame of next control point, from the start of next block
+        self.next = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Return gain reduction (dB) of each control point of a (frames, channels) block."""
+
+        points = np.arange(self.next, len(block), self.hop)
+        self.next += len(points) * self.hop - len(block)
+        levels = np.empty((len(points), len(self.settings)))
+        for detector, columns in self.detectors:
+            meanSquares = detector.process(block)[points].max(axis=1, initial=0.0)
+            with np.errstate(divide="ignore"):
+                level = 10 * np.log10(meanSquares) + self.fullScale
+            levels[:, columns] = level[:, np.newaxis]
+        targets = staticReduction(levels, self.thresholds, self.knees, self.ratios)
+        reductions, self.reduction = followReduction(
+            targets, self.attackCoef, self.releaseCoef, self.reduction
+        )
+        return reductions
+
+    def limit(self, block: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Return process() reductions and the block limited by each settings.
+
+        The limited block is (frames, channels, settings).
+        """
+
+        start = self.next
+        held = self.reduction
+        reductions = self.process(block)
+        gains = 10 ** (-np.concatenate([held[np.newaxis], reductions]) / 20)
+        # Frames before the first control point keep the previous gain
+        rows = np.maximum((np.arange(len(block)) - start) // self.hop + 1, 0)
+        return reductions, block[..., np.newaxis] * gains[rows][:, np.newaxis, :]
+
+
+def limitSignal(
+    samples: np.ndarray,
+    sampleRate: int,
+    settings: Sequence[LimiterSettings],
+    fullScale: float = FULL_SCALE,
+    hop: float = HOP,
+    blockSize: int = BLOCK_SIZE,
+) -> LimiterTrace:
+    """Return gain reduction and limited signal of a whole buffer.
+
+    Parameters:
+        samples: (frames, channels) or (frames,) float samples, full scale is 1
+        sampleRate: Sample rate (Hz)
+        settings: Limiters run in parallel
+        fullScale: Level (dBu) of 0 dBFS at the limiter input
+        hop: Control period (ms)
+        blockSize: Frames processed at once
+    """
+
+    samples = np.asarray(samples, dtype=np.float64)
+    if samples.ndim == 1:
+        samples = samples[:, np.newaxis]
+    limiter = RmsLimiter(settings, sampleRate, samples.shape[1], fullScale, hop)
+    reductions = [np.zeros((0, len(limiter.settings)))]
+    output = np.empty(samples.shape + (len(limiter.settings),))
+    for start in range(0, len(samples), blockSize):
+        reduction, output[start : start + blockSize] = limiter.limit(
+            samples[start : start + blockSize]
+        )
+        reductions.append(reduction)
+    reduction = np.concatenate(reductions)
+    times = np.arange(len(reduction)) * (limiter.hop / sampleRate)
+    return LimiterTrace(times, reduction, output)
+
+
+def limitWav(
+    path: str,
+    settings: Sequence[LimiterSettings],
+    fullScale: float = FULL_SCALE,
+    hop: float = HOP,
+    blockSize: int = BLOCK_SIZE,
+) -> list[LimiterSummary]:
+    """Return gain reduction summary of each settings over a WAV file.
+
+    The file is read block by block, raise ValueError for files which are
+    not readable PCM or float WAV.
+
+    Parameters:
+        path: WAV file path
+        settings: Limiters run in parallel
+        fullScale: Level (dBu) of 0 dBFS at the limiter input
+        hop: Control period (ms)
+        blockSize: Frames converted at once
+    """
+
+    header, samples = openSamples(path)
+    limiter = RmsLimiter(settings, header.sampleRate, header.channels, fullScale, hop)
+    count = len(limiter.settings)
+    maxReduction, total, limited = np.zeros(count), np.zeros(count), np.zeros(count)
+    points = 0
+    for start in range(0, len(samples), blockSize):
+        reduction = limiter.process(
+            toFloat(samples[start : start + blockSize], header.bitsPerSample)
+        )
+        points += len(reduction)
+        np.maximum(maxReduction, reduction.max(axis=0, initial=0.0), out=maxReduction)
+        total += reduction.sum(axis=0)
+        limited += np.count_nonzero(reduction > LIMITED, axis=0)
+    del samples
+    points = max(1, points)
+    return [
+        LimiterSummary(
+            limiter.settings[i],
+            float(maxReduction[i]),
+            float(total[i] / points),
+            float(limited[i] / points),
+        )
+        for i in range(count)
+    ]
+
+
+def _limitTrack(path: str, **options) -> TrackLimiting:
+    """Return limitWav() summaries of a track, with error message if unreadable."""
+
+    try:
+        return TrackLimiting(path, limitWav(path, **options))
+    except (OSError, ValueError) as e:
+        return TrackLimiting(path, [], str(e))
+
+
+def limitTracks(
+    paths: Sequence[str],
+    settings: Sequence[LimiterSettings],
+    workers: int | None = None,
+    **options,
+) -> Iterator[TrackLimiting]:
+    """Yield limitWav() summaries of many tracks, in order, one process per core.
+
+    Each track runs all settings at once, so processes only split tracks.
+    Options are passed to limitWav().
+
+    Parameters:
+        paths: WAV file paths
+        settings: Limiters run in parallel on each track
+        workers: Number of processes, all cores by default, 1 runs in this one
+    """
+
+    limit = partial(_limitTrack, settings=list(settings), **options)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) < 2:
+        yield from map(limit, paths)
+        return
+    # Loads multiprocessing, only needed with several tracks
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+        yield from pool.map(limit, paths)
@@ -0,0 +1,131 @@
+"""Display rounding of raw floats, identical to Decimal(value).quantize().
+
+Decimal(value) is the exact binary value of the float, so rounding it to
+n places is not round(value * 10 ** n): the product is itself rounded. The
+exact product is recovered with Dekker's two-product (p + e == a * b), which
+is enough to break every tie the same way Decimal does, without allocating
+anything but the final Decimal.
+
+Functions work on Python floats; the *Array variants on numpy arrays, whose
+values must stay below 2^52 once scaled (voltages and thresholds do).
+"""
+
+import math
+
+from decimal import Decimal, ROUND_DOWN, ROUND_HALF_EVEN, ROUND_UP
+
+import numpy as np
+
+
+# Veltkamp splitter for float64 (2^27 + 1), used for exact products
+_SPLITTER = 134217729.0
+# Above 2^52 floats are integers and the tie detection no longer holds
+_EXACT_LIMIT = 2.0**52
+
+
+def twoProduct(a, b):
+    """Return p = fl(a * b) and e such that a * b == p + e exactly (Dekker).
+
+    Works on floats as well as on numpy arrays.
+    """
+
+    p = a * b
+    aBig = a * _SPLITTER
+    aHigh = aBig - (aBig - a)
+    aLow = a - aHigh
+    bBig = b * _SPLITTER
+    bHigh = bBig - (bBig - b)
+    bLow = b - bHigh
+    e = ((aHigh * bHigh - p) + aHigh * bLow + aLow * bHigh) + aLow * bLow
+    return p, e
+
+
+def roundHalfEven(value: float, scale: float) -> float:
+    """Return round(value * scale) with ties to even, on the exact binary value."""
+
+    p, e = twoProduct(value, scale)
+    floor = math.floor(p)
+    # Only an exact .5 product can be pushed to one side by the lost bits,
+    # compared doubled since p - floor is inexact for p in (-0.5, 0)
+    if 2 * p == 2 * floor + 1:
+        if e > 0:
+            return floor + 1.0
+        if e < 0:
+            return float(floor)
+    return float(round(p))
+
+
+def roundFloor(value: float, scale: float) -> float:
+    """Return floor(value * scale) on the exact binary value.
+
+    ROUND_DOWN for positive values and ROUND_UP for the others is a floor.
+    """
+
+    p, e = twoProduct(value, scale)
+    floor = math.floor(p)
+    # Product rounded up to an integer while the exact value is below it
+    if p == floor and e < 0:
+        return floor - 1.0
+    return float(floor)
+
+
+def roundHalfEvenArray(values: np.ndarray, scale: float) -> np.ndarray:
+    """Return roundHalfEven() of each value, as integral floats."""
+
+    p, e = twoProduct(values, scale)
+    floor = np.floor(p)
+    tie = 2 * p == 2 * floor + 1
+    rounded = np.rint(p)
+    rounded = np.where(tie & (e > 0), floor + 1, rounded)
+    rounded = np.where(tie & (e < 0), floor, rounded)
+    return rounded
+
+
+def roundFloorArray(values: np.ndarray, scale: float) -> np.ndarray:
+    """Return roundFloor() of each value, as integral floats."""
+
+    p, e = twoProduct(values, scale)
+    floor = np.floor(p)
+    return np.where((p == floor) & (e < 0), floor - 1, floor)
+
+
+def quantize(value: float, places: int) -> Decimal:
+    """Return Decimal(value).quantize(Decimal(10) ** -places).
+
+    Parameters:
+        value: Raw float
+        places: Number of decimal places, ties are rounded to even
+    """
+
+    scale = 10.0**places
+    if not abs(value) * scale < _EXACT_LIMIT:  # Also true for inf and nan
+        return Decimal(value).quantize(Decimal(1).scaleb(-places), ROUND_HALF_EVEN)
+    return _toDecimal(roundHalfEven(value, scale), places, value)
+
+
+def quantizeThreshold(value: float, places: int = 1) -> Decimal:
+    """Return value quantized with ROUND_DOWN if positive, ROUND_UP otherwise.
+
+    This is how thresholds are displayed: always rounded to the lower value.
+
+    Parameters:
+        value: Raw threshold in dBu
+        places: Number of decimal places
+    """
+
+    scale = 10.0**places
+    if not abs(value) * scale < _EXACT_LIMIT:  # Also true for inf and nan
+        return Decimal(value).quantize(
+            Decimal(1).scaleb(-places), ROUND_DOWN if value > 0 else ROUND_UP
+        )
+    return _toDecimal(roundFloor(value, scale), places, value)
+
+
+def _toDecimal(rounded: float, places: int, value: float) -> Decimal:
+    """Return Decimal of integral rounded / 10 ** places, keeping sign of zero."""
+
+    result = Decimal(int(rounded)).scaleb(-places)
+    if not rounded and math.copysign(1.0, value) < 0:
+        # Decimal keeps the sign of small negative values rounded to 0
+        return result.copy_negate()
+    return result
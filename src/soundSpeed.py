@@ -0,0 +1,252 @@
+"""Speed of sound in air from temperature, humidity and pressure.
+
+cramerSpeed() evaluates Cramer's formula (J. Acoust. Soc. Am. 93, 1993),
+accurate to a few 0.01 m.s-1 in usual conditions. SoundSpeedTable samples
+it once on a temperature, humidity and pressure grid, then only interpolates
+between grid points, so bulk conversions and UI updates never evaluate the
+formula itself. Values outside of the grid are computed directly.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+
+# Default conditions (%, hPa) when humidity or pressure are not measured
+DEFAULT_HUMIDITY = 50
+STANDARD_PRESSURE = 1013.25
+# CO2 mole fraction of ambient air
+CO2_FRACTION = 0.0004
+
+# Coefficients a0 to a15 of Cramer's formula
+_CRAMER = (
+    331.5024,
+    0.603055,
+    -0.000528,
+    51.471935,
+    0.1495874,
+    -0.000782,
+    -1.82e-7,
+    3.73e-8,
+    -2.93e-10,
+    -85.20931,
+    -0.228525,
+    5.91e-5,
+    -2.835149,
+    -2.15e-13,
+    29.179762,
+    0.000486,
+)
+
+
+def cramerSpeed(
+    temperature: ArrayLike,
+    humidity: ArrayLike = DEFAULT_HUMIDITY,
+    pressure: ArrayLike = STANDARD_PRESSURE,
+) -> float | np.ndarray:
+    """Return speed of sound (m.s-1) with Cramer's formula.
+
+    Parameters:
+        temperature: Air temperature (C)
+        humidity: Relative humidity (%)
+        pressure: Atmospheric pressure (hPa)
+    """
+
+    t = np.asarray(temperature, dtype=np.float64)
+    p = np.asarray(pressure, dtype=np.float64) * 100
+    kelvin = t + 273.15
+    # Mole fraction of water vapour from saturation vapour pressure
+    enhancement = 1.00062 + 3.14e-8 * p + 5.6e-7 * t * t
+    saturation = np.exp(
+        1.2811805e-5 * kelvin * kelvin
+        - 1.9509874e-2 * kelvin
+        + 34.04926034
+        - 6.3536311e3 / kelvin
+    )
+    xw = np.asarray(humidity, dtype=np.float64) / 100 * enhancement * saturation / p
+    xc = CO2_FRACTION
+
+    a = _CRAMER
+    c = (
+        a[0]
+        + a[1] * t
+        + a[2] * t * t
+        + (a[3] + a[4] * t + a[5] * t * t) * xw
+        + (a[6] + a[7] * t + a[8] * t * t) * p
+        + (a[9] + a[10] * t + a[11] * t * t) * xc
+        + a[12] * xw * xw
+        + a[13] * p * p
+        + a[14] * xc * xc
+        + a[15] * xw * p * xc
+    )
+    return c if c.ndim else float(c)
+
+
+class SoundSpeedTable:
+    """Cramer's speed of sound sampled on a regular grid, trilinear lookup."""
+
+    def __init__(
+        self,
+        temperatures: tuple[float, float, float] = (-40, 60, 0.5),
+        humidities: tuple[float, float, float] = (0, 100, 5),
+        pressures: tuple[float, float, float] = (500, 1100, 20),
+    ) -> None:
+        """Sample speed of sound on the grid.
+
+        Parameters:
+            temperatures: First, last and step temperature (C)
+            humidities: First, last and step relative humidity (%)
+            pressures: First, last and step pressure (hPa)
+        """
+
+        # (first value, step, number of points) of each axis
+        self.axes = [
+            (first, step, int(round((last - first) / step)) + 1)
+            for first, last, step in (temperatures, humidities, pressures)
+        ]
+        t, h, p = np.meshgrid(
+            *(first + step * np.arange(size) for first, step, size in self.axes),
+            indexing="ij",
+        )
+        self.table = cramerSpeed(t, h, p)
+        # Flat copy for scalar lookups, Python floats are faster than numpy ones
+        self.flat = self.table.ravel().tolist()
+        _, hSize, pSize = self.table.shape
+        self.strides = (hSize * pSize, pSize, 1)
+
+    def __call__(
+        self,
+        temperature: ArrayLike,
+        humidity: ArrayLike = DEFAULT_HUMIDITY,
+        pressure: ArrayLike = STANDARD_PRESSURE,
+    ) -> float | np.ndarray:
+        """Return interpolated speed of sound (m.s-1).
+
+        Parameters:
+            temperature: Air temperature (C)
+            humidity: Relative humidity (%)
+            pressure: Atmospheric pressure (hPa)
+        """
+
+        if all(
+            isinstance(value, (int, float))
+            for value in (temperature, humidity, pressure)
+        ):
+            return self._lookup(temperature, humidity, pressure)
+        if np.ndim(humidity) == 0 and np.ndim(pressure) == 0:
+            column = self._temperatureColumn(float(humidity), float(pressure))
+            if column is not None:
+                return self._lookupTemperatures(temperature, column, humidity, pressure)
+        return self._lookupArray(temperature, humidity, pressure)
+
+    def _lookup(self, temperature: float, humidity: float, pressure: float) -> float:
+        """Return interpolated speed of sound of one point."""
+
+        offset = 0
+        weights = []
+        for value, (first, step, size), stride in zip(
+            (temperature, humidity, pressure), self.axes, self.strides
+        ):
+            position = (value - first) / step
+            if not 0 <= position <= size - 1:
+                return cramerSpeed(temperature, humidity, pressure)
+            index = min(int(position), size - 2)
+            offset += index * stride
+            weights.append((position - index, stride))
+
+        # Interpolate along pressure, then humidity, then temperature
+        (wt, st), (wh, sh), (wp, sp) = weights
+        flat = self.flat
+        corners = []
+        for corner in (offset, offset + sh, offset + st, offset + st + sh):
+            low = flat[corner]
+            corners.append(low + (flat[corner + sp] - low) * wp)
+        low = corners[0] + (corners[1] - corners[0]) * wh
+        high = corners[2] + (corners[3] - corners[2]) * wh
+        return low + (high - low) * wt
+
+    def _temperatureColumn(self, humidity: float, pressure: float) -> np.ndarray:
+        """Return speed of sound on the temperature grid at given conditions.
+
+        None when humidity or pressure is outside of the grid.
+        """
+
+        weights = []
+        for value, (first, step, size) in zip((humidity, pressure), self.axes[1:]):
+            position = (value - first) / step
+            if not 0 <= position <= size - 1:
+                return None
+            index = min(int(position), size - 2)
+            weights.append((index, position - index))
+
+        (ih, wh), (ip, wp) = weights
+        corners = self.table[:, ih : ih + 2, ip : ip + 2]
+        byPressure = corners[:, :, 0] + (corners[:, :, 1] - corners[:, :, 0]) * wp
+        return byPressure[:, 0] + (byPressure[:, 1] - byPressure[:, 0]) * wh
+
+    def _lookupTemperatures(
+        self,
+        temperature: ArrayLike,
+        column: np.ndarray,
+        humidity: float,
+        pressure: float,
+    ) -> np.ndarray:
+        """Return speed of sound of each temperature, interpolated in column."""
+
+        shape = np.shape(temperature)
+        # 0-d arrays cannot be indexed by the outside mask
+        temperature = np.atleast_1d(np.asarray(temperature, dtype=np.float64))
+        first, step, size = self.axes[0]
+        # Regular grid, the position gives the index without any search
+        position = (temperature - first) / step
+        index = np.clip(np.floor(position), 0, size - 2).astype(np.intp)
+        low = column.take(index)
+        c = low + (column.take(index + 1) - low) * (position - index)
+        outside = (position < 0) | (position > size - 1)
+        if outside.any():
+            c[outside] = cramerSpeed(temperature[outside], humidity, pressure)
+        return c.reshape(shape)
+
+    def _lookupArray(
+        self, temperature: ArrayLike, humidity: ArrayLike, pressure: ArrayLike
+    ) -> np.ndarray:
+        """Return interpolated speed of sound of each point, broadcast together."""
+
+        values = np.broadcast_arrays(
+            *(
+                np.asarray(v, dtype=np.float64)
+                for v in (temperature, humidity, pressure)
+            )
+        )
+        inside = np.ones(values[0].shape, dtype=bool)
+        offset = np.zeros(values[0].shape, dtype=np.intp)
+        weights = []
+        for value, (first, step, size), stride in zip(values, self.axes, self.strides):
+            position = (value - first) / step
+            inside &= (position >= 0) & (position <= size - 1)
+            index = np.clip(np.floor(position), 0, size - 2).astype(np.intp)
+            offset += index * stride
+            weights.append(position - index)
+
+        # Interpolate along pressure, then humidity, then temperature
+        (wt, wh, wp), (st, sh, sp) = weights, self.strides
+        flat = self.table.ravel()
+        corners = []
+        for corner in (offset, offset + sh, offset + st, offset + st + sh):
+            low = flat.take(corner)
+            corners.append(low + (flat.take(corner + sp) - low) * wp)
+        low = corners[0] + (corners[1] - corners[0]) * wh
+        high = corners[2] + (corners[3] - corners[2]) * wh
+        c = low + (high - low) * wt
+
+        if not inside.all():
+            c[~inside] = cramerSpeed(*(value[~inside] for value in values))
+        return c
+
+
+@lru_cache(maxsize=None)
+def soundSpeedTable() -> SoundSpeedTable:
+    """Return default lookup table, sampled on first call only."""
+
+    return SoundSpeedTable()
@@ -1,4 +1,14 @@
 class Speaker:
+    __slots__ = (
+        "reference",
+        "impedance",
+        "power",
+        "response",
+        "responseLow",
+        "responseHigh",
+        "baffle",
+    )
+
     def __init__(
         self,
         reference: str,
@@ -21,4 +31,34 @@ class Speaker:
         self.impedance = impedance
         self.power = power
         self.response = response
+        # Parsed once, None if range is unknown (e.g. "ACTIVE")
+        self.responseLow, self.responseHigh = parseResponse(response)
         self.baffle = baffle
+
+    def covers(self, freq: float) -> bool:
+        """Return True if given frequency in Hz is in speaker range of usage."""
+
+        if self.responseLow is None:
+            return False
+        return self.responseLow <= freq <= self.responseHigh
+
+
+def parseFrequency(value: str) -> float:
+    """Return frequency in Hz from its notation, for instance "2.2k" or "5k99"."""
+
+    value = value.strip().lower()
+    if "k" not in value:
+        return float(value)
+    # "5k99" is 5.99 kHz, "2.2k" is 2.2 kHz
+    units, _, decimals = value.partition("k")
+    return float(f"{units}.{decimals}" if decimals else units) * 1000
+
+
+def parseResponse(response: str) -> tuple[float | None, float | None]:
+    """Return (low, high) Hz of a range like "330-2.2k", None if not a range."""
+
+    low, _, high = response.partition("-")
+    try:
+        return parseFrequency(low), parseFrequency(high)
+    except ValueError:
+        return None, None
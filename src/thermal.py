@@ -0,0 +1,271 @@
+"""Voice coil temperature of speakers under program material.
+
+Limiter thresholds only bound the RMS voltage sent to a speaker, and the
+smart limiter factors (see Limiter) are a static proxy of how hot program
+material makes it. Here the speaker is heated by the actual power of a
+track, block by block (10 ms by default):
+
+    input level (dBu) -> limiter (threshold, attack, release) -> amplifier
+    gain, clipped at its power -> power in the voice coil -> temperature
+
+Temperature follows the usual two branch thermal model, the voice coil over
+the magnet with a time constant of seconds and the magnet over ambient with
+a time constant of tens of minutes, each one a first-order low-pass of the
+power times a thermal resistance (K/W). Both are IIR filters run by lfilter
+over all speakers at once.
+
+The catalog gives no thermal data, so resistances are derived from AES
+power: a speaker fed its AES power heats by RATED_RISE in steady state.
+Power is computed on nominal impedance, the rise of coil resistance is only
+reported as power compression, 10 * log10(1 + alpha * rise): results are a
+slightly pessimistic upper bound of the rise.
+"""
+
+import math
+
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from src.amplifier import Amplifier, ImpedanceMode
+from src.audioAnalysis import FULL_SCALE, blockMeanSquares, wavMeanSquares
+from src.limiter import speakerTresholds
+from src.profiling import profiled
+from src.rmsLimiter import (
+    ATTACK,
+    RELEASE,
+    followReduction,
+    staticReduction,
+    timeCoefficient,
+)
+from src.speaker import Speaker
+
+
+# Temperature coefficient of copper resistance (1/K)
+COPPER_COEFFICIENT = 0.00393
+# Voice coil rise (K) over ambient at AES power, in steady state
+RATED_RISE = 200.0
+# Share of the rise between voice coil and magnet
+COIL_SHARE = 0.6
+# Thermal time constants (s)
+COIL_TIME_CONSTANT = 15.0
+MAGNET_TIME_CONSTANT = 1800.0
+# Power measurement block (ms)
+BLOCK_TIME = 10
+# Crest factor (dB) of AES2 pink noise
+PINK_CREST = 6.0
+# Paul Kellet's pink noise filter, -3 dB per octave within 0.05 dB
+PINK_B = [0.049922035, -0.095993537, 0.050612699, -0.004408786]
+PINK_A = [1.0, -2.494956002, 2.017265875, -0.522189400]
+
+
+class ThermalParameters(NamedTuple):
+    """Thermal resistances (K/W) and time constants (s) of a speaker."""
+
+    coilResistance: float
+    magnetResistance: float
+    coilTimeConstant: float = COIL_TIME_CONSTANT
+    magnetTimeConstant: float = MAGNET_TIME_CONSTANT
+
+    @classmethod
+    def fromSpeaker(
+        cls, speaker: Speaker, ratedRise: float = RATED_RISE
+    ) -> "ThermalParameters":
+        """Return parameters heating speaker by ratedRise (K) at AES power."""
+
+        resistance = ratedRise / speaker.power
+        return cls(resistance * COIL_SHARE, resistance * (1 - COIL_SHARE))
+
+
+class ThermalResult(NamedTuple):
+    """Heating of one speaker by a track, powers per box (W).
+
+    Rises are in K over ambient, limited is the share of blocks whose gain
+    is reduced by more than 0.1 dB.
+    """
+
+    speaker: str
+    threshold: float
+    meanPower: float
+    maxPower: float
+    maxRise: float
+    finalRise: float
+    limited: float
+
+    @property
+    def compression(self) -> float:
+        """Return power compression (dB) at the hottest point."""
+
+        return 10 * math.log10(1 + COPPER_COEFFICIENT * self.maxRise)
+
+
+def pinkNoise(
+    duration: float,
+    sampleRate: int = 48000,
+    crest: float = PINK_CREST,
+    seed: int | None = 0,
+) -> np.ndarray:
+    """Return (frames, 1) pink noise of RMS 1, clipped to given crest factor.
+
+    Parameters:
+        duration: Duration (s)
+        sampleRate: Sample rate (Hz)
+        crest: Peak over RMS (dB), about, as clipping lowers RMS
+        seed: Random generator seed, None for a random one
+    """
+
+    from scipy.signal import lfilter
+
+    white = np.random.default_rng(seed).standard_normal(round(duration * sampleRate))
+    pink = lfilter(PINK_B, PINK_A, white)
+    pink /= np.sqrt(np.mean(pink * pink))
+    peak = 10 ** (crest / 20)
+    np.clip(pink, -peak, peak, out=pink)
+    pink /= np.sqrt(np.mean(pink * pink))
+    return pink[:, np.newaxis]
+
+
+def pinkMeanSquares(
+    duration: float, level: float, blockTime: float = BLOCK_TIME, **options
+) -> tuple[np.ndarray, float]:
+    """Return block mean squares of pink noise at level (dBFS RMS).
+
+    Same results as wavMeanSquares(), options are passed to pinkNoise().
+    """
+
+    sampleRate = options.setdefault("sampleRate", 48000)
+    frames = max(1, round(sampleRate * blockTime / 1000))
+    noise = pinkNoise(duration, **options) * 10 ** (level / 20)
+    return blockMeanSquares(noise, frames), frames / sampleRate
+
+
+def temperatureRise(
+    power: np.ndarray, parameters: Sequence[ThermalParameters], blockTime: float
+) -> np.ndarray:
+    """Return voice coil rise (K) over ambient after each block, per speaker.
+
+    Parameters:
+        power: (blocks, speakers) mean power (W) of blocks
+        parameters: Thermal parameters of each speaker
+        blockTime: Block duration (s)
+    """
+
+    from scipy.signal import lfilter
+
+    power = np.asarray(power, dtype=np.float64)
+    rise = np.zeros_like(power)
+    for resistances, timeConstants in (
+        (
+            [p.coilResistance for p in parameters],
+            [p.coilTimeConstant for p in parameters],
+        ),
+        (
+            [p.magnetResistance for p in parameters],
+            [p.magnetTimeConstant for p in parameters],
+        ),
+    ):
+        resistances = np.asarray(resistances, dtype=np.float64)
+        timeConstants = np.asarray(timeConstants, dtype=np.float64)
+        # One filter per time constant, all speakers sharing it at once
+        for timeConstant in np.unique(timeConstants):
+            columns = timeConstants == timeConstant
+            pole = math.exp(-blockTime / timeConstant)
+            rise[:, columns] += (
+                lfilter([1 - pole], [1, -pole], power[:, columns], axis=0)
+                * resistances[columns]
+            )
+    return rise
+
+
+@profiled()
+def simulateSpeakers(
+    meanSquares: np.ndarray,
+    blockTime: float,
+    speakers: Sequence[Speaker],
+    ampli: Amplifier,
+    mode: ImpedanceMode | str,
+    threshold: float | None = None,
+    smartLimit: bool = True,
+    attack: float = ATTACK,
+    release: float = RELEASE,
+    fullScale: float = FULL_SCALE,
+    sensitivity: float = 0.775,
+) -> list[ThermalResult]:
+    """Return heating of each speaker by a track behind its limiter.
+
+    Raise ValueError if the amplifier has no power in mode or if a speaker
+    cannot work at the mode impedance.
+
+    Parameters:
+        meanSquares: Mean square of blocks (full scale is 1), e.g. from
+            wavMeanSquares() or pinkMeanSquares()
+        blockTime: Block duration (s)
+        speakers: Speakers driven by the amplifier, one by one
+        ampli: Amplifier
+        mode: Amplifier impedance mode, or its label
+        threshold: Limiter threshold (dBu) of every speaker, defaults to
+            the one of the limiter tab for each speaker
+        smartLimit: Compute default thresholds with smart factors
+        attack: Limiter attack time constant (ms)
+        release: Limiter release time constant (ms)
+        fullScale: Level (dBu) of 0 dBFS at the limiter input
+        sensitivity: Sensitivity, defaults to 0.775V
+    """
+
+    if threshold is None:
+        thresholds = speakerTresholds(speakers, ampli, mode, smartLimit, sensitivity)
+    else:
+        # Checks amplifier and speakers the same way
+        speakerTresholds(speakers, ampli, mode)
+        thresholds = np.full(len(speakers), float(threshold))
+    mode = ImpedanceMode.fromLabel(mode)
+    impedance = mode.impedance
+    ampliPower = ampli.getPower(mode)
+    speakerImpedance = np.array([s.impedance for s in speakers], dtype=np.float64)
+
+    with np.errstate(divide="ignore"):
+        levels = 10 * np.log10(meanSquares) + fullScale
+    reductions, _ = followReduction(
+        staticReduction(levels[:, np.newaxis], thresholds),
+        timeCoefficient(np.full(len(speakers), attack), blockTime),
+        timeCoefficient(np.full(len(speakers), release), blockTime),
+    )
+    # Squared voltage at amplifier output, clipped at its power in mode
+    voltages = (
+        meanSquares[:, np.newaxis]
+        * (sensitivity**2 * 10 ** ((fullScale + ampli.gain) / 10))
+        * 10 ** (-reductions / 10)
+    )
+    np.minimum(voltages, ampliPower * impedance, out=voltages)
+    power = voltages / speakerImpedance
+    rise = temperatureRise(
+        power, [ThermalParameters.fromSpeaker(s) for s in speakers], blockTime
+    )
+
+    results = []
+    for i, speaker in enumerate(speakers):
+        results.append(
+            ThermalResult(
+                speaker=speaker.reference,
+                threshold=float(thresholds[i]),
+                meanPower=float(power[:, i].mean()) if len(power) else 0.0,
+                maxPower=float(power[:, i].max(initial=0.0)),
+                maxRise=float(rise[:, i].max(initial=0.0)),
+                finalRise=float(rise[-1, i]) if len(rise) else 0.0,
+                limited=float(np.count_nonzero(reductions[:, i] > 0.1))
+                / max(1, len(reductions)),
+            )
+        )
+    return results
+
+
+def simulateWav(
+    path: str, *args, blockTime: float = BLOCK_TIME, **options
+) -> list[ThermalResult]:
+    """Return simulateSpeakers() results of a WAV file.
+
+    Raise ValueError for files which are not readable PCM or float WAV.
+    """
+
+    meanSquares, duration = wavMeanSquares(path, blockTime)
+    return simulateSpeakers(meanSquares, duration, *args, **options)
@@ -0,0 +1,40 @@
+"""Catalog cache fallback, on copies of json/ with broken caches."""
+
+import pickle
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+from src.catalog import (
+    AMPLIFIERS_FILE,
+    CACHE_FILE,
+    JSON_PATH,
+    SPEAKERS_FILE,
+    loadCatalog,
+)
+
+
+@pytest.mark.parametrize(
+    "cache",
+    [
+        b"not a pickle",
+        pickle.dumps(("key", "catalog"))[:-3],  # Truncated
+        b"cmissing_module\nCatalog\n.",  # Module renamed since it was written
+        b"csrc.catalog\nCatalog\n(tR.",  # Constructor changed since
+    ],
+    ids=["garbage", "truncated", "module", "constructor"],
+)
+def test_unusable_cache_rebuilt(tmp_path: Path, cache: bytes) -> None:
+    for name in (AMPLIFIERS_FILE, SPEAKERS_FILE):
+        shutil.copyfile(JSON_PATH / name, tmp_path / name)
+    (tmp_path / CACHE_FILE).write_bytes(cache)
+
+    catalog = loadCatalog(tmp_path)
+    assert catalog.getSpeaker("Audiophony A15").impedance == 8
+
+    # Cache written again from JSON files
+    with open(tmp_path / CACHE_FILE, "rb") as f:
+        _, cached = pickle.load(f)
+    assert set(cached.speakers) == set(catalog.speakers)
@@ -0,0 +1,52 @@
+"""Command line rows, read from a patched stdin and written to captured stdout."""
+
+import csv
+import io
+import json
+
+import pytest
+
+from src.cli import main
+
+
+RAW_ROW = {
+    "impedance": 8,
+    "speakerBaffle": "OPEN",
+    "speakerPower": 500,
+    "ampliGain": 32,
+    "ampliPower": 600,
+}
+CATALOG_ROW = {"speaker": "Audiophony A15", "ampli": "Admark AD42", "mode": "8"}
+
+
+def runCli(monkeypatch, capsys, argv: list[str], lines: list[str]) -> tuple:
+    monkeypatch.setattr("sys.stdin", io.StringIO("".join(lines)))
+    code = main(argv)
+    out, err = capsys.readouterr()
+    return code, out, err
+
+
+@pytest.mark.parametrize(
+    "rows", [[RAW_ROW, CATALOG_ROW], [CATALOG_ROW, RAW_ROW]], ids=["raw", "catalog"]
+)
+def test_limiter_mixed_rows_csv(monkeypatch, capsys, rows: list[dict]) -> None:
+    lines = [json.dumps(row) + "\n" for row in rows]
+    code, out, err = runCli(
+        monkeypatch, capsys, ["limiter", "--format", "jsonl"], lines
+    )
+    assert code == 0, err
+    results = list(csv.DictReader(io.StringIO(out)))
+    assert len(results) == 2
+    byAmpli = {row["ampli"]: row for row in results}
+    assert byAmpli[""]["smartThreshold"] == "4.0"
+    assert byAmpli["Admark AD42"]["speaker"] == "Audiophony A15"
+    assert byAmpli["Admark AD42"]["smartThreshold"] == "-5.1"
+
+
+def test_limiter_mixed_rows_jsonl(monkeypatch, capsys) -> None:
+    lines = [json.dumps(row) + "\n" for row in (RAW_ROW, CATALOG_ROW)]
+    argv = ["limiter", "--format", "jsonl", "--output-format", "jsonl"]
+    code, out, err = runCli(monkeypatch, capsys, argv, lines)
+    assert code == 0, err
+    results = [json.loads(line) for line in out.splitlines()]
+    assert [row["smartThreshold"] for row in results] == ["4.0", "-5.1"]
@@ -0,0 +1,75 @@
+"""Delay alignment on simple geometries, at c = 343 m/s."""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.delay import (
+    AlignmentMap,
+    Source,
+    alignmentDelays,
+    endFireDelays,
+    listenerGrid,
+)
+
+
+C = 343.0
+
+
+def test_equal_distances_no_delay() -> None:
+    sources = [Source("L", (-5, 0)), Source("R", (5, 0)), Source("C", (0, -5))]
+    assert alignmentDelays(sources, (0, 0), C) == pytest.approx([0, 0, 0])
+
+
+def test_farthest_source_not_delayed() -> None:
+    sources = [Source("Main", (0, 0, 1.7)), Source("Tower", (0, 40, 1.7), 10)]
+    delays = alignmentDelays(sources, (0, 60, 1.7), C)
+    assert delays == pytest.approx([0, 40 / C * 1000 + 10])
+
+
+def test_end_fire_pair() -> None:
+    # Rear box waits for nothing, front one for the wave of the rear one
+    sources = [Source("Front", (0, 1.2)), Source("Rear", (0, 0))]
+    delays = endFireDelays(sources, (0, 1), C)
+    assert delays == pytest.approx([1.2 / C * 1000, 0])
+    # Steered the other way, delays swap
+    assert endFireDelays(sources, (0, -3), C) == pytest.approx([0, 1.2 / C * 1000])
+    with pytest.raises(ValueError):
+        endFireDelays(sources, (0, 0), C)
+
+
+def test_end_fire_arrivals_add_up() -> None:
+    sources = [Source(str(i), (0, 0.9 * i)) for i in range(4)]
+    delays = endFireDelays(sources, (0, 1), C)
+    # Far in front, every arrival is at the same time
+    far = AlignmentMap(sources, [(0, 500, 0)])
+    assert far.spread(delays, C)[0] == pytest.approx(0, abs=1e-9)
+    behind = AlignmentMap(sources, [(0, -500, 0)])
+    assert behind.spread(delays, C)[0] == pytest.approx(2 * 2.7 / C * 1000)
+
+
+def test_listener_grid_bounds() -> None:
+    grid = listenerGrid((-20, 20), (5, 60), (12, 30), z=1.2)
+    assert grid.shape == (12, 30, 3)
+    assert grid[..., 0].min() == -20 and grid[..., 0].max() == 20
+    assert grid[..., 1].min() == 5 and grid[..., 1].max() == 60
+    assert np.all(grid[..., 2] == 1.2)
+    # Rows along y, columns along x
+    assert grid[0, -1, :2].tolist() == [20, 5]
+    assert grid[-1, 0, :2].tolist() == [-20, 60]
+
+
+def test_alignment_map() -> None:
+    sources = [Source("A", (-10, 0)), Source("B", (10, 0))]
+    grid = listenerGrid((-10, 10), (10, 10), (1, 3), z=0)
+    alignment = AlignmentMap(sources, grid)
+    times = alignment.arrivalTimes([0, 0], C)
+    assert times.shape == (1, 3, 2)
+    assert times[0, 1] == pytest.approx([math.hypot(10, 10) / C * 1000] * 2)
+    assert alignment.spread([0, 0], C)[0].tolist() == pytest.approx(
+        [(math.hypot(20, 10) - 10) / C * 1000, 0, (math.hypot(20, 10) - 10) / C * 1000]
+    )
+    assert alignment.firstArrivals([0, 0], C)[0, [0, 2]].tolist() == [0, 1]
+    # Delaying A by 100 ms makes B heard first everywhere
+    assert alignment.firstArrivals([100, 0], C).tolist() == [[1, 1, 1]]
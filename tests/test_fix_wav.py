@@ -0,0 +1,109 @@
+"""Scan index of fix_wav, invalidated by size, mtime, rebuild and schema."""
+
+import importlib.util
+import os
+import sqlite3
+
+from pathlib import Path
+
+import pytest
+
+from src.riff import KSDATAFORMAT_SUFFIX
+from test_riff import fmtChunk, wavFile
+
+
+# scripts is not a package, load fix_wav from its path
+_spec = importlib.util.spec_from_file_location(
+    "fix_wav", Path(__file__).parent.parent / "scripts" / "fix_wav.py"
+)
+fix_wav = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(fix_wav)
+
+
+@pytest.fixture
+def tree(tmp_path: Path) -> Path:
+    root = tmp_path / "music"
+    root.mkdir()
+    for name in ("a.wav", "b.wav"):
+        wavFile(root / name, fmtChunk())
+    return root
+
+
+def scan(root: Path, indexPath: Path) -> tuple[dict[str, int], dict[str, str]]:
+    index = fix_wav.ScanIndex(str(indexPath))
+    stats, issues = fix_wav.get_issues([str(root)], 2, index)
+    index.save()
+    return stats, issues
+
+
+def rows(indexPath: Path) -> dict[str, str]:
+    with sqlite3.connect(indexPath) as connection:
+        return dict(connection.execute("SELECT path, issues FROM headers"))
+
+
+def test_unchanged_files_skipped(tree: Path, tmp_path: Path) -> None:
+    indexPath = tmp_path / "index.sqlite"
+    assert scan(tree, indexPath)[0]["opened"] == 2
+    stats, issues = scan(tree, indexPath)
+    assert (stats["opened"], stats["skipped"], issues) == (0, 2, {})
+
+
+def test_changed_mtime_rescanned(tree: Path, tmp_path: Path) -> None:
+    indexPath = tmp_path / "index.sqlite"
+    scan(tree, indexPath)
+    stat = (tree / "a.wav").stat()
+    os.utime(tree / "a.wav", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    stats, _ = scan(tree, indexPath)
+    assert (stats["opened"], stats["skipped"]) == (1, 1)
+    assert scan(tree, indexPath)[0]["opened"] == 0
+
+
+def test_changed_size_rescanned(tree: Path, tmp_path: Path) -> None:
+    indexPath = tmp_path / "index.sqlite"
+    scan(tree, indexPath)
+    # Rewritten as extensible within the same mtime, only size tells
+    stat = (tree / "a.wav").stat()
+    wavFile(
+        tree / "a.wav", fmtChunk(0xFFFE, subFormat=b"\x01\x00" + KSDATAFORMAT_SUFFIX)
+    )
+    os.utime(tree / "a.wav", ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    stats, issues = scan(tree, indexPath)
+    assert (stats["opened"], stats["skipped"]) == (1, 1)
+    assert fix_wav.parse_issues(issues[str(tree / "a.wav")])[0] == {"extensible"}
+    assert rows(indexPath)[str(tree / "a.wav")] == issues[str(tree / "a.wav")]
+
+
+def test_rebuild_drops_stale_rows(tree: Path, tmp_path: Path, capsys) -> None:
+    other = tmp_path / "other"
+    other.mkdir()
+    wavFile(other / "c.wav", fmtChunk())
+    indexPath = tmp_path / "index.sqlite"
+    argv = ["-n", "--index", str(indexPath)]
+    assert fix_wav.main([*argv, str(tree), str(other)]) == 0
+    # Files out of the scanned directories are kept without rebuild
+    (tree / "b.wav").unlink()
+    assert fix_wav.main([*argv, str(other)]) == 0
+    assert len(rows(indexPath)) == 3
+
+    assert fix_wav.main([*argv, "--rebuild", str(other)]) == 0
+    assert list(rows(indexPath)) == [str(other / "c.wav")]
+    assert "0 skipped, 1 opened" in capsys.readouterr().out
+
+
+def test_other_schema_version_recreated(tree: Path, tmp_path: Path) -> None:
+    indexPath = tmp_path / "index.sqlite"
+    with sqlite3.connect(indexPath) as connection:
+        connection.execute("CREATE TABLE headers (path TEXT PRIMARY KEY, verdict)")
+        connection.execute("INSERT INTO headers VALUES (?, 'ok')", (str(tree),))
+        connection.execute(f"PRAGMA user_version = {fix_wav.SCHEMA_VERSION + 1}")
+    connection.close()
+
+    stats, _ = scan(tree, indexPath)
+    assert stats["opened"] == 2
+    assert sorted(rows(indexPath)) == [str(tree / "a.wav"), str(tree / "b.wav")]
+    with sqlite3.connect(indexPath) as connection:
+        (version,) = connection.execute("PRAGMA user_version").fetchone()
+    connection.close()
+    assert version == fix_wav.SCHEMA_VERSION
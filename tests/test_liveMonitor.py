@@ -0,0 +1,84 @@
+"""Monitor levels of known frames pushed through the ring buffer."""
+
+import math
+import os
+import time
+
+import numpy as np
+import pytest
+
+from src.liveMonitor import FileSource, LiveMonitor, RingBuffer
+
+
+def test_ring_buffer_wraps() -> None:
+    ring = RingBuffer(8, 1)
+    out = np.zeros((3, 1), dtype=np.float32)
+    values = np.arange(30, dtype=np.float32).reshape(-1, 1)
+    for start in range(0, 30, 3):
+        assert ring.write(values[start : start + 3])
+        assert ring.readInto(out)
+        assert out[:, 0].tolist() == values[start : start + 3, 0].tolist()
+    assert not ring.readInto(out)
+
+    assert ring.write(values[:6])
+    assert not ring.write(values[:3])  # Only 2 frames of room left
+    assert ring.available() == 6
+
+
+def test_levels_of_square_wave() -> None:
+    # Square wave at half full scale: RMS and peak are both -6.02 dBFS
+    monitor = LiveMonitor(48000, 2, fullScale=18)
+    monitor.threshold = 10.0
+    frames = np.where(np.arange(48000) % 96 < 48, 0.5, -0.5).astype(np.float32)
+    frames = np.column_stack([frames, frames / 4])
+    for start in range(0, len(frames), 480):
+        assert monitor.ring.write(frames[start : start + 480])
+        assert monitor.ring.readInto(monitor.block)
+        monitor.process(monitor.block)
+
+    expected = 18 + 20 * math.log10(0.5)
+    levels = monitor.levels()
+    assert levels.rms == pytest.approx(expected, abs=0.01)
+    assert levels.peak == pytest.approx(expected, abs=0.01)
+    assert levels.maxRms == pytest.approx(expected, abs=0.01)
+    # Until the RMS window is full, its k first steps read k/steps of the power
+    below = sum(
+        expected + 10 * math.log10(k / monitor.steps) <= monitor.threshold
+        for k in range(1, monitor.steps + 1)
+    )
+    assert levels.over == pytest.approx(1 - below / 100)
+    assert levels.dropped == 0
+
+    monitor.reset()
+    silence = np.zeros_like(monitor.block)
+    monitor.process(silence)
+    levels = monitor.levels()
+    assert levels.peak == levels.maxPeak == -math.inf
+    # The square wave is still in the RMS window
+    assert levels.over == 1
+
+
+def test_processing_thread() -> None:
+    monitor = LiveMonitor(48000, 1)
+    monitor.start()
+    try:
+        monitor.ring.write(np.full((4800, 1), 0.25, dtype=np.float32))
+        deadline = time.perf_counter() + 5
+        while monitor.ring.available() and time.perf_counter() < deadline:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        assert monitor.levels().peak == pytest.approx(18 + 20 * math.log10(0.25))
+    finally:
+        monitor.stop()
+
+
+def test_stop_idle_stream() -> None:
+    # Nothing is ever written to the pipe, the reader stays blocked
+    readFd, writeFd = os.pipe()
+    with os.fdopen(readFd, "rb") as stream:
+        source = FileSource(LiveMonitor(48000, 2), stream=stream)
+        source.start()
+        start = time.perf_counter()
+        source.stop()
+        assert time.perf_counter() - start < 1
+        os.close(writeFd)  # End of stream, the reader thread ends
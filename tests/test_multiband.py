@@ -0,0 +1,54 @@
+"""Linkwitz-Riley crossovers, from the frequency response of their sections."""
+
+import numpy as np
+import pytest
+
+from scipy.signal import sosfreqz
+
+from src.multiband import BandMeter, crossoverSos
+
+
+RATE = 48000
+
+
+def response(sos: np.ndarray, freqs: np.ndarray) -> np.ndarray:
+    return sosfreqz(sos, worN=freqs, fs=RATE)[1]
+
+
+@pytest.mark.parametrize("crossover", [80.0, 330.0, 2200.0])
+def test_lr4_bands_sum_flat(crossover: float) -> None:
+    freqs = np.geomspace(10, 20000, 400)
+    low = response(crossoverSos(None, crossover, RATE), freqs)
+    high = response(crossoverSos(crossover, None, RATE), freqs)
+    assert 20 * np.log10(np.abs(low + high)) == pytest.approx(0, abs=0.01)
+
+
+@pytest.mark.parametrize("crossover", [80.0, 330.0, 2200.0])
+def test_lr4_bands_at_crossover(crossover: float) -> None:
+    freqs = np.array([crossover])
+    for sos in (
+        crossoverSos(None, crossover, RATE),
+        crossoverSos(crossover, None, RATE),
+    ):
+        assert 20 * np.log10(np.abs(response(sos, freqs)[0])) == pytest.approx(
+            -6.02, abs=0.01
+        )
+
+
+def test_band_meter_sine_at_crossover() -> None:
+    # Filtered block by block, the carried state gives the steady response
+    meter = BandMeter([(None, 1000.0), (1000.0, None), (None, None)], RATE, 1)
+    sine = np.sin(2 * np.pi * 1000 * np.arange(RATE) / RATE)[:, np.newaxis]
+    for start in range(0, RATE, 4096):
+        means = meter.process(sine[start : start + 4096])
+    low, high, full = 10 * np.log10(means[-1])
+    assert low - full == pytest.approx(-6.02, abs=0.05)
+    assert high - full == pytest.approx(-6.02, abs=0.05)
+
+
+def test_open_sides() -> None:
+    assert crossoverSos(None, None, RATE).shape == (0, 6)
+    # Above Nyquist the low-pass is left open
+    assert len(crossoverSos(100, 30000, RATE)) == len(crossoverSos(100, None, RATE))
+    with pytest.raises(ValueError):
+        crossoverSos(100, None, RATE, order=3)
@@ -0,0 +1,226 @@
+"""DSP408 preset parsing and patching, on copies of the reset preset."""
+
+import io
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+import numpy as np
+
+from hypothesis import given, strategies as st
+
+from src.catalog import loadCatalog
+from src.cli import main
+from src.preset import (
+    NAME,
+    OUTPUT,
+    OUTPUT_COMPRESSOR_THRESHOLD,
+    OUTPUT_LIMITER_THRESHOLD,
+    OUTPUT_RATIO,
+    OUTPUTS,
+    OUTPUTS_OFFSET,
+    PRESET_SIZE,
+    PRESETS_PATH,
+    RATIO_LIMIT,
+    THRESHOLD_MAX,
+    THRESHOLD_MIN,
+    THRESHOLD_STEP,
+    U16,
+    parsePreset,
+    patchPreset,
+    readPreset,
+    thresholdFromRaw,
+    thresholdToRaw,
+)
+from src.processorProfile import PROFILES, catalogTresholds, getProfile
+
+
+RESET_PRESET = PRESETS_PATH / "2023" / "20231213_reset.prs"
+
+
+@pytest.fixture
+def base(tmp_path: Path) -> bytes:
+    path = tmp_path / "reset.prs"
+    shutil.copyfile(RESET_PRESET, path)
+    return path.read_bytes()
+
+
+def changedOffsets(before: bytes, after: bytes) -> set[int]:
+    assert len(before) == len(after)
+    return {i for i, (a, b) in enumerate(zip(before, after)) if a != b}
+
+
+def fieldOffsets(index: int, field: int, size: int) -> set[int]:
+    start = OUTPUTS_OFFSET + index * OUTPUT.size + field
+    return set(range(start, start + size))
+
+
+def test_parse_reset_preset() -> None:
+    preset = readPreset(RESET_PRESET)
+    assert preset.name == "Default Preset"
+    assert [output.name for output in preset.outputs] == [
+        f"Out{i + 1}" for i in range(OUTPUTS)
+    ]
+    assert all(output.threshold == THRESHOLD_MAX for output in preset.outputs)
+
+
+def test_parse_rejects_other_files(base: bytes) -> None:
+    with pytest.raises(ValueError):
+        parsePreset(base[:-1])
+    with pytest.raises(ValueError):
+        parsePreset(b"x" + base[1:])
+
+
+def test_patch_only_threshold_and_name(base: bytes) -> None:
+    patched = patchPreset(base, {0: (-5.1, "A15"), 5: (3.0, None), 7: (None, "SUB")})
+
+    expected = (
+        fieldOffsets(0, OUTPUT_LIMITER_THRESHOLD, U16.size)
+        | fieldOffsets(0, 0, NAME.size)
+        | fieldOffsets(5, OUTPUT_LIMITER_THRESHOLD, U16.size)
+        | fieldOffsets(7, 0, NAME.size)
+    )
+    assert changedOffsets(base, patched) <= expected
+    outputs = parsePreset(patched).outputs
+    assert (outputs[0].name, outputs[0].threshold) == ("A15", -5.5)
+    assert (outputs[5].name, outputs[5].threshold) == ("Out6", 3.0)
+    assert (outputs[7].name, outputs[7].threshold) == ("SUB", THRESHOLD_MAX)
+    assert outputs[1:5] == parsePreset(base).outputs[1:5]
+
+
+def test_patch_compressor_at_limit_ratio(base: bytes) -> None:
+    data = bytearray(base)
+    U16.pack_into(data, OUTPUTS_OFFSET + OUTPUT_RATIO, RATIO_LIMIT)
+    limited = bytes(data)
+    patched = patchPreset(limited, {0: (-5.0, None)})
+
+    # Limiter above the new threshold stays, compressor does the limiting
+    assert changedOffsets(limited, patched) <= fieldOffsets(
+        0, OUTPUT_COMPRESSOR_THRESHOLD, U16.size
+    )
+    assert parsePreset(patched).outputs[0].threshold == -5.0
+
+
+def test_patch_rejects_long_names(base: bytes) -> None:
+    with pytest.raises(ValueError):
+        patchPreset(base, {0: (None, "Too long name")})
+
+
+@given(st.integers(min_value=0, max_value=int((THRESHOLD_MAX - THRESHOLD_MIN) * 2)))
+def test_threshold_raw_round_trip(raw: int) -> None:
+    threshold = thresholdFromRaw(raw)
+    assert thresholdToRaw(threshold) == raw
+    assert thresholdFromRaw(thresholdToRaw(threshold)) == threshold
+
+
+@given(st.floats(min_value=THRESHOLD_MIN, max_value=THRESHOLD_MAX))
+def test_threshold_rounded_down(threshold: float) -> None:
+    written = thresholdFromRaw(thresholdToRaw(threshold))
+    assert written <= threshold
+    assert threshold - written <= THRESHOLD_STEP
+    assert thresholdFromRaw(thresholdToRaw(written)) == written
+
+
+def test_write_presets(monkeypatch, capsys, tmp_path: Path, base: bytes) -> None:
+    rows = (
+        "preset,output,speaker,ampli,mode,name\n"
+        "show,1,Audiophony A15,Admark AD42,8,A15\n"
+        "show,3,Audiophony A15,Admark AD42,8,\n"
+    )
+    basePath = tmp_path / "reset.prs"
+    argv = ["writepresets", "--base", str(basePath), "--output-dir", str(tmp_path)]
+    monkeypatch.setattr("sys.stdin", io.StringIO(rows))
+    assert main(argv) == 0
+
+    written = (tmp_path / "show.prs").read_bytes()
+    assert changedOffsets(base, written) <= (
+        fieldOffsets(0, OUTPUT_LIMITER_THRESHOLD, U16.size)
+        | fieldOffsets(0, 0, NAME.size)
+        | fieldOffsets(2, OUTPUT_LIMITER_THRESHOLD, U16.size)
+    )
+    outputs = parsePreset(written).outputs
+    assert [outputs[i].threshold for i in (0, 2)] == [-5.5, -5.5]
+    assert basePath.read_bytes() == base
+    assert "show.prs,1,-5.1,-5.5" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("preset", ["../escape", "/tmp/escape", "reset"])
+def test_write_presets_refused(
+    monkeypatch, capsys, tmp_path: Path, base: bytes, preset: str
+) -> None:
+    directory = tmp_path / "out"
+    directory.mkdir()
+    shutil.copyfile(tmp_path / "reset.prs", directory / "reset.prs")
+    rows = (
+        f"preset,output,speaker,ampli,mode\n{preset},1,Audiophony A15,Admark AD42,8\n"
+    )
+    argv = [
+        "writepresets",
+        "--base",
+        str(directory / "reset.prs"),
+        "--output-dir",
+        str(directory),
+        "--overwrite",
+    ]
+    monkeypatch.setattr("sys.stdin", io.StringIO(rows))
+    main(argv)
+
+    assert "escape.prs" not in {path.name for path in tmp_path.rglob("*")}
+    assert Path("/tmp/escape.prs").exists() is False
+    assert (directory / "reset.prs").read_bytes() == base
+    assert capsys.readouterr().err
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("dBu", ["-5.1", "3.2"]),
+        ("T.Racks DS2/4", ["-8", "0"]),
+        ("DCX2496 Top", ["-23.4", "-15.1"]),
+    ],
+)
+def test_profile_units(name: str, expected: list[str]) -> None:
+    profile = getProfile(name)
+    assert [str(profile.quantize(t)) for t in (-5.1, 3.2)] == expected
+    assert [f"{t:.{profile.places}f}" for t in profile.convert([-5.1, 3.2])] == expected
+
+
+def test_profile_unknown(capsys) -> None:
+    with pytest.raises(KeyError):
+        getProfile("DSP408")
+    with pytest.raises(SystemExit):
+        main(["limiter", "--processor", "DSP408"])
+    assert "invalid choice" in capsys.readouterr().err
+
+
+@given(st.floats(min_value=-60, max_value=60))
+def test_profile_convert_as_quantize(threshold: float) -> None:
+    for profile in PROFILES.values():
+        (value,) = profile.convert([threshold])
+        assert f"{value:.{profile.places}f}" == str(profile.quantize(threshold))
+
+
+def test_profile_catalog_round_trip(base: bytes) -> None:
+    # dBu thresholds written 8 outputs at a time and read back from the file
+    values = catalogTresholds(loadCatalog(), profiles=[getProfile("dBu")]).values
+    values = values[np.isfinite(values)]
+    for start in range(0, len(values), OUTPUTS):
+        chunk = values[start : start + OUTPUTS]
+        patched = patchPreset(base, {i: (float(t), None) for i, t in enumerate(chunk)})
+        assert len(patched) == PRESET_SIZE
+        outputs = parsePreset(patched).outputs
+        for output, threshold in zip(outputs, chunk):
+            limit = min(threshold, THRESHOLD_MAX)
+            assert output.threshold == thresholdFromRaw(thresholdToRaw(threshold))
+            assert limit - THRESHOLD_STEP < output.threshold <= limit
+    # Catalog goes above the processor range, never below
+    assert values.max() > THRESHOLD_MAX
+    assert values.min() > THRESHOLD_MIN
+
+    outputs = parsePreset(patchPreset(base, {0: (-120.0, None), 1: (60.0, None)}))
+    assert [output.threshold for output in outputs.outputs[:2]] == [
+        THRESHOLD_MIN,
+        THRESHOLD_MAX,
+    ]
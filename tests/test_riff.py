@@ -0,0 +1,155 @@
+"""WAV header validation and in place repair, on small files built byte by byte."""
+
+import struct
+
+from pathlib import Path
+
+from src.riff import KSDATAFORMAT_SUFFIX, readWavHeader, repairWav
+
+
+AUDIO = bytes(range(256)) * 4  # 1024 bytes, 256 frames of 16 bits stereo
+
+
+def fmtChunk(
+    tag: int = 1,
+    channels: int = 2,
+    blockAlign: int = 4,
+    byteRate: int = 192000,
+    subFormat: bytes | None = None,
+) -> bytes:
+    """Return a 48kHz 16 bits fmt chunk, extensible with subFormat."""
+
+    body = struct.pack("<HHIIHH", tag, channels, 48000, byteRate, blockAlign, 16)
+    if subFormat is not None:
+        body += struct.pack("<HHI16s", 22, 16, 3, subFormat)
+    return b"fmt " + struct.pack("<I", len(body)) + body
+
+
+def wavFile(
+    path: Path,
+    fmt: bytes,
+    audio: bytes = AUDIO,
+    dataSize: int | None = None,
+    riffSize: int | None = None,
+    before: bytes = b"",
+) -> bytes:
+    """Write a WAV file with given chunks and header sizes, return its bytes."""
+
+    data = b"data" + struct.pack("<I", len(audio) if dataSize is None else dataSize)
+    chunks = b"WAVE" + fmt + before + data + audio
+    content = (
+        b"RIFF" + struct.pack("<I", len(chunks) if riffSize is None else riffSize)
+    ) + chunks
+    path.write_bytes(content)
+    return content
+
+
+def codes(path: Path) -> list[str]:
+    return [issue.code for issue in readWavHeader(str(path)).issues]
+
+
+def test_valid_file_untouched(tmp_path: Path) -> None:
+    path = tmp_path / "valid.wav"
+    content = wavFile(path, fmtChunk())
+    assert codes(path) == []
+    assert repairWav(str(path)) == []
+    assert path.read_bytes() == content
+
+
+def test_truncated_data(tmp_path: Path) -> None:
+    # Recorder stopped before updating sizes, last frame is incomplete
+    path = tmp_path / "truncated.wav"
+    content = wavFile(path, fmtChunk(), AUDIO[:1001], dataSize=4096, riffSize=4132)
+    assert codes(path) == ["truncated"]
+    assert [issue.code for issue in repairWav(str(path))] == ["truncated"]
+
+    repaired = path.read_bytes()
+    assert len(repaired) == len(content)
+    assert struct.unpack_from("<I", repaired, 4)[0] == len(content) - 8
+    dataOffset = content.index(b"data")
+    assert struct.unpack_from("<I", repaired, dataOffset + 4)[0] == 1000
+    assert repaired[dataOffset + 8 :] == AUDIO[:1001]
+    assert codes(path) == []
+
+
+def test_riff_size(tmp_path: Path) -> None:
+    path = tmp_path / "riff_size.wav"
+    content = wavFile(path, fmtChunk(), riffSize=12345)
+    assert codes(path) == ["riff_size"]
+    repairWav(str(path))
+
+    repaired = path.read_bytes()
+    assert struct.unpack_from("<I", repaired, 4)[0] == len(content) - 8
+    assert repaired[8:] == content[8:]
+
+
+def test_extensible_pcm(tmp_path: Path) -> None:
+    path = tmp_path / "extensible.wav"
+    subFormat = b"\x01\x00" + KSDATAFORMAT_SUFFIX
+    content = wavFile(path, fmtChunk(0xFFFE, subFormat=subFormat))
+    assert codes(path) == ["extensible"]
+    repairWav(str(path))
+
+    repaired = path.read_bytes()
+    # Only the format tag changes, the extension is left for players to skip
+    assert struct.unpack_from("<H", repaired, 20)[0] == 1
+    assert repaired[:20] == content[:20]
+    assert repaired[22:] == content[22:]
+    assert codes(path) == []
+
+
+def test_unknown_sub_format_not_fixed(tmp_path: Path) -> None:
+    path = tmp_path / "sub_format.wav"
+    content = wavFile(path, fmtChunk(0xFFFE, subFormat=b"\x01" * 16))
+    assert codes(path) == ["sub_format"]
+    assert repairWav(str(path)) == []
+    assert path.read_bytes() == content
+
+
+def test_block_align_and_byte_rate(tmp_path: Path) -> None:
+    path = tmp_path / "sizes.wav"
+    content = wavFile(path, fmtChunk(blockAlign=2, byteRate=96000))
+    assert codes(path) == ["block_align", "byte_rate"]
+    repairWav(str(path))
+
+    repaired = path.read_bytes()
+    assert struct.unpack_from("<IH", repaired, 28) == (192000, 4)
+    assert repaired[:28] == content[:28]
+    assert repaired[34:] == content[34:]
+
+
+def test_only_given_codes(tmp_path: Path) -> None:
+    path = tmp_path / "sizes.wav"
+    content = wavFile(path, fmtChunk(blockAlign=2, byteRate=96000))
+    assert [issue.code for issue in repairWav(str(path), {"byte_rate"})] == [
+        "byte_rate"
+    ]
+
+    repaired = path.read_bytes()
+    assert struct.unpack_from("<IH", repaired, 28) == (192000, 2)
+    assert repaired[34:] == content[34:]
+
+
+def test_odd_chunk_padding(tmp_path: Path) -> None:
+    padded = tmp_path / "padded.wav"
+    wavFile(padded, fmtChunk(), before=b"LIST" + struct.pack("<I", 3) + b"abc\x00")
+    assert codes(padded) == []
+
+    # Writer forgot the pad byte of an odd sized chunk, data is still found
+    unpadded = tmp_path / "unpadded.wav"
+    content = wavFile(
+        unpadded, fmtChunk(), before=b"LIST" + struct.pack("<I", 3) + b"abc"
+    )
+    header = readWavHeader(str(unpadded))
+    assert [issue.code for issue in header.issues] == ["missing_pad"]
+    assert header.dataChunk.size == len(AUDIO)
+    assert repairWav(str(unpadded)) == []
+    assert unpadded.read_bytes() == content
+
+
+def test_not_wave(tmp_path: Path) -> None:
+    path = tmp_path / "text.wav"
+    path.write_bytes(b"RIFX\x00\x00\x00\x00AVI ")
+    assert codes(path) == ["not_wave"]
+    path.write_bytes(b"RIFF")
+    assert codes(path) == ["truncated"]
@@ -0,0 +1,97 @@
+"""Rig assignments on small made up inventories, checked by hand."""
+
+import math
+
+import pytest
+
+from src.amplifier import Amplifier
+from src.limiter import computeTresholds
+from src.rigSolver import RigSolver
+from src.speaker import Speaker
+
+
+def speaker(reference: str, impedance: int = 8, baffle: str = "CLOSED") -> Speaker:
+    return Speaker(reference, impedance, 500, "40-400", baffle)
+
+
+def ampli(reference: str, power: dict[str, int], outputs: int = 2) -> Amplifier:
+    return Amplifier(reference, 32, power, outputs)
+
+
+def test_margin_hand_computed() -> None:
+    solver = RigSolver([(speaker("Sub"), 1)], [(ampli("Amp", {"8": 1000}), 1)])
+    (config,) = solver.configs
+    # (1000 W / 2) against (500 W / 2.34375 closed baffle)
+    assert config.margin == round(10 * math.log10(500 / (500 / 2.34375)), 1) == 3.7
+
+    # Same impedance and gain on both sides, only the voltage ratio remains
+    vSpkMax, vAmpMax, _ = computeTresholds([8], ["CLOSED"], [500], [32], [1000], True)
+    assert 20 * math.log10(vAmpMax[0] / vSpkMax[0]) == pytest.approx(
+        config.margin, abs=0.05
+    )
+
+
+def test_parallel_load() -> None:
+    # Two 8 Ohm boxes on one 4 Ohm channel, twice the speaker power
+    solver = RigSolver([(speaker("Sub"), 2)], [(ampli("Amp", {"4": 1000}), 1)])
+    (assignment,) = solver.solve().assignments
+    assert (assignment.mode, assignment.count, assignment.channels) == ("4", 2, (1,))
+    assert assignment.margin == round(10 * math.log10(500 / (1000 / 2.34375)), 1)
+
+
+def test_bridged_load() -> None:
+    solver = RigSolver(
+        [(speaker("Sub"), 2)], [(ampli("Amp", {"8 (bridge)": 2000}, 4), 1)]
+    )
+    solution = solver.solve()
+    assert [(a.unit, a.channels, a.mode) for a in solution.assignments] == [
+        (1, (1, 2), "8 (bridge)"),
+        (1, (3, 4), "8 (bridge)"),
+    ]
+    assert solution.amps == {"Amp": 1}
+
+
+def test_bridge_needs_two_channels() -> None:
+    solver = RigSolver(
+        [(speaker("Sub"), 1)], [(ampli("Amp", {"8 (bridge)": 2000}, 1), 1)]
+    )
+    with pytest.raises(ValueError, match="no amplifier channel can drive Sub"):
+        solver.solve()
+
+
+def test_headroom_against_amps() -> None:
+    small = ampli("Small", {"8": 400}, 4)
+    big = ampli("Big", {"8": 2000}, 2)
+    solver = RigSolver([(speaker("Top"), 4)], [(small, 1), (big, 2)])
+
+    headroom = solver.solve("headroom")
+    assert headroom.amps == {"Big": 2}
+    assert headroom.minMargin == round(10 * math.log10(1000 / (500 / 2.34375)), 1)
+
+    amps = solver.solve("amps")
+    assert amps.amps == {"Small": 1}
+    assert amps.minMargin < headroom.minMargin
+
+    # Small amplifiers are not allowed below the minimum margin
+    assert solver.solve("amps", 0).amps == {"Big": 2}
+
+
+@pytest.mark.parametrize(
+    "speakers, message",
+    [
+        ([(speaker("Top"), 9)], "not enough amplifier channels"),
+        ([(speaker("Top", impedance=6), 1)], "no amplifier channel can drive Top"),
+        ([(speaker("Mid", impedance=16), 3)], "3 Mid cannot be wired .* of 2, 4"),
+    ],
+)
+def test_infeasible(speakers: list, message: str) -> None:
+    solver = RigSolver(speakers, [(ampli("Amp", {"8": 1000, "4": 1000}), 2)])
+    for objective in ("headroom", "amps"):
+        with pytest.raises(ValueError, match=message):
+            solver.solve(objective)
+
+
+def test_min_margin_too_high() -> None:
+    solver = RigSolver([(speaker("Sub"), 1)], [(ampli("Amp", {"8": 1000}), 1)])
+    with pytest.raises(ValueError, match="margin of 6.0 dB"):
+        solver.solve(minMargin=6)
@@ -0,0 +1,83 @@
+"""RMS limiter on sines, levels in dBu with 0 dBFS at +18 dBu."""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.rmsLimiter import (
+    LimiterSettings,
+    followReduction,
+    limitSignal,
+    staticReduction,
+    timeCoefficient,
+)
+
+
+RATE = 48000
+FULL_SCALE = 18.0
+
+
+def sine(level: float, duration: float) -> np.ndarray:
+    """Return 1 kHz sine of given RMS level (dBu)."""
+
+    amplitude = math.sqrt(2) * 10 ** ((level - FULL_SCALE) / 20)
+    return amplitude * np.sin(
+        2 * np.pi * 1000 * np.arange(round(duration * RATE)) / RATE
+    )
+
+
+def rmsLevel(samples: np.ndarray) -> float:
+    return FULL_SCALE + 10 * math.log10(np.mean(samples * samples))
+
+
+def test_below_threshold_unity_gain() -> None:
+    samples = sine(0.0, 1.0)
+    trace = limitSignal(samples, RATE, [LimiterSettings(3.0)], FULL_SCALE)
+    assert not trace.reduction.any()
+    assert np.array_equal(trace.output[:, 0, 0], samples)
+
+
+def test_sine_above_threshold_converges() -> None:
+    settings = LimiterSettings(0.0, attack=50, release=500)
+    samples = sine(6.0, 1.0)
+    trace = limitSignal(samples, RATE, [settings], FULL_SCALE)
+
+    # Attack and RMS window settled well within the release time
+    settled = trace.times >= settings.release / 1000
+    assert trace.reduction[settled, 0] == pytest.approx(6.0, abs=0.05)
+    last = trace.output[-RATE // 10 :, 0, 0]
+    assert rmsLevel(last) == pytest.approx(settings.threshold, abs=0.1)
+
+
+def test_release_after_loud_passage() -> None:
+    settings = LimiterSettings(0.0, attack=50, release=500)
+    samples = np.concatenate([sine(6.0, 1.0), sine(-20.0, 2.0)])
+    trace = limitSignal(samples, RATE, [settings], FULL_SCALE)
+
+    # Drop seen once the RMS window only holds the quiet passage
+    quiet = 1.0 + settings.window / 1000
+    after = np.searchsorted(trace.times, [quiet, quiet + settings.release / 1000])
+    start, released = trace.reduction[after, 0]
+    assert released / start == pytest.approx(math.exp(-1), abs=0.02)
+
+
+def test_static_curve() -> None:
+    levels = [-10.0, 0.0, 3.0, 10.0]
+    assert staticReduction(levels, 0.0).tolist() == [0.0, 0.0, 3.0, 10.0]
+    # Soft knee of 6 dB, 3 dB / 4 at threshold, ratio 4 keeps 1 dB per 4
+    assert staticReduction(levels, 0.0, 6.0).tolist() == [0.0, 0.75, 3.0, 10.0]
+    assert staticReduction(levels, 0.0, 0.0, 4.0).tolist() == [0.0, 0.0, 2.25, 7.5]
+
+
+def test_many_settings_same_as_one_by_one() -> None:
+    # Above 8 settings, followers run on numpy rows instead of floats
+    targets = np.abs(np.random.default_rng(0).normal(0, 3, (500, 12)))
+    targets[100:200] = 0
+    attack = timeCoefficient(np.linspace(1, 100, 12), 0.001)
+    release = timeCoefficient(np.linspace(50, 1000, 12), 0.001)
+    together, last = followReduction(targets, attack, release)
+    for j in range(12):
+        alone, _ = followReduction(targets[:, [j]], attack[[j]], release[[j]])
+        assert together[:, j] == pytest.approx(alone[:, 0])
+    assert last == pytest.approx(together[-1])
@@ -0,0 +1,135 @@
+"""Float-native core and rounding stage against the former Decimal code."""
+
+from decimal import Decimal, ROUND_DOWN, ROUND_UP
+from math import log10, sqrt
+
+import numpy as np
+
+from hypothesis import given, strategies as st
+
+from src import numeric
+from src.ampGain import AmpGain
+from src.converter import (
+    freqToDistance,
+    freqToTime,
+    distanceToTime,
+    distanceToFreq,
+    timeToFreq,
+    timeToDistance,
+)
+from src.limiter import Limiter, computeTresholds
+from src.rounding import quantize, quantizeThreshold
+
+
+finiteFloats = st.floats(
+    min_value=-1e12, max_value=1e12, allow_nan=False, allow_infinity=False
+)
+positiveFloats = st.floats(min_value=1e-3, max_value=1e5)
+places = st.integers(min_value=0, max_value=4)
+
+
+def legacyThreshold(value: float, places: int = 1) -> Decimal:
+    return Decimal(value).quantize(
+        Decimal(1).scaleb(-places), rounding=ROUND_DOWN if value > 0 else ROUND_UP
+    )
+
+
+def legacyComputeTreshold(
+    impedance, speakerBaffle, speakerPower, ampliGain, ampliPower, smartLimit
+) -> tuple[Decimal, Decimal, Decimal]:
+    if not smartLimit:
+        baffleFactor = 1
+    elif speakerBaffle == "OPEN":
+        baffleFactor = 1.5625
+    else:
+        baffleFactor = 2.34375
+    ampliFactor = 2 if smartLimit else 1
+    vSpkMax = sqrt((speakerPower / baffleFactor) * impedance)
+    thresholdSpk = 20 * log10(vSpkMax / 0.775) - ampliGain
+    vAmpMax = sqrt((ampliPower / ampliFactor) * impedance)
+    thresholdAmp = 20 * log10(vAmpMax / 0.775) - ampliGain
+    return (
+        Decimal(vSpkMax).quantize(Decimal(".01")),
+        Decimal(vAmpMax).quantize(Decimal(".01")),
+        legacyThreshold(min(thresholdSpk, thresholdAmp)),
+    )
+
+
+@given(finiteFloats, places)
+def test_quantize(value: float, places: int) -> None:
+    expected = Decimal(value).quantize(Decimal(1).scaleb(-places))
+    result = quantize(value, places)
+    assert str(result) == str(expected)
+
+
+@given(st.integers(min_value=-(10**9), max_value=10**9), places)
+def test_quantize_ties(k: int, places: int) -> None:
+    # Closest floats to k.5 / 10 ** places, mostly just above or below the tie
+    value = (k + 0.5) / 10**places
+    for candidate in (value, np.nextafter(value, -np.inf), np.nextafter(value, np.inf)):
+        candidate = float(candidate)
+        expected = Decimal(candidate).quantize(Decimal(1).scaleb(-places))
+        assert str(quantize(candidate, places)) == str(expected)
+
+
+@given(finiteFloats, places)
+def test_quantizeThreshold(value: float, places: int) -> None:
+    result = quantizeThreshold(value, places)
+    assert str(result) == str(legacyThreshold(value, places))
+
+
+@given(st.integers(min_value=-(10**9), max_value=10**9))
+def test_quantizeThreshold_boundaries(k: int) -> None:
+    value = k / 10
+    for candidate in (value, np.nextafter(value, -np.inf), np.nextafter(value, np.inf)):
+        candidate = float(candidate)
+        assert str(quantizeThreshold(candidate)) == str(legacyThreshold(candidate))
+
+
+@given(
+    st.sampled_from([2, 4, 8, 16]),
+    st.sampled_from(["OPEN", "CLOSED"]),
+    st.integers(min_value=1, max_value=50000),
+    st.floats(min_value=0, max_value=100).map(lambda gain: round(gain, 2)),
+    st.integers(min_value=1, max_value=50000),
+    st.booleans(),
+)
+def test_computeTreshold(
+    impedance, speakerBaffle, speakerPower, ampliGain, ampliPower, smartLimit
+) -> None:
+    args = (impedance, speakerBaffle, speakerPower, ampliGain, ampliPower)
+    expected = legacyComputeTreshold(*args, smartLimit)
+    assert Limiter(*args).computeTreshold(smartLimit) == expected
+
+    # Vectorized engine rounds the same way
+    vSpkMax, vAmpMax, threshold = computeTresholds(*args, smartLimit)
+    assert (Decimal(f"{vSpkMax:.2f}"), Decimal(f"{vAmpMax:.2f}")) == expected[:2]
+    assert Decimal(f"{threshold:.1f}") == expected[2]
+
+
+@given(positiveFloats, st.floats(min_value=300, max_value=400))
+def test_converter(value: float, c: float) -> None:
+    assert freqToDistance(value, c) == Decimal(c / value).quantize(Decimal(".01"))
+    assert freqToTime(value, c) == Decimal(1 / (value * 0.001)).quantize(
+        Decimal(".001")
+    )
+    assert distanceToTime(value, c) == Decimal((value / c) * 1000).quantize(
+        Decimal(".001")
+    )
+    assert distanceToFreq(value, c) == Decimal(c / value).quantize(Decimal(".01"))
+    assert timeToFreq(value) == Decimal(1 / (value * 0.001)).quantize(Decimal(".01"))
+    assert timeToDistance(value, c) == Decimal((value * c) / 1000).quantize(
+        Decimal(".01")
+    )
+
+
+@given(positiveFloats, positiveFloats)
+def test_computeAmpGain(voltageIn: float, voltageOut: float) -> None:
+    expected = Decimal(20 * log10(voltageOut / voltageIn)).quantize(Decimal(".01"))
+    assert AmpGain(voltageIn, voltageOut).computeAmpGain() == expected
+    assert numeric.ampGain(voltageIn, voltageOut) == 20 * log10(voltageOut / voltageIn)
+
+
+def test_converter_arrays() -> None:
+    freqs = np.array([31.5, 63, 125])
+    assert list(numeric.freqToDistance(freqs, 343)) == [343 / f for f in freqs]
@@ -0,0 +1,57 @@
+"""Cramer's speed of sound, direct and through its lookup table."""
+
+import numpy as np
+import pytest
+
+from src.converter import computeC, computeCs
+from src.soundSpeed import SoundSpeedTable, cramerSpeed, soundSpeedTable
+
+
+def test_reference_values() -> None:
+    assert cramerSpeed(20, 50, 1013.25) == pytest.approx(343.99, abs=0.01)
+    # Dry air at 0 C
+    assert cramerSpeed(0, 0, 1013.25) == pytest.approx(331.45, abs=0.01)
+    assert computeC(20, 50, 1013.25, "cramer") == 343.99
+    assert computeC(20) == 343  # Linear model, truncated
+
+
+def gridPoints(table: SoundSpeedTable, offset: float) -> list[np.ndarray]:
+    """Return every temperature, humidity and pressure grid point, moved by offset steps."""
+
+    axes = [
+        first + step * (np.arange(size - 1) + offset)
+        for first, step, size in table.axes
+    ]
+    return [axis.ravel() for axis in np.meshgrid(*axes, indexing="ij")]
+
+
+@pytest.mark.parametrize("offset", [0.0, 0.5], ids=["grid", "mid-grid"])
+def test_table_against_formula(offset: float) -> None:
+    table = soundSpeedTable()
+    t, h, p = gridPoints(table, offset)
+    exact = cramerSpeed(t, h, p)
+    assert np.abs(table(t, h, p) - exact).max() < 0.01
+
+    # Scalar lookups, and one temperature column at fixed conditions
+    rng = np.random.default_rng(0)
+    for i in rng.choice(len(t), 200, replace=False):
+        assert table(float(t[i]), float(h[i]), float(p[i])) == pytest.approx(
+            exact[i], abs=0.01
+        )
+    column = t[(h == h[0]) & (p == p[0])]
+    assert (
+        np.abs(
+            table(column, float(h[0]), float(p[0])) - cramerSpeed(column, h[0], p[0])
+        ).max()
+        < 0.01
+    )
+
+
+def test_outside_grid_is_exact() -> None:
+    table = soundSpeedTable()
+    assert table(70.0, 50.0, 1013.25) == cramerSpeed(70.0, 50.0, 1013.25)
+    temperatures = np.array([-60.0, 20.0, 80.0])
+    c = table(temperatures, 50, 1013.25)
+    assert c[[0, 2]].tolist() == cramerSpeed(temperatures[[0, 2]], 50, 1013.25).tolist()
+    hot = round(cramerSpeed(70.0, 50, 1013.25), 2)
+    assert computeCs([20.0, 70.0], 50, 1013.25, "cramer").tolist() == [343.99, hot]
@@ -0,0 +1,59 @@
+"""Thermal model on constant power steps, against its closed form."""
+
+import math
+
+import numpy as np
+import pytest
+
+from src.speaker import Speaker
+from src.thermal import RATED_RISE, ThermalParameters, pinkNoise, temperatureRise
+
+
+BLOCK_TIME = 0.01
+
+
+def step(power: float, duration: float, speakers: int = 1) -> np.ndarray:
+    return np.full((round(duration / BLOCK_TIME), speakers), power)
+
+
+def test_steady_state_rise() -> None:
+    # Short magnet time constant, so that both branches settle
+    parameters = ThermalParameters(0.3, 0.2, 2.0, 20.0)
+    rise = temperatureRise(step(100, 400), [parameters], BLOCK_TIME)
+    assert rise[-1, 0] == pytest.approx(100 * (0.3 + 0.2), rel=1e-6)
+    assert np.all(np.diff(rise[:, 0]) >= 0)
+
+
+@pytest.mark.parametrize("timeConstant", [1.0, 15.0])
+def test_time_constant(timeConstant: float) -> None:
+    parameters = ThermalParameters(0.5, 0.0, timeConstant)
+    rise = temperatureRise(step(100, 5 * timeConstant), [parameters], BLOCK_TIME)
+    # Block n ends at (n + 1) blocks
+    atTimeConstant = rise[round(timeConstant / BLOCK_TIME) - 1, 0]
+    assert atTimeConstant / 50 == pytest.approx(1 - math.exp(-1), abs=1e-3)
+
+
+def test_speakers_with_different_time_constants() -> None:
+    parameters = [
+        ThermalParameters(0.5, 0.0, 1.0),
+        ThermalParameters(0.5, 0.0, 4.0),
+        ThermalParameters(1.0, 0.0, 1.0),
+    ]
+    rise = temperatureRise(step(10, 4, 3), parameters, BLOCK_TIME)
+    assert rise[-1, 0] > rise[-1, 1]
+    assert rise[:, 2] == pytest.approx(2 * rise[:, 0])
+
+
+def test_rated_rise_at_aes_power() -> None:
+    parameters = ThermalParameters.fromSpeaker(
+        Speaker("Sub", 8, 500, "40-400", "CLOSED")
+    )
+    assert 500 * (parameters.coilResistance + parameters.magnetResistance) == (
+        pytest.approx(RATED_RISE)
+    )
+
+
+def test_pink_noise_level() -> None:
+    noise = pinkNoise(10, crest=6.0)
+    assert np.sqrt(np.mean(noise**2)) == pytest.approx(1)
+    assert 20 * math.log10(np.abs(noise).max()) < 6.5